@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from services.outbox_service import OutboxService
+from schemas.outbox_schemas import ChangeFeedResponseSchema
+from app.database.session import get_db
+from security.dependencies import require_viewer
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+
+
+@router.get("/", response_model=ChangeFeedResponseSchema)
+def get_changes(
+        since: Optional[str] = Query(None),
+        limit: int = Query(100),
+        db: Session = Depends(get_db),
+        user = Depends(require_viewer)
+):
+    """
+    Retrieve change events for customers, products, documents and their items in commit order.
+    Start without 'since' and pass the returned next_cursor on the next call.
+    Events are kept for 7 days.
+    """
+    service = OutboxService(db)
+    try:
+        return service.get_changes(since, limit)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from services.customer_service import CustomerService
+from services.references import ReferenceInUseError
 from security.dependencies import require_admin, require_viewer, require_employee
 from app.database.session import get_db
 from schemas.customer_schemas import (
@@ -9,7 +10,8 @@ from schemas.customer_schemas import (
     CustomerUpdateEmailSchema,
     CustomerUpdatePhoneSchema,
     CustomerUpdateAddressSchema,
-    CustomerUpdateNotesSchema
+    CustomerUpdateNotesSchema,
+    CustomerPatchSchema
 )
 
 router = APIRouter(prefix="/customers", tags=["customers"])
@@ -30,6 +32,25 @@ def get_all_customers(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/search")
+def search_customers(
+        q: str = Query(...),
+        limit: int = Query(20),
+        db: Session = Depends(get_db),
+        user = Depends(require_viewer)
+):
+    """
+    Search customers by partial or misspelled name, company name, email or tax ID, best match first.
+    """
+    try:
+        service = CustomerService(db)
+        return service.search_customers(q, limit)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/")
 def create_customer(
         payload: CustomerCreateSchema,
@@ -57,6 +78,25 @@ def create_customer(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.patch("/{customer_id}")
+def patch_customer(
+        customer_id: int,
+        payload: CustomerPatchSchema,
+        db: Session = Depends(get_db),
+        user = Depends(require_employee)
+):
+    """
+    Update any subset of a customer's fields in one request.
+    """
+    try:
+        service = CustomerService(db)
+        return service.patch_customer(customer_id, payload.model_dump(exclude_unset=True))
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.put("/{customer_id}/email")
 def update_customer_email(
         customer_id: int,
@@ -144,12 +184,14 @@ def delete_customer(
         user = Depends(require_admin)
 ):
     """
-    Delete a customer by ID.
+    Delete a customer by ID. Customers still used by documents cannot be deleted (409).
     """
     try:
         service = CustomerService(db)
         service.delete_customer(customer_id)
         return {"message": "Customer deleted successfully."}
+    except ReferenceInUseError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as ve:
         raise HTTPException(status_code=404, detail=str(ve))
     except Exception as e:
@@ -0,0 +1,226 @@
+"""
+Schema changes for databases that were created before a model changed.
+
+Base.metadata.create_all() only creates missing tables, it never alters existing ones.
+Every entry below brings an existing database to the state a fresh create_all() would
+produce. Statements must therefore be idempotent (IF NOT EXISTS, ...) because on a fresh
+database the tables already have the new shape. Entries are applied once, in order,
+and recorded in the schema_migrations table. Never edit an applied entry, add a new one.
+"""
+import logging
+from sqlalchemy import text
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_LOCK_ID = 740_001
+
+DOCUMENT_ITEM_TABLES = [
+    ("invoices", "invoice_items", "invoice_id"),
+    ("orders", "order_items", "order_id"),
+    ("quotations", "quotation_items", "quotation_id"),
+]
+
+
+def _document_totals_statements() -> list[str]:
+    """
+    Adds the stored total columns to each document table and backfills them from the items.
+    """
+    statements = []
+    for table, item_table, parent_column in DOCUMENT_ITEM_TABLES:
+        statements += [
+            f"ALTER TABLE {table} "
+            "ADD COLUMN IF NOT EXISTS net_total NUMERIC(14, 2) NOT NULL DEFAULT 0, "
+            "ADD COLUMN IF NOT EXISTS tax_total NUMERIC(14, 2) NOT NULL DEFAULT 0, "
+            "ADD COLUMN IF NOT EXISTS gross_total NUMERIC(14, 2) NOT NULL DEFAULT 0, "
+            "ADD COLUMN IF NOT EXISTS item_count INTEGER NOT NULL DEFAULT 0",
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_gross_total ON {table} (gross_total)",
+            f"UPDATE {table} SET "
+            "net_total = sums.net, "
+            "tax_total = round(sums.net * 0.19, 2), "
+            "gross_total = sums.net + round(sums.net * 0.19, 2), "
+            "item_count = sums.item_count "
+            f"FROM (SELECT {parent_column} AS document_id, "
+            "sum(round(quantity::numeric * unit_price::numeric, 2)) AS net, "
+            "count(*) AS item_count "
+            f"FROM {item_table} GROUP BY {parent_column}) AS sums "
+            f"WHERE {table}.id = sums.document_id",
+        ]
+    return statements
+
+
+def _numeric_amount_statements() -> list[str]:
+    """
+    Converts prices and quantities from double precision to NUMERIC and recomputes the stored totals.
+
+    Existing values are rounded half up to cents and thousandths. The revenue view reads the item
+    columns, so it is dropped first and recreated with the new types.
+    """
+    statements = [
+        "DROP MATERIALIZED VIEW IF EXISTS invoice_revenue_daily",
+        "ALTER TABLE products ALTER COLUMN unit_price TYPE NUMERIC(12, 2) USING round(unit_price::numeric, 2)",
+        *[
+            f"ALTER TABLE {item_table} "
+            "ALTER COLUMN quantity TYPE NUMERIC(12, 3) USING round(quantity::numeric, 3), "
+            "ALTER COLUMN unit_price TYPE NUMERIC(12, 2) USING round(unit_price::numeric, 2)"
+            for item_table in ("invoice_items", "order_items", "quotation_items", "recurring_invoice_items")
+        ],
+        "CREATE MATERIALIZED VIEW invoice_revenue_daily AS "
+        "SELECT i.issue_date AS day, i.customer_id, i.user_id, ii.product_id, i.status::text AS status, "
+        "sum(round(ii.quantity * ii.unit_price, 2)) AS net_revenue, "
+        "sum(ii.quantity) AS quantity, "
+        "count(*) AS item_count "
+        "FROM invoices i JOIN invoice_items ii ON ii.invoice_id = i.id "
+        "GROUP BY i.issue_date, i.customer_id, i.user_id, ii.product_id, i.status",
+        "CREATE UNIQUE INDEX ux_invoice_revenue_daily "
+        "ON invoice_revenue_daily (day, customer_id, user_id, product_id, status)",
+    ]
+    for table, item_table, parent_column in DOCUMENT_ITEM_TABLES:
+        statements.append(
+            f"UPDATE {table} SET "
+            "net_total = sums.net, "
+            "tax_total = round(sums.net * 0.19, 2), "
+            "gross_total = sums.net + round(sums.net * 0.19, 2) "
+            f"FROM (SELECT {parent_column} AS document_id, "
+            "sum(round(quantity * unit_price, 2)) AS net "
+            f"FROM {item_table} GROUP BY {parent_column}) AS sums "
+            f"WHERE {table}.id = sums.document_id AND {table}.net_total <> sums.net"
+        )
+    return statements
+
+
+def _referential_delete_statements() -> list[str]:
+    """
+    Recreates the foreign keys with explicit ON DELETE rules and indexes the referencing columns.
+
+    Items are deleted together with their document by the database. Products and customers
+    cannot be deleted while items or documents reference them.
+    """
+    item_tables = [(item_table, parent_column, table) for table, item_table, parent_column in DOCUMENT_ITEM_TABLES]
+    item_tables.append(("recurring_invoice_items", "recurring_invoice_id", "recurring_invoices"))
+    document_tables = [table for table, _, _ in DOCUMENT_ITEM_TABLES] + ["recurring_invoices"]
+
+    foreign_keys = [(item_table, parent_column, table, "CASCADE") for item_table, parent_column, table in item_tables]
+    foreign_keys += [(item_table, "product_id", "products", "RESTRICT") for item_table, _, _ in item_tables]
+    foreign_keys += [(table, "customer_id", "customers", "RESTRICT") for table in document_tables]
+
+    statements = [
+        f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_{column}_fkey, "
+        f"ADD CONSTRAINT {table}_{column}_fkey FOREIGN KEY ({column}) "
+        f"REFERENCES {referenced_table} (id) ON DELETE {rule}"
+        for table, column, referenced_table, rule in foreign_keys
+    ]
+    statements += [
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_customer_id ON {table} (customer_id)"
+        for table in document_tables
+    ]
+    statements.append(
+        "CREATE INDEX IF NOT EXISTS ix_recurring_invoice_items_recurring_invoice_id "
+        "ON recurring_invoice_items (recurring_invoice_id)"
+    )
+    return statements
+
+
+MIGRATIONS: list[tuple[str, list[str]]] = [
+    ("0001_document_source_links", [
+        "ALTER TABLE orders ADD COLUMN IF NOT EXISTS quotation_id INTEGER "
+        "CONSTRAINT orders_quotation_id_key UNIQUE "
+        "CONSTRAINT orders_quotation_id_fkey REFERENCES quotations (id) ON DELETE SET NULL",
+        "ALTER TABLE invoices ADD COLUMN IF NOT EXISTS order_id INTEGER "
+        "CONSTRAINT invoices_order_id_key UNIQUE "
+        "CONSTRAINT invoices_order_id_fkey REFERENCES orders (id) ON DELETE SET NULL",
+    ]),
+    ("0002_document_totals", _document_totals_statements()),
+    ("0003_invoice_revenue_daily", [
+        "CREATE MATERIALIZED VIEW IF NOT EXISTS invoice_revenue_daily AS "
+        "SELECT i.issue_date AS day, i.customer_id, i.user_id, ii.product_id, i.status::text AS status, "
+        "sum(round(ii.quantity::numeric * ii.unit_price::numeric, 2)) AS net_revenue, "
+        "sum(ii.quantity::numeric) AS quantity, "
+        "count(*) AS item_count "
+        "FROM invoices i JOIN invoice_items ii ON ii.invoice_id = i.id "
+        "GROUP BY i.issue_date, i.customer_id, i.user_id, ii.product_id, i.status",
+        # REFRESH ... CONCURRENTLY requires a unique index; day first serves the date range filter.
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_invoice_revenue_daily "
+        "ON invoice_revenue_daily (day, customer_id, user_id, product_id, status)",
+    ]),
+    ("0004_unpaid_invoices_index", [
+        "CREATE INDEX IF NOT EXISTS ix_invoices_unpaid_customer_due "
+        "ON invoices (customer_id, due_date) INCLUDE (issue_date, gross_total) "
+        "WHERE status IN ('OPEN', 'SENT', 'OVERDUE')",
+    ]),
+    ("0005_updated_at", [
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL DEFAULT now()"
+        for table in (
+            "customers", "products", "invoices", "orders", "quotations",
+            "invoice_items", "order_items", "quotation_items", "recurring_invoice_items",
+        )
+    ]),
+    ("0006_item_indexes", [
+        *[
+            f"CREATE INDEX IF NOT EXISTS ix_{item_table}_{parent_column}_id ON {item_table} ({parent_column}, id)"
+            for _, item_table, parent_column in DOCUMENT_ITEM_TABLES
+        ],
+        *[
+            f"CREATE INDEX IF NOT EXISTS ix_{item_table}_product_id ON {item_table} (product_id)"
+            for item_table in ("invoice_items", "order_items", "quotation_items", "recurring_invoice_items")
+        ],
+    ]),
+    ("0007_customer_search", [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "ALTER TABLE customers ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+        "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(company_name, '') || ' ' || "
+        "coalesce(email, '') || ' ' || coalesce(tax_id, ''))) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_customers_search_vector ON customers USING gin (search_vector)",
+        *[
+            f"CREATE INDEX IF NOT EXISTS ix_customers_{column}_trgm ON customers USING gin ({column} gin_trgm_ops)"
+            for column in ("name", "company_name", "email", "tax_id")
+        ],
+    ]),
+    ("0008_document_search", [
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_trgm ON {table} USING gin ({column} gin_trgm_ops)"
+        for table, columns in (
+            ("invoices", ("invoice_number", "notes")),
+            ("orders", ("order_number", "reference", "notes")),
+            ("quotations", ("quotation_number", "notes")),
+        )
+        for column in columns
+    ]),
+    ("0009_referential_deletes", _referential_delete_statements()),
+    ("0010_numeric_amounts", _numeric_amount_statements()),
+    ("0011_idempotency_claims", [
+        "ALTER TABLE idempotency_keys "
+        "ALTER COLUMN status_code DROP NOT NULL, "
+        "ALTER COLUMN response_body DROP NOT NULL",
+    ]),
+]
+
+
+def run_migrations(engine) -> None:
+    """
+    Applies all migrations that have not been recorded in schema_migrations yet.
+
+    An advisory lock serializes concurrent application starts, so each migration
+    runs exactly once even with several workers.
+
+    Args:
+        engine (Engine): SQLAlchemy engine of the application database.
+    """
+    with engine.begin() as connection:
+        connection.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": MIGRATIONS_LOCK_ID})
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version VARCHAR PRIMARY KEY, "
+            "applied_at TIMESTAMP NOT NULL DEFAULT now())"
+        ))
+        applied = set(connection.scalars(text("SELECT version FROM schema_migrations")))
+
+        for version, statements in MIGRATIONS:
+            if version in applied:
+                continue
+            for statement in statements:
+                connection.execute(text(statement))
+            connection.execute(
+                text("INSERT INTO schema_migrations (version) VALUES (:version)"),
+                {"version": version}
+            )
+            logger.info(f"Applied database migration '{version}'.")
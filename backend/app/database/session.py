@@ -3,22 +3,24 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from models.base import Base
+from app.database.migrations import run_migrations
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
+Session = sessionmaker(bind=engine, expire_on_commit=False)
 
 
 def init_db():
     """
-    Initializes the database by creating all defined tables.
+    Initializes the database by creating all defined tables and applying pending migrations.
 
     WARNING:
         This should only be run during first setup or if you want to recreate all tables.
         Existing data will remain intact.
     """
     Base.metadata.create_all(engine)
+    run_migrations(engine)
 
 
 def delete_db():
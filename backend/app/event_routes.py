@@ -0,0 +1,96 @@
+import json
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
+
+from models.enums import UserRole
+from services.outbox_service import DOCUMENT_ENTITY_TYPES
+from services.document_event_broker import document_event_broker, RESYNC
+from app.database.session import get_db
+from security.dependencies import require_viewer
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+HEARTBEAT_SECONDS = 15
+
+# Payload fields only employees and admins receive.
+INTERNAL_PAYLOAD_FIELDS = {
+    UserRole.VIEWER: ("notes",),
+}
+
+
+def _visible_event(event: dict, role: UserRole) -> dict:
+    """
+    Removes payload fields the role may not see.
+    """
+    hidden = INTERNAL_PAYLOAD_FIELDS.get(role, ())
+    if not hidden or not event.get("payload"):
+        return event
+    return {**event, "payload": {key: value for key, value in event["payload"].items() if key not in hidden}}
+
+
+def _sse(event_name: str, data) -> str:
+    """
+    Formats one Server-Sent Events message.
+    """
+    return f"event: {event_name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+@router.get("/documents")
+async def stream_document_events(
+        types: Optional[str] = Query(None),
+        db: Session = Depends(get_db),
+        user = Depends(require_viewer)
+):
+    """
+    Stream created, updated, status_changed and deleted events of invoices, orders and quotations
+    as Server-Sent Events once they are committed. Restrict with e.g. types=invoice,order.
+    A 'resync' event means events were missed and lists should be reloaded.
+    The stream ends when the client disconnects.
+    """
+    entity_types = set(DOCUMENT_ENTITY_TYPES)
+    if types:
+        entity_types = {entity_type.strip().lower() for entity_type in types.split(",")}
+        invalid = entity_types - set(DOCUMENT_ENTITY_TYPES)
+        if invalid:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid types: {', '.join(sorted(invalid))}. Allowed: {', '.join(DOCUMENT_ENTITY_TYPES)}."
+            )
+
+    role = user.role
+    # The stream may stay open for hours, so the connection must go back to the pool now.
+    await run_in_threadpool(db.close)
+
+    try:
+        queue = await document_event_broker.subscribe()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Event stream unavailable: {e}")
+
+    async def event_stream():
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if message is RESYNC:
+                    yield _sse("resync", {})
+                    continue
+                for event in message:
+                    if event["entity_type"] in entity_types:
+                        yield _sse(event["action"], _visible_event(event, role))
+        finally:
+            document_event_broker.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
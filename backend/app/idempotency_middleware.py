@@ -0,0 +1,135 @@
+import hashlib
+import logging
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.database.session import Session
+from services.cache import TTLCache
+from services.idempotency_service import IdempotencyService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+IN_PROGRESS_RETRY_AFTER_SECONDS = 1
+
+# Stored responses are immutable, so a process-local copy saves the database round trip on retries.
+response_cache = TTLCache(ttl_seconds=600, maxsize=1024)
+
+
+def _sha256(*parts: bytes) -> str:
+    """
+    Hashes several byte strings into one hex digest, separating them so they cannot run together.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class IdempotencyMiddleware(BaseHTTPMiddleware):
+    """
+    Makes POST requests with an Idempotency-Key header safe to retry.
+
+    The first response (any status below 500) is stored for IDEMPOTENCY_KEY_TTL_HOURS and
+    returned for every retry with the same key and the same request. Keys are scoped to the
+    caller's Authorization header. The key is claimed in the database before the request is
+    handled; a duplicate that arrives while the first request is still running gets 409 and
+    can retry. Reusing a key for a different request is rejected with 422.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+        if request.method != "POST" or not idempotency_key:
+            return await call_next(request)
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            return JSONResponse(
+                status_code=400,
+                content={"detail": f"{IDEMPOTENCY_HEADER} must not be longer than {MAX_KEY_LENGTH} characters."}
+            )
+
+        body = await request.body()
+        key = _sha256(request.headers.get("Authorization", "").encode(), idempotency_key.encode())
+        fingerprint = _sha256(
+            request.method.encode(), request.url.path.encode(), request.url.query.encode(), body
+        )
+
+        cached = response_cache.get(key)
+        if cached is not None:
+            return self._replay_if_same_request(fingerprint, *cached)
+
+        # Each service call is a short transaction; committing returns the connection to the pool,
+        # so none is held while the request itself is handled.
+        session = Session()
+        service = IdempotencyService(session)
+        claimed = False
+        try:
+            existing = await run_in_threadpool(service.claim, key, fingerprint)
+            if existing is not None and existing.status_code is not None:
+                cached = (existing.request_fingerprint, existing.status_code, existing.content_type, existing.response_body)
+                response_cache.set(key, cached)
+                return self._replay_if_same_request(fingerprint, *cached)
+            if existing is not None:
+                if existing.request_fingerprint != fingerprint:
+                    return self._key_reused()
+                return JSONResponse(
+                    status_code=409,
+                    content={"detail": f"A request with this {IDEMPOTENCY_HEADER} is still being processed."},
+                    headers={"Retry-After": str(IN_PROGRESS_RETRY_AFTER_SECONDS)}
+                )
+            claimed = True
+
+            response = await call_next(request)
+            response_body = b"".join([chunk async for chunk in response.body_iterator])
+
+            if response.status_code < 500:
+                content_type = response.headers.get("content-type")
+                await run_in_threadpool(service.save_response, key, response.status_code, content_type, response_body)
+                response_cache.set(key, (fingerprint, response.status_code, content_type, response_body))
+            else:
+                await run_in_threadpool(service.release, key)
+
+            return Response(
+                content=response_body,
+                status_code=response.status_code,
+                headers=dict(response.headers),
+                background=response.background
+            )
+        except Exception as e:
+            logger.error(f"Error handling idempotent request: {e}")
+            if claimed:
+                await run_in_threadpool(service.release, key)
+            raise
+        finally:
+            await run_in_threadpool(session.close)
+
+
+    @staticmethod
+    def _replay_if_same_request(fingerprint, stored_fingerprint, status_code, content_type, body) -> Response:
+        """
+        Returns the stored response, or 422 if the key was stored for a different request.
+        """
+        if fingerprint != stored_fingerprint:
+            return IdempotencyMiddleware._key_reused()
+        return Response(
+            content=body,
+            status_code=status_code,
+            media_type=content_type,
+            headers={REPLAYED_HEADER: "true"}
+        )
+
+
+    @staticmethod
+    def _key_reused() -> Response:
+        """
+        Returns the 422 response for a key that was used for a different request.
+        """
+        return JSONResponse(
+            status_code=422,
+            content={"detail": f"{IDEMPOTENCY_HEADER} was already used for a different request."}
+        )
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+
+from services.import_service import ImportService, format_error_report
+from schemas.import_schemas import ImportResultSchema
+from app.database.session import get_db
+from security.dependencies import require_admin
+
+router = APIRouter(prefix="/imports", tags=["imports"])
+
+
+def _import_response(result: dict, report_format: str, name: str):
+    """
+    Returns the import summary, or the error report as a CSV download if report_format is 'csv'.
+    """
+    if report_format != "csv":
+        return result
+    return Response(
+        content=format_error_report(result["errors"]),
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}_import_errors.csv"',
+            "X-Imported-Rows": str(result["imported"]),
+            "X-Failed-Rows": str(result["failed"]),
+        }
+    )
+
+
+@router.post("/customers", response_model=ImportResultSchema)
+def import_customers(
+        file: UploadFile = File(...),
+        report_format: str = Query("json", alias="format", pattern="^(json|csv)$"),
+        db: Session = Depends(get_db),
+        user = Depends(require_admin)
+):
+    """
+    Import customers from a CSV file with the columns email, name, company_name, phone,
+    address, tax_id and notes. Valid rows are imported, invalid rows are reported by line.
+    With format=csv the error report is returned as a CSV download.
+    """
+    try:
+        service = ImportService(db)
+        return _import_response(service.import_customers(file.file), report_format, "customers")
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/products", response_model=ImportResultSchema)
+def import_products(
+        file: UploadFile = File(...),
+        report_format: str = Query("json", alias="format", pattern="^(json|csv)$"),
+        db: Session = Depends(get_db),
+        user = Depends(require_admin)
+):
+    """
+    Import products from a CSV file with the columns name, unit_price, unit and description.
+    Valid rows are imported, invalid rows are reported by line.
+    With format=csv the error report is returned as a CSV download.
+    """
+    try:
+        service = ImportService(db)
+        return _import_response(service.import_products(file.file), report_format, "products")
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
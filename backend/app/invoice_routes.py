@@ -2,11 +2,21 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from pathlib import Path
-from typing import Optional
+from typing import Optional, List
 import os
 
 from services.invoice_service import InvoiceService
-from schemas.invoice_schemas import InvoiceCreateSchema, InvoiceUpdateStatusSchema, InvoiceResponseSchema
+from services.invoice_item_service import InvoiceItemService
+from services.expansion import parse_expand
+from services.status_transition_service import StatusTransitionService
+from schemas.invoice_schemas import (
+    InvoiceCreateSchema,
+    InvoiceUpdateStatusSchema,
+    InvoiceResponseSchema,
+    InvoiceListResponseSchema
+)
+from schemas.invoice_item_schemas import InvoiceItemPageSchema
+from schemas.status_batch_schemas import StatusBatchRequestSchema, StatusBatchResponseSchema
 from app.database.session import get_db
 from security.dependencies import require_admin, require_viewer, require_employee
 from pdf_service.generate_invoice_pdf import generate_pdf
@@ -16,23 +26,29 @@ router = APIRouter(prefix="/invoices", tags=["invoices"])
 PDF_DIR = Path(os.getenv("PDF_DIR", "/app/generated_pdfs"))
 
 
-@router.get("/")
+@router.get("/", response_model=List[InvoiceListResponseSchema], response_model_exclude_unset=True)
 def get_all_invoices(
         status: Optional[str] = Query(None),
         invoice_number: Optional[str] = Query(None),
         customer_id: Optional[int] = Query(None),
+        sort_by: Optional[str] = Query(None),
+        expand: Optional[str] = Query(None),
         db: Session = Depends(get_db),
         user = Depends(require_viewer)
 ):
     """
     Retrieve all invoices or filter by status, invoice number or customer ID.
+    Sort by e.g. 'gross_total' or '-gross_total'.
+    Embed related data with e.g. expand=items.product,customer,user.
     """
     service = InvoiceService(db)
     try:
         return service.get_all_invoices(
             status=status,
             invoice_number=invoice_number,
-            customer_id=customer_id
+            customer_id=customer_id,
+            sort_by=sort_by,
+            expand=parse_expand(expand)
         )
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
@@ -40,18 +56,18 @@ def get_all_invoices(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/")
+@router.post("/", response_model=InvoiceResponseSchema)
 def create_invoice(
         payload: InvoiceCreateSchema,
         db: Session = Depends(get_db),
         user = Depends(require_employee)
 ):
     """
-    Create a new invoice with optional due date, number, and notes.
+    Create a new invoice with optional due date, number, notes and items in one transaction.
     """
     service = InvoiceService(db)
     try:
-        service.create_invoice(
+        return service.create_invoice(
             customer_id=payload.customer_id,
             user_id=payload.user_id,
             issue_date=payload.issue_date,
@@ -59,8 +75,32 @@ def create_invoice(
             invoice_number=payload.invoice_number,
             status=payload.status,
             notes=payload.notes,
+            items=[item.model_dump() for item in payload.items]
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/status:batch", response_model=StatusBatchResponseSchema)
+def update_invoice_statuses(
+        payload: StatusBatchRequestSchema,
+        db: Session = Depends(get_db),
+        user = Depends(require_employee)
+):
+    """
+    Change the status of many invoices at once, given as ids or selected by a filter.
+    Invoices whose current status does not allow the change are reported per id and left as they are.
+    """
+    try:
+        service = StatusTransitionService(db)
+        return service.transition_batch(
+            "invoice",
+            payload.status,
+            ids=payload.ids,
+            filters=payload.filter.model_dump() if payload.filter else None
         )
-        return {"message": "Invoice created successfully."}
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
@@ -106,18 +146,24 @@ def delete_invoice(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{invoice_id}", response_model=InvoiceResponseSchema)
+@router.get("/{invoice_id}", response_model=InvoiceResponseSchema, response_model_exclude_unset=True)
 def get_invoice_by_id(
         invoice_id: int,
+        expand: Optional[str] = Query(None),
         db: Session = Depends(get_db),
         user = Depends(require_viewer)
 ):
     """
     Retrieve a specific invoice including its items.
+    Embed related data with e.g. expand=items.product,customer,user.
     """
     service = InvoiceService(db)
     try:
-        invoice = service.get_invoice_by_id_or_raise(invoice_id)
+        relations = parse_expand(expand) | {"items"}
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    try:
+        invoice = service.get_invoice_by_id_or_raise(invoice_id, relations)
         return invoice
     except ValueError as ve:
         raise HTTPException(status_code=404, detail=str(ve))
@@ -158,4 +204,29 @@ def generate_and_download_invoice_pdf(
             headers={"Cache-Control": "no-store"}
         )
     except ValueError as ve:
-        raise HTTPException(status_code=404, detail=str(ve))
\ No newline at end of file
+        raise HTTPException(status_code=404, detail=str(ve))
+
+
+@router.get("/{invoice_id}/items", response_model=InvoiceItemPageSchema, response_model_exclude_unset=True)
+def get_invoice_items(
+        invoice_id: int,
+        limit: int = Query(100, ge=1, le=1000),
+        offset: int = Query(0, ge=0),
+        sort_by: Optional[str] = Query(None),
+        db: Session = Depends(get_db),
+        user = Depends(require_viewer)
+):
+    """
+    Retrieve one page of the items of an invoice, sorted by id by default.
+    Sort by e.g. 'unit_price' or '-quantity'.
+    """
+    try:
+        invoice = InvoiceService(db).get_invoice_by_id_or_raise(invoice_id)
+    except ValueError as ve:
+        raise HTTPException(status_code=404, detail=str(ve))
+    try:
+        return InvoiceItemService(db).get_items_page(invoice, limit, offset, sort_by)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
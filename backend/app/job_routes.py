@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from services.job_run_service import JobRunService
+from schemas.job_run_schemas import JobRunResponseSchema
+from app.database.session import get_db
+from app.scheduler import JOBS, run_job
+from security.dependencies import require_admin
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/runs", response_model=List[JobRunResponseSchema])
+def get_job_runs(
+        job_name: Optional[str] = Query(None),
+        limit: int = Query(50, ge=1, le=500),
+        db: Session = Depends(get_db),
+        user = Depends(require_admin)
+):
+    """
+    Retrieve the most recent runs of scheduled jobs with their metrics.
+    """
+    service = JobRunService(db)
+    try:
+        return service.get_runs(job_name, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{job_name}/run")
+def trigger_job(
+        job_name: str,
+        user = Depends(require_admin)
+):
+    """
+    Run a scheduled job immediately (admin only).
+    """
+    jobs = {name: job for name, _, job in JOBS}
+    if job_name not in jobs:
+        raise HTTPException(status_code=404, detail=f"Job '{job_name}' not found.")
+
+    try:
+        result = run_job(job_name, jobs[job_name], raise_errors=True)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if result is None:
+        raise HTTPException(status_code=409, detail=f"Job '{job_name}' is already running.")
+    return {"message": f"Job '{job_name}' finished."}
@@ -15,13 +15,27 @@ from app.quotation_item_routes import router as quotation_item_router
 
 from app.invoice_routes import router as invoice_router
 from app.invoice_item_routes import router as invoice_item_router
+from app.recurring_invoice_routes import router as recurring_invoice_router
+
+from app.report_routes import router as report_router
+from app.job_routes import router as job_router
+from app.change_routes import router as change_router
+from app.event_routes import router as event_router
+from app.sync_routes import router as sync_router
+from app.search_routes import router as search_router
+from app.import_routes import router as import_router
 
 from app.database.session import init_db
+from app.idempotency_middleware import IdempotencyMiddleware
+from app.scheduler import start_scheduler, stop_scheduler
+from services.document_event_broker import document_event_broker
 
 app = FastAPI()
 
 init_db()
 
+# Middleware added last runs first, so CORS headers are also set on replayed responses.
+app.add_middleware(IdempotencyMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173"],
@@ -44,6 +58,26 @@ app.include_router(quotation_item_router)
 
 app.include_router(invoice_router)
 app.include_router(invoice_item_router)
+app.include_router(recurring_invoice_router)
+
+app.include_router(report_router)
+app.include_router(job_router)
+app.include_router(change_router)
+app.include_router(event_router)
+app.include_router(sync_router)
+app.include_router(search_router)
+app.include_router(import_router)
+
+
+@app.on_event("startup")
+def on_startup():
+    start_scheduler()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    stop_scheduler()
+    await document_event_broker.stop()
 
 
 @app.get("/")
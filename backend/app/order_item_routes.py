@@ -1,9 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from datetime import date
+from typing import Optional
 
 from services.order_item_service import OrderItemService
-from schemas.order_item_schemas import OrderItemCreateSchema, OrderItemUpdateSchema
+from schemas.order_item_schemas import (
+    OrderItemCreateSchema,
+    OrderItemUpdateSchema,
+    OrderItemBulkSchema,
+    OrderItemResponseSchema
+)
 from app.database.session import get_db
+from app.streaming import stream_json_list
 from security.dependencies import require_admin, require_employee
 
 router = APIRouter(prefix="/order-items", tags=["order-items"])
@@ -11,17 +20,27 @@ router = APIRouter(prefix="/order-items", tags=["order-items"])
 
 @router.get("/")
 def get_all_order_items(
+        product_id: Optional[int] = Query(None),
+        date_from: Optional[date] = Query(None),
+        date_to: Optional[date] = Query(None),
         db: Session = Depends(get_db),
         user = Depends(require_employee)
 ):
     """
-    Retrieve all order items.
+    Retrieve order items as a streamed JSON list, optionally filtered by product and by the
+    issue date of their order. Use GET /orders/{order_id}/items for the items of one order.
     """
-    service = OrderItemService(db)
-    try:
-        return service.get_all_items()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to.")
+    db.close()
+
+    return StreamingResponse(
+        stream_json_list(
+            lambda session: OrderItemService(session).stream_items(product_id, date_from, date_to),
+            OrderItemResponseSchema
+        ),
+        media_type="application/json"
+    )
 
 
 @router.post("/")
@@ -48,6 +67,32 @@ def create_order_item(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/bulk")
+def bulk_order_items(
+        payload: OrderItemBulkSchema,
+        db: Session = Depends(get_db),
+        user = Depends(require_employee)
+):
+    """
+    Create, update and delete many order items in one transaction and report per-row results.
+    Deleting items requires admin privileges.
+    """
+    if payload.delete and user.role.value != "ADMIN":
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+
+    service = OrderItemService(db)
+    try:
+        return service.apply_bulk(
+            creates=[row.model_dump() for row in payload.create],
+            updates=[row.model_dump() for row in payload.update],
+            deletes=payload.delete
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.put("/{item_id}")
 def update_order_item(
         item_id: int,
@@ -1,32 +1,51 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, List
 
 from services.order_service import OrderService
-from schemas.order_schemas import OrderCreateSchema, OrderUpdateStatusSchema, OrderResponseSchema
+from services.order_item_service import OrderItemService
+from services.expansion import parse_expand
+from services.status_transition_service import StatusTransitionService
+from schemas.order_schemas import (
+    OrderCreateSchema,
+    OrderUpdateStatusSchema,
+    OrderPatchSchema,
+    OrderConvertToInvoiceSchema,
+    OrderResponseSchema,
+    OrderListResponseSchema
+)
+from schemas.invoice_schemas import InvoiceResponseSchema
+from schemas.order_item_schemas import OrderItemPageSchema
+from schemas.status_batch_schemas import StatusBatchRequestSchema, StatusBatchResponseSchema
 from app.database.session import get_db
 from security.dependencies import require_employee, require_viewer, require_admin
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
 
-@router.get("/")
+@router.get("/", response_model=List[OrderListResponseSchema], response_model_exclude_unset=True)
 def get_all_orders(
         status: Optional[str] = Query(None),
         order_number: Optional[str] = Query(None),
         customer_id: Optional[str] = Query(None),
+        sort_by: Optional[str] = Query(None),
+        expand: Optional[str] = Query(None),
         db: Session = Depends(get_db),
         user = Depends(require_viewer)
 ):
     """
     Retrieve all orders, optionally filtered by status, order number or customer ID.
+    Sort by e.g. 'gross_total' or '-gross_total'.
+    Embed related data with e.g. expand=items.product,customer,user.
     """
     service = OrderService(db)
     try:
         orders = service.get_all_orders(
             status=status,
             order_number=order_number,
-            customer_id=customer_id
+            customer_id=customer_id,
+            sort_by=sort_by,
+            expand=parse_expand(expand)
         )
         return orders
     except ValueError as ve:
@@ -35,18 +54,18 @@ def get_all_orders(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/")
+@router.post("/", response_model=OrderResponseSchema)
 def create_order(
         payload: OrderCreateSchema,
         db: Session = Depends(get_db),
         user = Depends(require_employee)
 ):
     """
-    Create a new order.
+    Create a new order, optionally with its items, in one transaction.
     """
     service = OrderService(db)
     try:
-        service.create_order(
+        return service.create_order(
             customer_id=payload.customer_id,
             user_id=payload.user_id,
             issue_date=payload.issue_date,
@@ -55,9 +74,52 @@ def create_order(
             order_number=payload.order_number,
             status=payload.status,
             reference=payload.reference,
-            notes=payload.notes
+            notes=payload.notes,
+            items=[item.model_dump() for item in payload.items]
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.patch("/{order_id}")
+def patch_order(
+        order_id: int,
+        payload: OrderPatchSchema,
+        db: Session = Depends(get_db),
+        user = Depends(require_employee)
+):
+    """
+    Update any subset of an order's header fields in one request.
+    """
+    service = OrderService(db)
+    try:
+        return service.patch_order(order_id, payload.model_dump(exclude_unset=True))
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/status:batch", response_model=StatusBatchResponseSchema)
+def update_order_statuses(
+        payload: StatusBatchRequestSchema,
+        db: Session = Depends(get_db),
+        user = Depends(require_employee)
+):
+    """
+    Change the status of many orders at once, given as ids or selected by a filter.
+    Orders whose current status does not allow the change are reported per id and left as they are.
+    """
+    try:
+        service = StatusTransitionService(db)
+        return service.transition_batch(
+            "order",
+            payload.status,
+            ids=payload.ids,
+            filters=payload.filter.model_dump() if payload.filter else None
         )
-        return {"message": "Order created successfully."}
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
@@ -84,6 +146,31 @@ def update_order_status(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/{order_id}/convert-to-invoice", response_model=InvoiceResponseSchema)
+def convert_order_to_invoice(
+        order_id: int,
+        payload: Optional[OrderConvertToInvoiceSchema] = None,
+        db: Session = Depends(get_db),
+        user = Depends(require_employee)
+):
+    """
+    Convert an order into an invoice, copying its header and items.
+    """
+    payload = payload or OrderConvertToInvoiceSchema()
+    service = OrderService(db)
+    try:
+        return service.convert_to_invoice(
+            order_id,
+            invoice_number=payload.invoice_number,
+            issue_date=payload.issue_date,
+            due_date=payload.due_date
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.delete("/{order_id}")
 def delete_order(
         order_id: int,
@@ -103,18 +190,49 @@ def delete_order(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{order_id}", response_model=OrderResponseSchema)
+@router.get("/{order_id}", response_model=OrderResponseSchema, response_model_exclude_unset=True)
 def get_order_by_id(
         order_id: int,
+        expand: Optional[str] = Query(None),
         db: Session = Depends(get_db),
         user = Depends(require_viewer)
 ):
     """
     Retrieve a specific order including its items.
+    Embed related data with e.g. expand=items.product,customer,user.
     """
     service = OrderService(db)
     try:
-        order = service.get_order_by_id_or_raise(order_id)
+        relations = parse_expand(expand) | {"items"}
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    try:
+        order = service.get_order_by_id_or_raise(order_id, relations)
         return order
     except ValueError as ve:
-        raise HTTPException(status_code=404, detail=str(ve))
\ No newline at end of file
+        raise HTTPException(status_code=404, detail=str(ve))
+
+
+@router.get("/{order_id}/items", response_model=OrderItemPageSchema, response_model_exclude_unset=True)
+def get_order_items(
+        order_id: int,
+        limit: int = Query(100, ge=1, le=1000),
+        offset: int = Query(0, ge=0),
+        sort_by: Optional[str] = Query(None),
+        db: Session = Depends(get_db),
+        user = Depends(require_viewer)
+):
+    """
+    Retrieve one page of the items of an order, sorted by id by default.
+    Sort by e.g. 'unit_price' or '-quantity'.
+    """
+    try:
+        order = OrderService(db).get_order_by_id_or_raise(order_id)
+    except ValueError as ve:
+        raise HTTPException(status_code=404, detail=str(ve))
+    try:
+        return OrderItemService(db).get_items_page(order, limit, offset, sort_by)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from typing import List
 
 from services.product_service import ProductService
+from services.product_index import PRODUCT_SUGGEST_MAX_LIMIT
+from services.references import ReferenceInUseError
 from app.database.session import get_db
 from security.dependencies import require_admin, require_self_or_admin, require_employee
 from schemas.product_schemas import (
@@ -10,6 +13,10 @@ from schemas.product_schemas import (
     ProductUpdatePrice,
     ProductUpdateUnit,
     ProductUpdateDescription,
+    ProductPatch,
+    ProductSummarySchema,
+    ProductRepriceSchema,
+    ProductRepriceResponseSchema,
 )
 
 router = APIRouter(prefix="/products", tags=["products"])
@@ -30,6 +37,26 @@ def get_all_products(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/suggest", response_model=List[ProductSummarySchema])
+def suggest_products(
+        prefix: str = Query(..., min_length=1),
+        limit: int = Query(10, ge=1, le=PRODUCT_SUGGEST_MAX_LIMIT),
+        db: Session = Depends(get_db),
+        user = Depends(require_employee)
+):
+    """
+    Suggest products whose name, or a word of whose name or description, starts with the prefix.
+    Answered from an in-memory index, so it can be called on every keystroke.
+    """
+    try:
+        service = ProductService(db)
+        return service.suggest_products(prefix, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/")
 def create_product(
         payload: ProductCreate,
@@ -52,6 +79,51 @@ def create_product(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/reprice", response_model=ProductRepriceResponseSchema)
+def reprice_products(
+        payload: ProductRepriceSchema,
+        db: Session = Depends(get_db),
+        user = Depends(require_admin)
+):
+    """
+    Set, raise or lower the prices of all products matching the filters in one statement.
+    With dry_run the changes are only previewed; with update_open_documents the items and
+    totals of open orders and quotations follow the new prices.
+    """
+    try:
+        service = ProductService(db)
+        return service.reprice_products(
+            mode=payload.mode,
+            value=payload.value,
+            ids=payload.ids,
+            unit=payload.unit.value if payload.unit else None,
+            name_pattern=payload.name_pattern,
+            update_open_documents=payload.update_open_documents,
+            dry_run=payload.dry_run,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.patch("/{product_id}")
+def patch_product(
+        product_id: int,
+        payload: ProductPatch,
+        db: Session = Depends(get_db),
+        user = Depends(require_employee)
+):
+    """
+    Update any subset of a product's fields in one request.
+    """
+    try:
+        service = ProductService(db)
+        return service.patch_product(product_id, payload.model_dump(exclude_unset=True))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.put("/{product_id}/name")
 def update_product_name(
         product_id: int,
@@ -131,11 +203,13 @@ def delete_product(
         user = Depends(require_admin)
 ):
     """
-    Delete a product by ID.
+    Delete a product by ID. Products still used by document items cannot be deleted (409).
     """
     try:
         service = ProductService(db)
         service.delete_product(product_id)
         return {"message": "Product deleted successfully."}
+    except ReferenceInUseError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
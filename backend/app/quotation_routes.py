@@ -1,56 +1,96 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from datetime import date
-from typing import Optional
+from typing import Optional, List
 
 from services.quotation_service import QuotationService
-from schemas.quotation_schemas import QuotationCreateSchema, QuotationUpdateStatusSchema, QuotationResponseSchema
+from services.quotation_item_service import QuotationItemService
+from services.expansion import parse_expand
+from services.status_transition_service import StatusTransitionService
+from schemas.quotation_schemas import (
+    QuotationCreateSchema,
+    QuotationUpdateStatusSchema,
+    QuotationConvertToOrderSchema,
+    QuotationResponseSchema,
+    QuotationListResponseSchema
+)
+from schemas.order_schemas import OrderResponseSchema
+from schemas.quotation_item_schemas import QuotationItemPageSchema
+from schemas.status_batch_schemas import StatusBatchRequestSchema, StatusBatchResponseSchema
 from app.database.session import get_db
 from security.dependencies import require_admin, require_viewer, require_employee
 
 router = APIRouter(prefix="/quotations", tags=["quotations"])
 
 
-@router.get("/")
+@router.get("/", response_model=List[QuotationListResponseSchema], response_model_exclude_unset=True)
 def get_all_quotations(
         status: Optional[str] = Query(None),
         customer_id: Optional[int] = Query(None),
+        sort_by: Optional[str] = Query(None),
+        expand: Optional[str] = Query(None),
         db: Session = Depends(get_db),
         user = Depends(require_viewer)
 ):
     """
     Retrieve all quotations or filter by status.
+    Sort by e.g. 'gross_total' or '-gross_total'.
+    Embed related data with e.g. expand=items.product,customer,user.
     """
     service = QuotationService(db)
     try:
-        return service.get_all_quotations(status, customer_id)
+        return service.get_all_quotations(status, customer_id, sort_by, parse_expand(expand))
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/")
+@router.post("/", response_model=QuotationResponseSchema)
 def create_quotation(
         payload: QuotationCreateSchema,
         db: Session = Depends(get_db),
         user = Depends(require_employee)
 ):
     """
-    Create a new quotation.
+    Create a new quotation, optionally with its items, in one transaction.
     """
     service = QuotationService(db)
     try:
-        service.create_quotation(
+        return service.create_quotation(
             customer_id=payload.customer_id,
             user_id=payload.user_id,
             issue_date=payload.issue_date,
             due_date=payload.due_date,
             quotation_number=payload.quotation_number,
             status=payload.status,
-            notes=payload.notes
+            notes=payload.notes,
+            items=[item.model_dump() for item in payload.items]
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/status:batch", response_model=StatusBatchResponseSchema)
+def update_quotation_statuses(
+        payload: StatusBatchRequestSchema,
+        db: Session = Depends(get_db),
+        user = Depends(require_employee)
+):
+    """
+    Change the status of many quotations at once, given as ids or selected by a filter.
+    Quotations whose current status does not allow the change are reported per id and left as they are.
+    """
+    try:
+        service = StatusTransitionService(db)
+        return service.transition_batch(
+            "quotation",
+            payload.status,
+            ids=payload.ids,
+            filters=payload.filter.model_dump() if payload.filter else None
         )
-        return {"message": "Quotation created successfully."}
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
@@ -77,6 +117,31 @@ def update_quotation_status(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/{quotation_id}/convert-to-order", response_model=OrderResponseSchema)
+def convert_quotation_to_order(
+        quotation_id: int,
+        payload: Optional[QuotationConvertToOrderSchema] = None,
+        db: Session = Depends(get_db),
+        user = Depends(require_employee)
+):
+    """
+    Convert a quotation into an order, copying its header and items.
+    """
+    payload = payload or QuotationConvertToOrderSchema()
+    service = QuotationService(db)
+    try:
+        return service.convert_to_order(
+            quotation_id,
+            order_number=payload.order_number,
+            issue_date=payload.issue_date,
+            delivery_date=payload.delivery_date
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.delete("/{quotation_id}")
 def delete_quotation(
         quotation_id: int,
@@ -96,18 +161,49 @@ def delete_quotation(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{quotation_id}", response_model=QuotationResponseSchema)
+@router.get("/{quotation_id}", response_model=QuotationResponseSchema, response_model_exclude_unset=True)
 def get_quotation_by_id(
         quotation_id: int,
+        expand: Optional[str] = Query(None),
         db: Session = Depends(get_db),
         user = Depends(require_viewer)
 ):
     """
     Retrieve a specific quotation including its items.
+    Embed related data with e.g. expand=items.product,customer,user.
     """
     service = QuotationService(db)
     try:
-        quotation = service.get_quotation_by_id_or_raise(quotation_id)
+        relations = parse_expand(expand) | {"items"}
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    try:
+        quotation = service.get_quotation_by_id_or_raise(quotation_id, relations)
         return quotation
     except ValueError as ve:
-        raise HTTPException(status_code=404, detail=str(ve))
\ No newline at end of file
+        raise HTTPException(status_code=404, detail=str(ve))
+
+
+@router.get("/{quotation_id}/items", response_model=QuotationItemPageSchema, response_model_exclude_unset=True)
+def get_quotation_items(
+        quotation_id: int,
+        limit: int = Query(100, ge=1, le=1000),
+        offset: int = Query(0, ge=0),
+        sort_by: Optional[str] = Query(None),
+        db: Session = Depends(get_db),
+        user = Depends(require_viewer)
+):
+    """
+    Retrieve one page of the items of a quotation, sorted by id by default.
+    Sort by e.g. 'unit_price' or '-quantity'.
+    """
+    try:
+        quotation = QuotationService(db).get_quotation_by_id_or_raise(quotation_id)
+    except ValueError as ve:
+        raise HTTPException(status_code=404, detail=str(ve))
+    try:
+        return QuotationItemService(db).get_items_page(quotation, limit, offset, sort_by)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
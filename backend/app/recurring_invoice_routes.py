@@ -0,0 +1,152 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from functools import partial
+from typing import List, Optional
+
+from services.recurring_invoice_service import RecurringInvoiceService
+from schemas.recurring_invoice_schemas import (
+    RecurringInvoiceCreateSchema,
+    RecurringInvoiceUpdateActiveSchema,
+    RecurringInvoiceGenerateSchema,
+    RecurringInvoiceResponseSchema,
+    RecurringInvoiceGenerateResponseSchema
+)
+from app.database.session import get_db
+from app.scheduler import generate_recurring_invoices as generate_job, run_job
+from security.dependencies import require_admin, require_viewer, require_employee
+from pdf_service.render_invoice_pdfs import render_invoice_pdfs
+
+router = APIRouter(prefix="/recurring-invoices", tags=["recurring invoices"])
+
+
+@router.get("/", response_model=List[RecurringInvoiceResponseSchema])
+def get_all_recurring_invoices(
+        customer_id: Optional[int] = Query(None),
+        active: Optional[bool] = Query(None),
+        db: Session = Depends(get_db),
+        user = Depends(require_viewer)
+):
+    """
+    Retrieve all recurring invoices, optionally filtered by customer or active flag.
+    """
+    service = RecurringInvoiceService(db)
+    try:
+        return service.get_all_recurring_invoices(customer_id, active)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/", response_model=RecurringInvoiceResponseSchema)
+def create_recurring_invoice(
+        payload: RecurringInvoiceCreateSchema,
+        db: Session = Depends(get_db),
+        user = Depends(require_employee)
+):
+    """
+    Create a recurring invoice template (employee or admin only).
+    The first invoice is generated on start_date.
+    """
+    service = RecurringInvoiceService(db)
+    try:
+        return service.create_recurring_invoice(
+            customer_id=payload.customer_id,
+            user_id=user.id,
+            interval=payload.interval,
+            start_date=payload.start_date,
+            items=[item.model_dump() for item in payload.items],
+            payment_terms_days=payload.payment_terms_days,
+            notes=payload.notes
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/generate", response_model=RecurringInvoiceGenerateResponseSchema)
+def generate_recurring_invoices(
+        background_tasks: BackgroundTasks,
+        payload: Optional[RecurringInvoiceGenerateSchema] = None,
+        user = Depends(require_employee)
+):
+    """
+    Generate all invoices due up to run_date (default today) in bulk.
+    Runs as the scheduled generation job: it is recorded in the job runs and returns 409
+    while another run is in progress.
+    With render_pdfs, the PDFs are rendered in the background after the response.
+    """
+    payload = payload or RecurringInvoiceGenerateSchema()
+    try:
+        result = run_job(
+            "generate_recurring_invoices", partial(generate_job, run_date=payload.run_date), raise_errors=True
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if result is None:
+        raise HTTPException(status_code=409, detail="Recurring invoice generation is already running.")
+
+    pdfs_queued = payload.render_pdfs and bool(result["invoice_ids"])
+    if pdfs_queued:
+        background_tasks.add_task(render_invoice_pdfs, result["invoice_ids"])
+
+    return {
+        "generated": result["affected_rows"],
+        "invoice_ids": result["invoice_ids"],
+        "pdfs_queued": pdfs_queued
+    }
+
+
+@router.get("/{recurring_invoice_id}", response_model=RecurringInvoiceResponseSchema)
+def get_recurring_invoice_by_id(
+        recurring_invoice_id: int,
+        db: Session = Depends(get_db),
+        user = Depends(require_viewer)
+):
+    """
+    Retrieve a recurring invoice by its ID.
+    """
+    service = RecurringInvoiceService(db)
+    try:
+        return service.get_recurring_invoice_or_raise(recurring_invoice_id)
+    except ValueError as ve:
+        raise HTTPException(status_code=404, detail=str(ve))
+
+
+@router.put("/{recurring_invoice_id}/active")
+def update_recurring_invoice_active(
+        recurring_invoice_id: int,
+        payload: RecurringInvoiceUpdateActiveSchema,
+        db: Session = Depends(get_db),
+        user = Depends(require_employee)
+):
+    """
+    Pause or resume a recurring invoice.
+    """
+    service = RecurringInvoiceService(db)
+    try:
+        service.set_active(recurring_invoice_id, payload.active)
+        return {"message": "Recurring invoice updated."}
+    except ValueError as ve:
+        raise HTTPException(status_code=404, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/{recurring_invoice_id}")
+def delete_recurring_invoice(
+        recurring_invoice_id: int,
+        db: Session = Depends(get_db),
+        user = Depends(require_admin)
+):
+    """
+    Delete a recurring invoice (admin only). Generated invoices are kept.
+    """
+    service = RecurringInvoiceService(db)
+    try:
+        service.delete_recurring_invoice(recurring_invoice_id)
+        return {"message": "Recurring invoice deleted."}
+    except ValueError as ve:
+        raise HTTPException(status_code=404, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from datetime import date
+from typing import List, Optional
+
+from services.report_service import ReportService
+from schemas.report_schemas import RevenueReportRowSchema, ArAgingReportSchema
+from app.database.session import get_db
+from security.dependencies import require_employee
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+
+@router.get("/revenue", response_model=List[RevenueReportRowSchema])
+def get_revenue_report(
+        group_by: str = Query("month"),
+        date_from: Optional[date] = Query(None),
+        date_to: Optional[date] = Query(None),
+        status: Optional[List[str]] = Query(None),
+        db: Session = Depends(get_db),
+        user = Depends(require_employee)
+):
+    """
+    Net revenue grouped by customer, product, month or user.
+    Filter by invoice issue date range and one or more statuses (default: all except DRAFT and CANCELLED).
+    Data is refreshed every few minutes.
+    """
+    service = ReportService(db)
+    try:
+        return service.get_revenue(group_by, date_from, date_to, status)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/ar-aging", response_model=ArAgingReportSchema)
+def get_ar_aging_report(
+        as_of: Optional[date] = Query(None),
+        customer_id: Optional[int] = Query(None),
+        db: Session = Depends(get_db),
+        user = Depends(require_employee)
+):
+    """
+    Open amounts of unpaid invoices per customer, bucketed by days past the due date
+    (current, 1-30, 31-60, 61-90, over 90). Ages are calculated for as_of, default today.
+    """
+    service = ReportService(db)
+    try:
+        return service.get_ar_aging(as_of, customer_id)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
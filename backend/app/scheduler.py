@@ -0,0 +1,190 @@
+"""
+In-process scheduler for periodic background jobs.
+
+Every worker process starts the same daemon threads. Before a job runs, the worker takes a
+Postgres advisory lock named after the job on a dedicated connection, so a job never runs
+in two workers at once; workers that do not get the lock skip that run. Each executed run
+is recorded in the job_runs table with its duration and affected row count.
+"""
+import os
+import time
+import zlib
+import logging
+import threading
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy import text
+
+from app.database.session import Session, engine
+from services.idempotency_service import IdempotencyService
+from services.job_run_service import JobRunService
+from services.outbox_service import OutboxService
+from services.recurring_invoice_service import RecurringInvoiceService
+from services.report_service import ReportService, REVENUE_VIEW_REFRESH_SECONDS
+from services.status_transition_service import StatusTransitionService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCHEDULER_LOCK_CLASS = 740_003
+STATUS_TRANSITION_INTERVAL_SECONDS = int(os.getenv("STATUS_TRANSITION_INTERVAL_SECONDS", "3600"))
+PRUNE_INTERVAL_SECONDS = 3600
+
+_stop_event = threading.Event()
+
+
+def refresh_revenue_view(session) -> dict:
+    """
+    Refreshes the materialized view behind the revenue report.
+    """
+    ReportService(session).refresh_revenue_view()
+    return {}
+
+
+def mark_overdue_invoices(session) -> dict:
+    """
+    Marks invoices past their due date as OVERDUE.
+    """
+    return StatusTransitionService(session).mark_overdue_invoices()
+
+
+def expire_quotations(session) -> dict:
+    """
+    Marks quotations past their validity date as EXPIRED.
+    """
+    return StatusTransitionService(session).expire_quotations()
+
+
+def generate_recurring_invoices(session, run_date: Optional[date] = None) -> dict:
+    """
+    Generates all recurring invoices that are due up to run_date, defaults to today.
+    """
+    return RecurringInvoiceService(session).generate_due_invoices(run_date)
+
+
+def prune_job_runs(session) -> dict:
+    """
+    Deletes old job run records.
+    """
+    return JobRunService(session).prune_runs()
+
+
+def prune_outbox_events(session) -> dict:
+    """
+    Deletes change events past their retention period.
+    """
+    return OutboxService(session).prune_events()
+
+
+def prune_idempotency_keys(session) -> dict:
+    """
+    Deletes expired idempotency keys.
+    """
+    return IdempotencyService(session).prune_expired()
+
+
+JOBS = [
+    ("refresh_revenue_view", REVENUE_VIEW_REFRESH_SECONDS, refresh_revenue_view),
+    ("mark_overdue_invoices", STATUS_TRANSITION_INTERVAL_SECONDS, mark_overdue_invoices),
+    ("expire_quotations", STATUS_TRANSITION_INTERVAL_SECONDS, expire_quotations),
+    ("generate_recurring_invoices", STATUS_TRANSITION_INTERVAL_SECONDS, generate_recurring_invoices),
+    ("prune_job_runs", PRUNE_INTERVAL_SECONDS, prune_job_runs),
+    ("prune_idempotency_keys", PRUNE_INTERVAL_SECONDS, prune_idempotency_keys),
+    ("prune_outbox_events", PRUNE_INTERVAL_SECONDS, prune_outbox_events),
+]
+
+
+def job_lock_id(name: str) -> int:
+    """
+    Derives a stable advisory lock key from a job name.
+    """
+    return zlib.crc32(name.encode()) & 0x7FFFFFFF
+
+
+def run_job(name: str, job, raise_errors: bool = False) -> Optional[dict]:
+    """
+    Runs one job if no other worker is running it and records the run.
+
+    Args:
+        name (str): Name of the job.
+        job (Callable): Function taking a session and returning a dict with optional
+            affected_rows and batches.
+        raise_errors (bool): Re-raise a failure of the job after its run was recorded.
+
+    Returns:
+        dict: The job's result, or None if the lock was held elsewhere.
+    """
+    lock_params = {"lock_class": SCHEDULER_LOCK_CLASS, "lock_id": job_lock_id(name)}
+
+    with engine.connect() as lock_connection:
+        acquired = lock_connection.scalar(
+            text("SELECT pg_try_advisory_lock(:lock_class, :lock_id)"), lock_params
+        )
+        lock_connection.commit()
+        if not acquired:
+            return False
+
+        session = Session()
+        try:
+            started_at = datetime.now()
+            start = time.monotonic()
+            try:
+                result = job(session) or {}
+                status, error = "success", None
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Scheduled job '{name}' failed: {e}")
+                result, status, error = {}, "failed", e
+
+            JobRunService(session).record_run(
+                job_name=name,
+                status=status,
+                started_at=started_at,
+                duration_ms=(time.monotonic() - start) * 1000,
+                affected_rows=result.get("affected_rows", 0),
+                batches=result.get("batches", 0),
+                error=str(error) if error else None
+            )
+            if error and raise_errors:
+                raise error
+        finally:
+            session.close()
+            lock_connection.execute(
+                text("SELECT pg_advisory_unlock(:lock_class, :lock_id)"), lock_params
+            )
+            lock_connection.commit()
+    return result
+
+
+def _run_periodically(name: str, interval_seconds: float, job) -> None:
+    """
+    Runs a job every interval_seconds until the scheduler stops. Errors never stop the loop.
+    """
+    while not _stop_event.wait(interval_seconds):
+        try:
+            run_job(name, job)
+        except Exception as e:
+            logger.error(f"Scheduled job '{name}' could not be run: {e}")
+
+
+def start_scheduler() -> None:
+    """
+    Starts one daemon thread per job.
+    """
+    _stop_event.clear()
+    for name, interval_seconds, job in JOBS:
+        thread = threading.Thread(
+            target=_run_periodically,
+            args=(name, interval_seconds, job),
+            name=f"scheduler-{name}",
+            daemon=True
+        )
+        thread.start()
+        logger.info(f"Scheduled job '{name}' every {interval_seconds} seconds.")
+
+
+def stop_scheduler() -> None:
+    """
+    Signals all job threads to stop after their current run.
+    """
+    _stop_event.set()
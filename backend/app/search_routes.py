@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List
+
+from services.document_search_service import DocumentSearchService, DOCUMENT_SEARCH_MAX_LIMIT
+from schemas.search_schemas import DocumentSearchHitSchema
+from app.database.session import get_db
+from security.dependencies import require_viewer
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("/documents", response_model=List[DocumentSearchHitSchema])
+def search_documents(
+        q: str = Query(...),
+        limit: int = Query(20, ge=1, le=DOCUMENT_SEARCH_MAX_LIMIT),
+        db: Session = Depends(get_db),
+        user = Depends(require_viewer)
+):
+    """
+    Search invoices, orders and quotations by number, notes or order reference at once.
+    Each hit names its document type and customer.
+    """
+    try:
+        service = DocumentSearchService(db)
+        return service.search_documents(q, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
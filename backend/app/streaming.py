@@ -0,0 +1,38 @@
+from typing import Callable, Iterable, Iterator
+from pydantic import BaseModel
+
+from app.database.session import Session
+
+STREAM_CHUNK_ROWS = 500
+
+
+def stream_json_list(query: Callable[[Session], Iterable], schema: type[BaseModel]) -> Iterator[str]:
+    """
+    Streams the rows returned by query(session) as one JSON array for a StreamingResponse.
+
+    The rows are read with a dedicated session, because the request's session is already
+    closed when a streaming response starts sending. Rows are serialized in chunks of
+    STREAM_CHUNK_ROWS, so memory stays flat however many rows there are. Fields
+    that were not set, such as relations that were not loaded, are omitted.
+
+    Args:
+        query (Callable[[Session], Iterable]): Returns the rows for a session, ideally lazily.
+        schema (type[BaseModel]): Schema each row is serialized with.
+
+    Yields:
+        str: Parts of the JSON array.
+    """
+    session = Session()
+    try:
+        yield "["
+        chunk, first = [], True
+        for row in query(session):
+            chunk.append(schema.model_validate(row).model_dump_json(exclude_unset=True))
+            if len(chunk) == STREAM_CHUNK_ROWS:
+                yield ("" if first else ",") + ",".join(chunk)
+                chunk, first = [], False
+        if chunk:
+            yield ("" if first else ",") + ",".join(chunk)
+        yield "]"
+    finally:
+        session.close()
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from services.sync_service import SyncService
+from schemas.sync_schemas import SyncResponseSchema
+from app.database.session import get_db
+from security.dependencies import require_viewer
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("/", response_model=SyncResponseSchema)
+def sync(
+        since: Optional[str] = Query(None),
+        db: Session = Depends(get_db),
+        user = Depends(require_viewer)
+):
+    """
+    Retrieve customers, products, invoices, orders, quotations and their items changed or
+    deleted since the token of the previous sync. Without a token, or with a token older than
+    six days, all rows are returned with reset set. Repeat with next_token while has_more is set.
+    Items of deleted documents are not listed; remove them by their document ID.
+    """
+    service = SyncService(db)
+    try:
+        return service.get_changes_since(since)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,21 +1,26 @@
-from sqlalchemy import ForeignKey, Float
+from decimal import Decimal
+from sqlalchemy import ForeignKey, Numeric
 from sqlalchemy.orm import Mapped, mapped_column
 from models.base import Base
+from models.updated_at import UpdatedAt
 
-class BaseItem(Base):
+class BaseItem(UpdatedAt, Base):
     """
     Abstract base class for items used in documents such as invoices, orders, and quotations.
 
     Attributes:
         id (int): Primary key of the item.
         product_id (int): Foreign key referencing the product.
-        quantity (float): Quantity of the product.
-        unit_price (float): Price per unit.
+        quantity (Decimal): Quantity of the product, exact to three decimal places.
+        unit_price (Decimal): Price per unit, exact to the cent.
+        updated_at (datetime): Timestamp of the last change, see UpdatedAt.
     """
     __abstract__ = True
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), nullable=False)
-    quantity: Mapped[float] = mapped_column(nullable=False)
-    unit_price: Mapped[float] = mapped_column(nullable=False)
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="RESTRICT"), nullable=False, index=True
+    )
+    quantity: Mapped[Decimal] = mapped_column(Numeric(12, 3), nullable=False)
+    unit_price: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
 
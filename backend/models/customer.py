@@ -1,9 +1,18 @@
-from sqlalchemy import String, TIMESTAMP, func
+from sqlalchemy import String, TIMESTAMP, func, Computed, Index, DDL, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 
 from models.base import Base
+from models.updated_at import UpdatedAt
 
-class Customer(Base):
+CUSTOMER_SEARCH_COLUMNS = ("name", "company_name", "email", "tax_id")
+# 'simple' keeps names, emails and tax IDs as they are instead of stemming them as words.
+CUSTOMER_SEARCH_VECTOR_SQL = (
+    "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(company_name, '') || ' ' || "
+    "coalesce(email, '') || ' ' || coalesce(tax_id, ''))"
+)
+
+class Customer(UpdatedAt, Base):
     """
     Defines the Customer model for storing client-related information.
 
@@ -17,9 +26,20 @@ class Customer(Base):
         tax_id (str): Unique tax identification number.
         notes (str): Optional notes about the customer.
         created_at (datetime): Timestamp when the record was created.
+        updated_at (datetime): Timestamp of the last change, see UpdatedAt.
+        search_vector (tsvector): Generated full-text vector over the search columns,
+            deferred so it is never loaded or returned.
     """
 
     __tablename__ = "customers"
+    __table_args__ = (
+        Index("ix_customers_search_vector", "search_vector", postgresql_using="gin"),
+        # Trigram indexes serve substring (ILIKE '%...%') and fuzzy (<%) matches.
+        *[
+            Index(f"ix_customers_{column}_trgm", column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"})
+            for column in CUSTOMER_SEARCH_COLUMNS
+        ],
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String, nullable= True)
@@ -30,3 +50,10 @@ class Customer(Base):
     tax_id: Mapped[str] = mapped_column(String, unique=True, nullable=True)
     notes: Mapped[str] = mapped_column(String, nullable=True)
     created_at: Mapped[TIMESTAMP] = mapped_column(TIMESTAMP, server_default=func.now())
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed(CUSTOMER_SEARCH_VECTOR_SQL, persisted=True), nullable=True, deferred=True
+    )
+
+
+# The trigram operator class must exist before create_all() creates the indexes above.
+event.listen(Customer.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
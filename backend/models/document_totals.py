@@ -0,0 +1,25 @@
+from decimal import Decimal
+from sqlalchemy import Numeric, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class DocumentTotals:
+    """
+    Mixin adding stored totals to documents such as invoices, orders, and quotations.
+
+    The values are maintained by the item services within the same transaction as the
+    item change, so lists can show and sort by amount without reading the item tables.
+
+    Attributes:
+        net_total (Decimal): Sum of all rounded line totals.
+        tax_total (Decimal): VAT on the net total.
+        gross_total (Decimal): Net total plus VAT.
+        item_count (int): Number of items in the document.
+    """
+
+    net_total: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=0, server_default="0")
+    tax_total: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=0, server_default="0")
+    gross_total: Mapped[Decimal] = mapped_column(
+        Numeric(14, 2), nullable=False, default=0, server_default="0", index=True
+    )
+    item_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
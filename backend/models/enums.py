@@ -9,6 +9,7 @@ Includes:
     OrderStatus: States an order can be in (e.g., draft, open, shipped).
     QuotationStatus: States a quotation can be in (e.g., sent, accepted, expired).
     InvoiceStatus: States an invoice can be in (e.g., paid, overdue, cancelled).
+    RecurrenceInterval: Intervals of recurring invoices (e.g., monthly, yearly).
 """
 
 
@@ -57,3 +58,10 @@ class InvoiceStatus(enum.Enum):
     PAID = "paid"
     OVERDUE = "overdue"
     CANCELLED = "cancelled"
+
+
+class RecurrenceInterval(enum.Enum):
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+    QUARTERLY = "quarterly"
+    YEARLY = "yearly"
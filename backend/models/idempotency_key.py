@@ -0,0 +1,30 @@
+from sqlalchemy import String, Integer, LargeBinary, TIMESTAMP, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.base import Base
+
+class IdempotencyKey(Base):
+    """
+    Defines the IdempotencyKey model storing the first response to a POST request
+    sent with an Idempotency-Key header, so retries can be answered with it. The row is
+    written without a response when the first request starts.
+
+    Attributes:
+        key (str): SHA-256 of the caller's Authorization header and the Idempotency-Key.
+        request_fingerprint (str): SHA-256 of method, path, query and body of the first request.
+        status_code (int): HTTP status of the stored response, None while the request is running.
+        content_type (str): Content type of the stored response.
+        response_body (bytes): Body of the stored response, None while the request is running.
+        created_at (datetime): Timestamp when the response was stored.
+        expires_at (datetime): The key can be reused or a stale claim taken over after this time.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    request_fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    status_code: Mapped[int] = mapped_column(Integer, nullable=True)
+    content_type: Mapped[str] = mapped_column(String, nullable=True)
+    response_body: Mapped[bytes] = mapped_column(LargeBinary, nullable=True)
+    created_at: Mapped[TIMESTAMP] = mapped_column(TIMESTAMP, server_default=func.now())
+    expires_at: Mapped[TIMESTAMP] = mapped_column(TIMESTAMP, nullable=False, index=True)
@@ -1,10 +1,15 @@
-from sqlalchemy import String, Date, ForeignKey, Enum
+from sqlalchemy import String, Date, ForeignKey, Enum, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from models.base import Base
+from models.document_totals import DocumentTotals
+from models.updated_at import UpdatedAt
 from models.enums import InvoiceStatus
 
-class Invoice(Base):
+UNPAID_INVOICE_STATUSES = (InvoiceStatus.OPEN, InvoiceStatus.SENT, InvoiceStatus.OVERDUE)
+INVOICE_SEARCH_COLUMNS = ("invoice_number", "notes")
+
+class Invoice(DocumentTotals, UpdatedAt, Base):
     """
     Defines the Invoice model representing billing documents.
 
@@ -17,22 +22,49 @@ class Invoice(Base):
         invoice_number (str): Unique invoice identifier.
         status (InvoiceStatus): Status of the invoice (e.g., sent, paid).
         notes (str): Optional notes regarding the invoice.
+        order_id (int): Optional order this invoice was converted from.
+        net_total, tax_total, gross_total, item_count: Stored totals, see DocumentTotals.
+        updated_at (datetime): Timestamp of the last change, see UpdatedAt.
         items (list[InvoiceItem]): Related invoice items.
+        customer (Customer): Related customer, loaded on request.
+        user (User): Related user, loaded on request.
     """
 
     __tablename__ = "invoices"
+    __table_args__ = (
+        # Partial index for receivables reports, only unpaid invoices are indexed.
+        Index(
+            "ix_invoices_unpaid_customer_due",
+            "customer_id", "due_date",
+            postgresql_where=text("status IN ('OPEN', 'SENT', 'OVERDUE')"),
+            postgresql_include=["issue_date", "gross_total"]
+        ),
+        # Trigram indexes serve the substring matches of the global document search.
+        *[
+            Index(f"ix_invoices_{column}_trgm", column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"})
+            for column in INVOICE_SEARCH_COLUMNS
+        ],
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    customer_id: Mapped[int] = mapped_column(ForeignKey("customers.id"), nullable=False)
+    customer_id: Mapped[int] = mapped_column(
+        ForeignKey("customers.id", ondelete="RESTRICT"), nullable=False, index=True
+    )
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     issue_date: Mapped[Date] = mapped_column(Date, nullable=False)
     due_date: Mapped[Date] = mapped_column(Date, nullable=True)
     invoice_number: Mapped[str] = mapped_column(String, unique=True, nullable=True)
     status: Mapped[InvoiceStatus] = mapped_column(Enum(InvoiceStatus), nullable=False)
     notes: Mapped[str] = mapped_column(String, nullable=True)
+    order_id: Mapped[int] = mapped_column(
+        ForeignKey("orders.id", ondelete="SET NULL"), unique=True, nullable=True
+    )
 
     items = relationship(
         "InvoiceItem",
         back_populates="invoice",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
+    customer = relationship("Customer")
+    user = relationship("User")
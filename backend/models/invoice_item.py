@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from models.base_item import BaseItem
@@ -13,8 +13,12 @@ class InvoiceItem(BaseItem):
     """
 
     __tablename__ = "invoice_items"
+    __table_args__ = (
+        # Serves the paginated item list of one invoice, ordered by id.
+        Index("ix_invoice_items_invoice_id_id", "invoice_id", "id"),
+    )
 
-    invoice_id: Mapped[int] = mapped_column(ForeignKey("invoices.id"), nullable=False)
+    invoice_id: Mapped[int] = mapped_column(ForeignKey("invoices.id", ondelete="CASCADE"), nullable=False)
 
     invoice: Mapped["Invoice"] = relationship("Invoice", back_populates="items")
     product: Mapped["Product"] = relationship("Product", back_populates="items")
\ No newline at end of file
@@ -0,0 +1,32 @@
+from sqlalchemy import String, Integer, TIMESTAMP, Float
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.base import Base
+
+class JobRun(Base):
+    """
+    Defines the JobRun model recording each run of a scheduled background job.
+
+    Attributes:
+        id (int): Primary key.
+        job_name (str): Name of the job.
+        status (str): 'success' or 'failed'. Runs skipped because another worker held the job lock are not recorded.
+        started_at (datetime): Start of the run.
+        finished_at (datetime): End of the run.
+        duration_ms (float): Run time in milliseconds.
+        affected_rows (int): Number of rows changed by the run.
+        batches (int): Number of committed batches.
+        error (str): Error message of a failed run.
+    """
+
+    __tablename__ = "job_runs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    job_name: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    status: Mapped[str] = mapped_column(String, nullable=False)
+    started_at: Mapped[TIMESTAMP] = mapped_column(TIMESTAMP, nullable=False)
+    finished_at: Mapped[TIMESTAMP] = mapped_column(TIMESTAMP, nullable=True)
+    duration_ms: Mapped[float] = mapped_column(Float, nullable=True)
+    affected_rows: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    batches: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[str] = mapped_column(String, nullable=True)
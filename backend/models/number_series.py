@@ -0,0 +1,20 @@
+from sqlalchemy import String, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.base import Base
+
+class NumberSeries(Base):
+    """
+    Defines the NumberSeries model, a counter per document prefix and year.
+
+    Attributes:
+        prefix (str): Document prefix, e.g. 'RE' for invoices.
+        year (int): Year the numbers belong to.
+        last_value (int): Last allocated number.
+    """
+
+    __tablename__ = "number_series"
+
+    prefix: Mapped[str] = mapped_column(String, primary_key=True)
+    year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    last_value: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -1,10 +1,14 @@
-from sqlalchemy import String, Date, ForeignKey, Enum
+from sqlalchemy import String, Date, ForeignKey, Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from models.base import Base
+from models.document_totals import DocumentTotals
+from models.updated_at import UpdatedAt
 from models.enums import OrderStatus
 
-class Order(Base):
+ORDER_SEARCH_COLUMNS = ("order_number", "reference", "notes")
+
+class Order(DocumentTotals, UpdatedAt, Base):
     """
     Defines the Order model representing customer orders.
 
@@ -19,13 +23,27 @@ class Order(Base):
         status (OrderStatus): Status of the order (e.g., open, shipped).
         reference (str): Reference text.
         notes (str): Optional notes about the order.
+        quotation_id (int): Optional quotation this order was converted from.
+        net_total, tax_total, gross_total, item_count: Stored totals, see DocumentTotals.
+        updated_at (datetime): Timestamp of the last change, see UpdatedAt.
         items (list[OrderItem]): Related order items.
+        customer (Customer): Related customer, loaded on request.
+        user (User): Related user, loaded on request.
     """
 
     __tablename__ = "orders"
+    __table_args__ = (
+        # Trigram indexes serve the substring matches of the global document search.
+        *[
+            Index(f"ix_orders_{column}_trgm", column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"})
+            for column in ORDER_SEARCH_COLUMNS
+        ],
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    customer_id: Mapped[int] = mapped_column(ForeignKey("customers.id"), nullable=False)
+    customer_id: Mapped[int] = mapped_column(
+        ForeignKey("customers.id", ondelete="RESTRICT"), nullable=False, index=True
+    )
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     issue_date: Mapped[Date] = mapped_column(Date, nullable=False)
     due_date: Mapped[Date] = mapped_column(Date, nullable=True)
@@ -34,9 +52,15 @@ class Order(Base):
     status: Mapped[OrderStatus] = mapped_column(Enum(OrderStatus), nullable=False)
     reference: Mapped[str] = mapped_column(String, nullable=True)
     notes: Mapped[str] = mapped_column(String, nullable=True)
+    quotation_id: Mapped[int] = mapped_column(
+        ForeignKey("quotations.id", ondelete="SET NULL"), unique=True, nullable=True
+    )
 
     items = relationship(
         "OrderItem",
         backref="order",
-        cascade="all, delete-orphan"
-    )
\ No newline at end of file
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+    customer = relationship("Customer")
+    user = relationship("User")
\ No newline at end of file
@@ -1,5 +1,5 @@
-from sqlalchemy import ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from models.base_item import BaseItem
 
@@ -11,5 +11,11 @@ class OrderItem(BaseItem):
     """
 
     __tablename__ = "order_items"
+    __table_args__ = (
+        # Serves the paginated item list of one order, ordered by id.
+        Index("ix_order_items_order_id_id", "order_id", "id"),
+    )
 
-    order_id: Mapped[int] = mapped_column(ForeignKey("orders.id"), nullable=False)
+    order_id: Mapped[int] = mapped_column(ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
+
+    product: Mapped["Product"] = relationship("Product")
@@ -0,0 +1,34 @@
+from sqlalchemy import String, Integer, BigInteger, TIMESTAMP, Index, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.base import Base
+
+class OutboxEvent(Base):
+    """
+    Defines the OutboxEvent model, one row per change written in the same transaction as the change.
+
+    Attributes:
+        id (int): Primary key, increasing in insert order.
+        txid (int): ID of the writing transaction, used to read the feed without gaps.
+        entity_type (str): Changed entity, e.g. 'invoice' or 'order_item'.
+        entity_id (int): ID of the changed entity.
+        action (str): 'created', 'updated', 'status_changed', or 'deleted'.
+        payload (dict): Changed fields and parent IDs.
+        created_at (datetime): Timestamp of the change.
+    """
+
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        Index("ix_outbox_events_txid_id", "txid", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    txid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=text("(pg_current_xact_id()::text::bigint)")
+    )
+    entity_type: Mapped[str] = mapped_column(String, nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    action: Mapped[str] = mapped_column(String, nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=True)
+    created_at: Mapped[TIMESTAMP] = mapped_column(TIMESTAMP, nullable=False, server_default=func.now(), index=True)
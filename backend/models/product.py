@@ -1,11 +1,13 @@
-from sqlalchemy import String, Float, TIMESTAMP, func, Enum
+from decimal import Decimal
+from sqlalchemy import String, Numeric, TIMESTAMP, func, Enum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from models.base import Base
+from models.updated_at import UpdatedAt
 from models.enums import UnitType
 from models.invoice_item import InvoiceItem
 
-class Product(Base):
+class Product(UpdatedAt, Base):
     """
     Defines the Product model representing items that can be sold.
 
@@ -13,9 +15,10 @@ class Product(Base):
         id (int): Primary key.
         name (str): Unique product name.
         description (str): Optional description of the product.
-        unit_price (float): Price per unit of the product.
+        unit_price (Decimal): Price per unit of the product, exact to the cent.
         unit (UnitType): Unit of measurement (e.g., piece, kg).
         created_at (datetime): Timestamp when the product was added.
+        updated_at (datetime): Timestamp of the last change, see UpdatedAt.
     """
 
     __tablename__ = "products"
@@ -23,8 +26,10 @@ class Product(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String, nullable= False, unique=True)
     description: Mapped[str] = mapped_column(String, nullable=True)
-    unit_price: Mapped[float] = mapped_column(Float, nullable= False)
+    unit_price: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable= False)
     unit: Mapped[UnitType] = mapped_column(Enum(UnitType), nullable= False)
     created_at: Mapped[TIMESTAMP] = mapped_column(TIMESTAMP, server_default=func.now())
 
-    items: Mapped[list["InvoiceItem"]] = relationship("InvoiceItem", back_populates="product")
\ No newline at end of file
+    items: Mapped[list["InvoiceItem"]] = relationship(
+        "InvoiceItem", back_populates="product", passive_deletes="all"
+    )
\ No newline at end of file
@@ -1,10 +1,14 @@
-from sqlalchemy import String, Date, ForeignKey, Enum
+from sqlalchemy import String, Date, ForeignKey, Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from models.base import Base
+from models.document_totals import DocumentTotals
+from models.updated_at import UpdatedAt
 from models.enums import QuotationStatus
 
-class Quotation(Base):
+QUOTATION_SEARCH_COLUMNS = ("quotation_number", "notes")
+
+class Quotation(DocumentTotals, UpdatedAt, Base):
     """
     Defines the Quotation model representing sales offers to customers.
 
@@ -17,13 +21,26 @@ class Quotation(Base):
         quotation_number (str): Unique identifier for the quotation.
         status (QuotationStatus): Current status of the quotation.
         notes (str): Optional notes regarding the quotation.
+        net_total, tax_total, gross_total, item_count: Stored totals, see DocumentTotals.
+        updated_at (datetime): Timestamp of the last change, see UpdatedAt.
         items (list[QuotationItem]): Related quotation items.
+        customer (Customer): Related customer, loaded on request.
+        user (User): Related user, loaded on request.
     """
 
     __tablename__ = "quotations"
+    __table_args__ = (
+        # Trigram indexes serve the substring matches of the global document search.
+        *[
+            Index(f"ix_quotations_{column}_trgm", column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"})
+            for column in QUOTATION_SEARCH_COLUMNS
+        ],
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    customer_id: Mapped[int] = mapped_column(ForeignKey("customers.id"), nullable=False)
+    customer_id: Mapped[int] = mapped_column(
+        ForeignKey("customers.id", ondelete="RESTRICT"), nullable=False, index=True
+    )
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     issue_date: Mapped[Date] = mapped_column(Date, nullable=False)
     due_date: Mapped[Date] = mapped_column(Date, nullable=True)
@@ -31,4 +48,6 @@ class Quotation(Base):
     status: Mapped[QuotationStatus] = mapped_column(Enum(QuotationStatus), nullable=False)
     notes: Mapped[str] = mapped_column(String, nullable=True)
 
-    items = relationship("QuotationItem", backref="order", cascade="all, delete-orphan")
\ No newline at end of file
+    items = relationship("QuotationItem", backref="order", cascade="all, delete-orphan", passive_deletes=True)
+    customer = relationship("Customer")
+    user = relationship("User")
\ No newline at end of file
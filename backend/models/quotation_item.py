@@ -1,5 +1,5 @@
-from sqlalchemy import ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from models.base_item import BaseItem
 
@@ -11,5 +11,11 @@ class QuotationItem(BaseItem):
     """
 
     __tablename__ = "quotation_items"
+    __table_args__ = (
+        # Serves the paginated item list of one quotation, ordered by id.
+        Index("ix_quotation_items_quotation_id_id", "quotation_id", "id"),
+    )
 
-    quotation_id: Mapped[int] = mapped_column(ForeignKey("quotations.id"), nullable=False)
+    quotation_id: Mapped[int] = mapped_column(ForeignKey("quotations.id", ondelete="CASCADE"), nullable=False)
+
+    product: Mapped["Product"] = relationship("Product")
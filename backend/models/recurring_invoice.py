@@ -0,0 +1,49 @@
+from sqlalchemy import String, Date, ForeignKey, Enum, Integer, Boolean, TIMESTAMP, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from models.base import Base
+from models.enums import RecurrenceInterval
+
+class RecurringInvoice(Base):
+    """
+    Defines the RecurringInvoice model, a template from which invoices are generated periodically.
+
+    Attributes:
+        id (int): Primary key.
+        customer_id (int): Foreign key referencing the customer to invoice.
+        user_id (int): Foreign key referencing the user the invoices are issued by.
+        interval (RecurrenceInterval): How often an invoice is generated.
+        start_date (date): Issue date of the first invoice, later dates are derived from it.
+        next_run_date (date): Issue date of the next invoice to generate.
+        last_run_date (date): Issue date of the last generated invoice.
+        run_count (int): Number of invoices generated so far.
+        payment_terms_days (int): Optional days between issue and due date.
+        notes (str): Optional notes copied to each invoice.
+        active (bool): Only active templates generate invoices.
+        created_at (datetime): Timestamp when the template was created.
+        items (list[RecurringInvoiceItem]): Items copied to each invoice.
+    """
+
+    __tablename__ = "recurring_invoices"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    customer_id: Mapped[int] = mapped_column(
+        ForeignKey("customers.id", ondelete="RESTRICT"), nullable=False, index=True
+    )
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    interval: Mapped[RecurrenceInterval] = mapped_column(Enum(RecurrenceInterval), nullable=False)
+    start_date: Mapped[Date] = mapped_column(Date, nullable=False)
+    next_run_date: Mapped[Date] = mapped_column(Date, nullable=False, index=True)
+    last_run_date: Mapped[Date] = mapped_column(Date, nullable=True)
+    run_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    payment_terms_days: Mapped[int] = mapped_column(Integer, nullable=True)
+    notes: Mapped[str] = mapped_column(String, nullable=True)
+    active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    created_at: Mapped[TIMESTAMP] = mapped_column(TIMESTAMP, server_default=func.now())
+
+    items = relationship(
+        "RecurringInvoiceItem",
+        back_populates="recurring_invoice",
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
@@ -0,0 +1,19 @@
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from models.base_item import BaseItem
+
+class RecurringInvoiceItem(BaseItem):
+    """
+    Defines the RecurringInvoiceItem model which inherits from BaseItem.
+
+    Each item belongs to a recurring invoice template and is copied to every generated invoice.
+    """
+
+    __tablename__ = "recurring_invoice_items"
+
+    recurring_invoice_id: Mapped[int] = mapped_column(
+        ForeignKey("recurring_invoices.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+
+    recurring_invoice: Mapped["RecurringInvoice"] = relationship("RecurringInvoice", back_populates="items")
@@ -0,0 +1,19 @@
+from datetime import datetime
+from sqlalchemy import TIMESTAMP, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class UpdatedAt:
+    """
+    Mixin adding a last-modified timestamp.
+
+    The value is set by the database on insert and by SQLAlchemy on every ORM or Core UPDATE,
+    so offline clients can resolve conflicts against their local copy.
+
+    Attributes:
+        updated_at (datetime): Start of the transaction that last changed the row.
+    """
+
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP, nullable=False, server_default=func.now(), onupdate=func.now()
+    )
@@ -0,0 +1,60 @@
+import logging
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload, joinedload
+
+from app.database.session import Session
+from models.customer import Customer
+from models.invoice import Invoice
+from models.invoice_item import InvoiceItem
+from pdf_service.generate_invoice_pdf import generate_pdf
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RENDER_BATCH_SIZE = 200
+
+
+def render_invoice_pdfs(invoice_ids: list[int]) -> int:
+    """
+    Renders the PDFs of many invoices, meant to run as a background task after bulk generation.
+
+    Invoices are loaded in batches with their items, products and customers. A failing invoice
+    is logged and skipped.
+
+    Args:
+        invoice_ids (list[int]): IDs of the invoices to render.
+
+    Returns:
+        int: Number of rendered PDFs.
+    """
+    rendered = 0
+    session = Session()
+    try:
+        for start in range(0, len(invoice_ids), RENDER_BATCH_SIZE):
+            batch_ids = invoice_ids[start:start + RENDER_BATCH_SIZE]
+            invoices = session.scalars(
+                select(Invoice)
+                .options(selectinload(Invoice.items).joinedload(InvoiceItem.product))
+                .where(Invoice.id.in_(batch_ids))
+            ).all()
+            customers = {
+                customer.id: customer
+                for customer in session.scalars(
+                    select(Customer).where(Customer.id.in_({invoice.customer_id for invoice in invoices}))
+                )
+            }
+
+            for invoice in invoices:
+                customer = customers[invoice.customer_id]
+                street, _, city = (customer.address or "").partition(",")
+                try:
+                    generate_pdf(invoice, customer.company_name, customer.name, street, city.strip())
+                    rendered += 1
+                except Exception as e:
+                    logger.error(f"Error rendering PDF for invoice id {invoice.id}: {e}")
+            session.expunge_all()
+    finally:
+        session.close()
+
+    logger.info(f"{rendered} of {len(invoice_ids)} invoice PDFs rendered.")
+    return rendered
@@ -1,10 +1,12 @@
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 from reportlab.platypus import Table, LongTable, TableStyle, Paragraph, Frame, Spacer
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import ParagraphStyle
 from reportlab.pdfbase import pdfmetrics
 
+from services.document_totals_service import CENT, VAT_RATE, line_total
+
 LEFT, RIGHT, TOP, BOTTOM = 40, 40, 40, 40
 FONT_BODY = "Vera" if "Vera" in pdfmetrics.getRegisteredFontNames() else "Helvetica"
 FONT_BOLD = "VeraBd" if "VeraBd" in pdfmetrics.getRegisteredFontNames() else "Helvetica-Bold"
@@ -18,7 +20,7 @@ def _eur(x):
     s = f"{v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
     return f"{s} €"
 
-def draw_items_table_and_totals(c, items, y_top=470, y_bottom=230, vat_rate=Decimal("0.19")):
+def draw_items_table_and_totals(c, items, y_top=470, y_bottom=230, vat_rate=VAT_RATE):
     page_w, page_h = A4
     usable_w = page_w - LEFT - RIGHT
     w_pos, w_qty, w_unit, w_unit_price, w_total = 40, 45, 55, 80, 90
@@ -36,19 +38,20 @@ def draw_items_table_and_totals(c, items, y_top=470, y_bottom=230, vat_rate=Deci
     subtotal = Decimal("0.00")
     for idx, it in enumerate(items, start=1):
         pos = it.get("position", idx)
-        qty = Decimal(str(it["qty"]))
+        qty = it["qty"]
         unit = it.get("unit", "")
         desc = it.get("description", "")
-        unit_price = Decimal(str(it["unit_price_net"]))
-        line_total = (qty * unit_price).quantize(Decimal("0.01"))
-        subtotal += line_total
+        unit_price = it["unit_price_net"]
+        # Rounded like the stored document totals, so the PDF always matches them to the cent.
+        item_total = line_total(qty, unit_price)
+        subtotal += item_total
         data.append([
             Paragraph(str(pos), STYLE_BODY),
-            Paragraph(f"{qty.normalize()}", STYLE_NUM),
+            Paragraph(f"{Decimal(qty).normalize():f}", STYLE_NUM),
             Paragraph(unit, STYLE_BODY),
             Paragraph(desc, STYLE_BODY),
             Paragraph(_eur(unit_price), STYLE_NUM),
-            Paragraph(_eur(line_total), STYLE_NUM),
+            Paragraph(_eur(item_total), STYLE_NUM),
         ])
     items_table = LongTable(data, colWidths=col_widths, repeatRows=1, hAlign="LEFT")
     items_table.setStyle(TableStyle([
@@ -68,7 +71,7 @@ def draw_items_table_and_totals(c, items, y_top=470, y_bottom=230, vat_rate=Deci
         ("LINEBELOW", (0, 1), (-1, -1), 0.25, colors.HexColor("#DDDDDD")),
         ("BOX", (0, 0), (-1, -1), 0.25, colors.HexColor("#BBBBBB")),
     ]))
-    vat_amount = (subtotal * vat_rate).quantize(Decimal("0.01"))
+    vat_amount = (subtotal * vat_rate).quantize(CENT, rounding=ROUND_HALF_UP)
     total_gross = subtotal + vat_amount
     sums_data = [
         [Paragraph("Nettopreis", STYLE_BODY), Paragraph(_eur(subtotal), STYLE_NUM)],
@@ -102,9 +105,9 @@ def make_pdf_items_from_invoice(invoice):
         prod = it.product
         pdf_items.append({
             "position": idx,
-            "qty": Decimal(str(it.quantity)),
+            "qty": it.quantity,
             "unit": (getattr(prod, "unit", None) or "Stück"),
             "description": getattr(prod, "name", "") or getattr(prod, "description", ""),
-            "unit_price_net": Decimal(str(it.unit_price)),
+            "unit_price_net": it.unit_price,
         })
     return pdf_items
@@ -43,3 +43,34 @@ class CustomerUpdateNotesSchema(BaseModel):
     Schema for updating a customer's notes field.
     """
     new_notes: str
+
+class CustomerPatchSchema(BaseModel):
+    """
+    Schema for partially updating a customer. Only the fields sent are changed.
+    """
+    name: Optional[str] = None
+    company_name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    address: Optional[str] = None
+    tax_id: Optional[str] = None
+    notes: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_name_or_company(self) -> "CustomerPatchSchema":
+        if {"name", "company_name"} <= self.model_fields_set and not self.name and not self.company_name:
+            raise ValueError(
+                "At least one of 'name' or 'company_name' must be provided.")
+        return self
+
+class CustomerSummarySchema(BaseModel):
+    """
+    Schema for a customer embedded in another response.
+    """
+    id: int
+    name: Optional[str]
+    company_name: Optional[str]
+    email: Optional[str]
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,31 @@
+from typing import ClassVar
+from pydantic import BaseModel, model_validator
+from sqlalchemy import inspect
+from sqlalchemy.orm import InstanceState
+
+
+class ExpandableSchema(BaseModel):
+    """
+    Base schema for ORM objects with relations that are only returned on request.
+
+    Relations named in expandable are read only if they were eager-loaded, so serializing a
+    list never triggers one lazy load per row. Relations that were not loaded stay unset and
+    are omitted by routes using response_model_exclude_unset.
+    """
+    expandable: ClassVar[tuple[str, ...]] = ()
+
+    @model_validator(mode="before")
+    @classmethod
+    def skip_unloaded_relations(cls, data):
+        state = inspect(data, raiseerr=False)
+        if not isinstance(state, InstanceState):
+            return data
+
+        skipped = state.unloaded.intersection(cls.expandable)
+        if not skipped:
+            return data
+        return {
+            name: getattr(data, name)
+            for name in cls.model_fields
+            if name not in skipped and hasattr(data, name)
+        }
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class ImportErrorSchema(BaseModel):
+    """
+    Schema for one rejected CSV row of an import.
+    """
+    line: int
+    message: str
+
+class ImportResultSchema(BaseModel):
+    """
+    Schema for the summary of a CSV import.
+    """
+    total_rows: int
+    imported: int
+    failed: int
+    skipped: int
+    errors: List[ImportErrorSchema]
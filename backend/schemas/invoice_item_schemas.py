@@ -1,4 +1,9 @@
-from pydantic import BaseModel, confloat
+from decimal import Decimal
+from pydantic import BaseModel, condecimal
+from typing import Optional, List, ClassVar
+
+from schemas.expandable_schema import ExpandableSchema
+from schemas.product_schemas import ProductSummarySchema
 
 class InvoiceItemCreateSchema(BaseModel):
     """
@@ -6,24 +11,61 @@ class InvoiceItemCreateSchema(BaseModel):
     """
     invoice_id: int
     product_id: int
-    quantity: confloat(ge=0)
-    unit_price: confloat(ge=0)
+    quantity: condecimal(ge=0, max_digits=12, decimal_places=3)
+    unit_price: condecimal(ge=0, max_digits=12, decimal_places=2)
+
+class InvoiceItemInlineSchema(BaseModel):
+    """
+    Schema for an item created together with its invoice.
+    The product's current unit price is used if unit_price is omitted.
+    """
+    product_id: int
+    quantity: condecimal(ge=0, max_digits=12, decimal_places=3)
+    unit_price: Optional[condecimal(ge=0, max_digits=12, decimal_places=2)] = None
 
 class InvoiceItemUpdateSchema(BaseModel):
     """
     Schema for updating an invoice item.
     """
-    new_quantity: confloat(ge=0)
-    new_unit_price: confloat(ge=0)
+    new_quantity: condecimal(ge=0, max_digits=12, decimal_places=3)
+    new_unit_price: condecimal(ge=0, max_digits=12, decimal_places=2)
+
+class InvoiceItemBulkUpdateSchema(BaseModel):
+    """
+    Schema for one row of a bulk item update. Only the fields sent are changed.
+    """
+    id: int
+    quantity: Optional[condecimal(ge=0, max_digits=12, decimal_places=3)] = None
+    unit_price: Optional[condecimal(ge=0, max_digits=12, decimal_places=2)] = None
+
+class InvoiceItemBulkSchema(BaseModel):
+    """
+    Schema for creating, updating and deleting many invoice items in one request.
+    """
+    create: List[InvoiceItemCreateSchema] = []
+    update: List[InvoiceItemBulkUpdateSchema] = []
+    delete: List[int] = []
 
-class InvoiceItemResponseSchema(BaseModel):
+class InvoiceItemResponseSchema(ExpandableSchema):
     """
-    Schema for returning invoice item data.
+    Schema for returning invoice item data. product is only included if it was expanded.
     """
+    expandable: ClassVar[tuple[str, ...]] = ("product",)
+
     id: int
     product_id: int
-    quantity: float
-    unit_price: float
+    quantity: Decimal
+    unit_price: Decimal
+    product: Optional[ProductSummarySchema] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class InvoiceItemPageSchema(BaseModel):
+    """
+    Schema for one page of the items of an invoice.
+    """
+    items: List[InvoiceItemResponseSchema]
+    total: int
+    limit: int
+    offset: int
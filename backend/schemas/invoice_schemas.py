@@ -1,8 +1,13 @@
 from pydantic import BaseModel
 from datetime import date
-from typing import Optional, List
+from decimal import Decimal
+from typing import Optional, List, ClassVar
 
-from schemas.invoice_item_schemas import InvoiceItemResponseSchema
+from models.enums import InvoiceStatus
+from schemas.invoice_item_schemas import InvoiceItemInlineSchema, InvoiceItemResponseSchema
+from schemas.expandable_schema import ExpandableSchema
+from schemas.customer_schemas import CustomerSummarySchema
+from schemas.user_schemas import UserSummarySchema
 
 class InvoiceCreateSchema(BaseModel):
     """
@@ -15,6 +20,7 @@ class InvoiceCreateSchema(BaseModel):
     invoice_number: Optional[str] = None
     status: str = "DRAFT"
     notes: Optional[str] = None
+    items: List[InvoiceItemInlineSchema] = []
 
 class InvoiceUpdateStatusSchema(BaseModel):
     """
@@ -22,19 +28,37 @@ class InvoiceUpdateStatusSchema(BaseModel):
     """
     new_status: str
 
-class InvoiceResponseSchema(BaseModel):
+class InvoiceResponseSchema(ExpandableSchema):
     """
     Schema for returning an invoice with its items.
+    customer and user are only included if they were expanded.
     """
+    expandable: ClassVar[tuple[str, ...]] = ("customer", "user")
+
     id: int
     customer_id: int
     user_id: int
     issue_date: date
     due_date: Optional[date]
-    invoice_number: str
-    status: str
+    invoice_number: Optional[str]
+    status: InvoiceStatus
     notes: Optional[str]
+    order_id: Optional[int] = None
+    net_total: Decimal
+    tax_total: Decimal
+    gross_total: Decimal
+    item_count: int
     items: List[InvoiceItemResponseSchema]
+    customer: Optional[CustomerSummarySchema] = None
+    user: Optional[UserSummarySchema] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class InvoiceListResponseSchema(InvoiceResponseSchema):
+    """
+    Schema for returning invoices in lists. items are only included if they were expanded.
+    """
+    expandable: ClassVar[tuple[str, ...]] = ("items", "customer", "user")
+
+    items: Optional[List[InvoiceItemResponseSchema]] = None
\ No newline at end of file
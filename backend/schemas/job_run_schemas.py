@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+
+class JobRunResponseSchema(BaseModel):
+    """
+    Schema for returning one run of a scheduled job.
+    """
+    id: int
+    job_name: str
+    status: str
+    started_at: datetime
+    finished_at: Optional[datetime]
+    duration_ms: Optional[float]
+    affected_rows: int
+    batches: int
+    error: Optional[str]
+
+    class Config:
+        from_attributes = True
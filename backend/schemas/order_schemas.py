@@ -1,7 +1,12 @@
 from pydantic import BaseModel
 from datetime import date
-from typing import List, Optional
-from schemas.order_item_schemas import OrderItemResponseSchema
+from decimal import Decimal
+from typing import List, Optional, ClassVar
+from models.enums import OrderStatus
+from schemas.order_item_schemas import OrderItemInlineSchema, OrderItemResponseSchema
+from schemas.expandable_schema import ExpandableSchema
+from schemas.customer_schemas import CustomerSummarySchema
+from schemas.user_schemas import UserSummarySchema
 
 class OrderCreateSchema(BaseModel):
     """
@@ -16,6 +21,7 @@ class OrderCreateSchema(BaseModel):
     status: str = "draft"
     reference: Optional[str] = None
     notes: Optional[str] = None
+    items: List[OrderItemInlineSchema] = []
 
 class OrderUpdateStatusSchema(BaseModel):
     """
@@ -23,21 +29,59 @@ class OrderUpdateStatusSchema(BaseModel):
     """
     new_status: str
 
-class OrderResponseSchema(BaseModel):
+class OrderPatchSchema(BaseModel):
+    """
+    Schema for partially updating an order. Only the fields sent are changed.
+    """
+    issue_date: Optional[date] = None
+    due_date: Optional[date] = None
+    delivery_date: Optional[date] = None
+    order_number: Optional[str] = None
+    status: Optional[str] = None
+    reference: Optional[str] = None
+    notes: Optional[str] = None
+
+class OrderConvertToInvoiceSchema(BaseModel):
+    """
+    Schema for converting an order into an invoice.
+    """
+    invoice_number: Optional[str] = None
+    issue_date: Optional[date] = None
+    due_date: Optional[date] = None
+
+class OrderResponseSchema(ExpandableSchema):
     """
     Schema for returning an order with its items.
+    customer and user are only included if they were expanded.
     """
+    expandable: ClassVar[tuple[str, ...]] = ("customer", "user")
+
     id: int
     customer_id: int
     user_id: int
     issue_date: date
     due_date: Optional[date]
     delivery_date: Optional[date]
-    order_number: str
-    status: str
+    order_number: Optional[str]
+    status: OrderStatus
     reference: Optional[str]
     notes: Optional[str]
+    quotation_id: Optional[int] = None
+    net_total: Decimal
+    tax_total: Decimal
+    gross_total: Decimal
+    item_count: int
     items: List[OrderItemResponseSchema]
+    customer: Optional[CustomerSummarySchema] = None
+    user: Optional[UserSummarySchema] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class OrderListResponseSchema(OrderResponseSchema):
+    """
+    Schema for returning orders in lists. items are only included if they were expanded.
+    """
+    expandable: ClassVar[tuple[str, ...]] = ("items", "customer", "user")
+
+    items: Optional[List[OrderItemResponseSchema]] = None
\ No newline at end of file
@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional, List
+
+
+class OutboxEventResponseSchema(BaseModel):
+    """
+    Schema for returning one change event.
+    """
+    id: int
+    entity_type: str
+    entity_id: int
+    action: str
+    payload: Optional[dict]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ChangeFeedResponseSchema(BaseModel):
+    """
+    Schema for a page of the change feed. Pass next_cursor as 'since' to continue.
+    """
+    events: List[OutboxEventResponseSchema]
+    next_cursor: Optional[str]
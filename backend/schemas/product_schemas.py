@@ -1,5 +1,6 @@
-from pydantic import BaseModel, confloat
-from typing import Optional
+from decimal import Decimal
+from pydantic import BaseModel, condecimal, model_validator
+from typing import Optional, List, Literal
 
 from models.enums import UnitType
 
@@ -9,7 +10,7 @@ class ProductCreate(BaseModel):
     Schema for creating a new product.
     """
     name: str
-    unit_price: confloat(ge=0)
+    unit_price: condecimal(ge=0, max_digits=12, decimal_places=2)
     unit: UnitType
     description: Optional[str] = None
 
@@ -23,7 +24,7 @@ class ProductUpdatePrice(BaseModel):
     """
     Schema for updating a product's price.
     """
-    new_price: float
+    new_price: condecimal(max_digits=12, decimal_places=2)
 
 class ProductUpdateUnit(BaseModel):
     """
@@ -36,3 +37,71 @@ class ProductUpdateDescription(BaseModel):
     Schema for updating a product's description.
     """
     new_description: str
+
+class ProductPatch(BaseModel):
+    """
+    Schema for partially updating a product. Only the fields sent are changed.
+    """
+    name: Optional[str] = None
+    unit_price: Optional[condecimal(ge=0, max_digits=12, decimal_places=2)] = None
+    unit: Optional[UnitType] = None
+    description: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_required_not_null(self) -> "ProductPatch":
+        for field in ("name", "unit_price", "unit"):
+            if field in self.model_fields_set and getattr(self, field) is None:
+                raise ValueError(f"'{field}' must not be null.")
+        return self
+
+class ProductSummarySchema(BaseModel):
+    """
+    Schema for a product embedded in another response.
+    """
+    id: int
+    name: str
+    unit: UnitType
+    unit_price: Decimal
+
+    class Config:
+        from_attributes = True
+
+class ProductRepriceSchema(BaseModel):
+    """
+    Schema for changing the prices of many products at once.
+    At least one of ids, unit and name_pattern selects the products.
+    """
+    mode: Literal["set", "amount", "percent"]
+    value: Decimal
+    ids: Optional[List[int]] = None
+    unit: Optional[UnitType] = None
+    name_pattern: Optional[str] = None
+    update_open_documents: bool = False
+    dry_run: bool = False
+
+    @model_validator(mode="after")
+    def check_selection(self) -> "ProductRepriceSchema":
+        if self.ids is None and self.unit is None and not self.name_pattern:
+            raise ValueError("Select products by ids, unit or name_pattern.")
+        return self
+
+class ProductRepriceItemSchema(BaseModel):
+    """
+    Schema for the price change of one product.
+    """
+    id: int
+    name: str
+    old_unit_price: Decimal
+    new_unit_price: Decimal
+
+class ProductRepriceResponseSchema(BaseModel):
+    """
+    Schema for the result or preview of a bulk price change.
+    """
+    dry_run: bool
+    products: List[ProductRepriceItemSchema]
+    updated_products: int
+    updated_order_items: int
+    updated_orders: int
+    updated_quotation_items: int
+    updated_quotations: int
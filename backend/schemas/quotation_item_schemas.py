@@ -1,4 +1,9 @@
-from pydantic import BaseModel, confloat
+from decimal import Decimal
+from pydantic import BaseModel, condecimal
+from typing import Optional, List, ClassVar
+
+from schemas.expandable_schema import ExpandableSchema
+from schemas.product_schemas import ProductSummarySchema
 
 class QuotationItemCreateSchema(BaseModel):
     """
@@ -6,24 +11,61 @@ class QuotationItemCreateSchema(BaseModel):
     """
     quotation_id: int
     product_id: int
-    quantity: confloat(ge=0)
-    unit_price: confloat(ge=0)
+    quantity: condecimal(ge=0, max_digits=12, decimal_places=3)
+    unit_price: condecimal(ge=0, max_digits=12, decimal_places=2)
+
+class QuotationItemInlineSchema(BaseModel):
+    """
+    Schema for an item created together with its quotation.
+    The product's current unit price is used if unit_price is omitted.
+    """
+    product_id: int
+    quantity: condecimal(ge=0, max_digits=12, decimal_places=3)
+    unit_price: Optional[condecimal(ge=0, max_digits=12, decimal_places=2)] = None
 
 class QuotationItemUpdateSchema(BaseModel):
     """
     Schema for updating a quotation item.
     """
-    new_quantity: confloat(ge=0)
-    new_unit_price: confloat(ge=0)
+    new_quantity: condecimal(ge=0, max_digits=12, decimal_places=3)
+    new_unit_price: condecimal(ge=0, max_digits=12, decimal_places=2)
+
+class QuotationItemBulkUpdateSchema(BaseModel):
+    """
+    Schema for one row of a bulk item update. Only the fields sent are changed.
+    """
+    id: int
+    quantity: Optional[condecimal(ge=0, max_digits=12, decimal_places=3)] = None
+    unit_price: Optional[condecimal(ge=0, max_digits=12, decimal_places=2)] = None
+
+class QuotationItemBulkSchema(BaseModel):
+    """
+    Schema for creating, updating and deleting many quotation items in one request.
+    """
+    create: List[QuotationItemCreateSchema] = []
+    update: List[QuotationItemBulkUpdateSchema] = []
+    delete: List[int] = []
 
-class QuotationItemResponseSchema(BaseModel):
+class QuotationItemResponseSchema(ExpandableSchema):
     """
-    Schema for returning quotation item data.
+    Schema for returning quotation item data. product is only included if it was expanded.
     """
+    expandable: ClassVar[tuple[str, ...]] = ("product",)
+
     id: int
     product_id: int
-    quantity: float
-    unit_price: float
+    quantity: Decimal
+    unit_price: Decimal
+    product: Optional[ProductSummarySchema] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class QuotationItemPageSchema(BaseModel):
+    """
+    Schema for one page of the items of a quotation.
+    """
+    items: List[QuotationItemResponseSchema]
+    total: int
+    limit: int
+    offset: int
@@ -1,8 +1,13 @@
 from pydantic import BaseModel
 from datetime import date
-from typing import Optional, List
+from decimal import Decimal
+from typing import Optional, List, ClassVar
 
-from schemas.quotation_item_schemas import QuotationItemResponseSchema
+from models.enums import QuotationStatus
+from schemas.quotation_item_schemas import QuotationItemInlineSchema, QuotationItemResponseSchema
+from schemas.expandable_schema import ExpandableSchema
+from schemas.customer_schemas import CustomerSummarySchema
+from schemas.user_schemas import UserSummarySchema
 
 class QuotationCreateSchema(BaseModel):
     """
@@ -15,6 +20,7 @@ class QuotationCreateSchema(BaseModel):
     quotation_number: Optional[str] = None
     status: str = "draft"
     notes: Optional[str] = None
+    items: List[QuotationItemInlineSchema] = []
 
 class QuotationUpdateStatusSchema(BaseModel):
     """
@@ -22,19 +28,44 @@ class QuotationUpdateStatusSchema(BaseModel):
     """
     new_status: str
 
-class QuotationResponseSchema(BaseModel):
+class QuotationConvertToOrderSchema(BaseModel):
     """
-    Schema for returning an order with its items.
+    Schema for converting a quotation into an order.
     """
+    order_number: Optional[str] = None
+    issue_date: Optional[date] = None
+    delivery_date: Optional[date] = None
+
+class QuotationResponseSchema(ExpandableSchema):
+    """
+    Schema for returning a quotation with its items.
+    customer and user are only included if they were expanded.
+    """
+    expandable: ClassVar[tuple[str, ...]] = ("customer", "user")
+
     id: int
     customer_id: int
     user_id: int
     issue_date: date
     due_date: Optional[date]
-    quotation_number: str
-    status: str
+    quotation_number: Optional[str]
+    status: QuotationStatus
     notes: Optional[str]
+    net_total: Decimal
+    tax_total: Decimal
+    gross_total: Decimal
+    item_count: int
     items: List[QuotationItemResponseSchema]
+    customer: Optional[CustomerSummarySchema] = None
+    user: Optional[UserSummarySchema] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class QuotationListResponseSchema(QuotationResponseSchema):
+    """
+    Schema for returning quotations in lists. items are only included if they were expanded.
+    """
+    expandable: ClassVar[tuple[str, ...]] = ("items", "customer", "user")
+
+    items: Optional[List[QuotationItemResponseSchema]] = None
\ No newline at end of file
@@ -0,0 +1,72 @@
+from decimal import Decimal
+from pydantic import BaseModel, conint
+from datetime import date
+from typing import Optional, List
+
+from models.enums import RecurrenceInterval
+from schemas.invoice_item_schemas import InvoiceItemInlineSchema
+
+class RecurringInvoiceCreateSchema(BaseModel):
+    """
+    Schema for creating a recurring invoice template.
+    The product's current unit price is stored for items without unit_price.
+    """
+    customer_id: int
+    interval: str
+    start_date: date
+    payment_terms_days: Optional[conint(ge=0)] = None
+    notes: Optional[str] = None
+    items: List[InvoiceItemInlineSchema]
+
+class RecurringInvoiceUpdateActiveSchema(BaseModel):
+    """
+    Schema for pausing or resuming a recurring invoice.
+    """
+    active: bool
+
+class RecurringInvoiceGenerateSchema(BaseModel):
+    """
+    Schema for generating all due recurring invoices.
+    """
+    run_date: Optional[date] = None
+    render_pdfs: bool = False
+
+class RecurringInvoiceItemResponseSchema(BaseModel):
+    """
+    Schema for returning an item of a recurring invoice.
+    """
+    id: int
+    product_id: int
+    quantity: Decimal
+    unit_price: Decimal
+
+    class Config:
+        from_attributes = True
+
+class RecurringInvoiceResponseSchema(BaseModel):
+    """
+    Schema for returning a recurring invoice with its items.
+    """
+    id: int
+    customer_id: int
+    user_id: int
+    interval: RecurrenceInterval
+    start_date: date
+    next_run_date: date
+    last_run_date: Optional[date]
+    run_count: int
+    payment_terms_days: Optional[int]
+    notes: Optional[str]
+    active: bool
+    items: List[RecurringInvoiceItemResponseSchema]
+
+    class Config:
+        from_attributes = True
+
+class RecurringInvoiceGenerateResponseSchema(BaseModel):
+    """
+    Schema for the result of a generation run.
+    """
+    generated: int
+    invoice_ids: List[int]
+    pdfs_queued: bool
@@ -0,0 +1,45 @@
+from pydantic import BaseModel
+from datetime import date
+from decimal import Decimal
+from typing import List, Union
+
+
+class RevenueReportRowSchema(BaseModel):
+    """
+    Schema for one group of the revenue report.
+    """
+    key: Union[int, str]
+    label: str | None
+    net_revenue: Decimal
+    quantity: Decimal
+    item_count: int
+
+
+class AgingBucketsSchema(BaseModel):
+    """
+    Schema for open amounts bucketed by days past due.
+    """
+    current: Decimal
+    days_1_30: Decimal
+    days_31_60: Decimal
+    days_61_90: Decimal
+    days_over_90: Decimal
+    total: Decimal
+    invoice_count: int
+
+
+class CustomerAgingSchema(AgingBucketsSchema):
+    """
+    Schema for the aging buckets of one customer.
+    """
+    customer_id: int
+    customer_name: str | None
+
+
+class ArAgingReportSchema(BaseModel):
+    """
+    Schema for the accounts-receivable aging report.
+    """
+    as_of: date
+    customers: List[CustomerAgingSchema]
+    totals: AgingBucketsSchema
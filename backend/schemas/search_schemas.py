@@ -0,0 +1,19 @@
+from datetime import date
+from decimal import Decimal
+from pydantic import BaseModel
+from typing import Literal, Optional
+
+
+class DocumentSearchHitSchema(BaseModel):
+    """
+    Schema for one hit of the global document search.
+    """
+    type: Literal["invoice", "order", "quotation"]
+    id: int
+    number: Optional[str] = None
+    status: str
+    issue_date: date
+    gross_total: Decimal
+    customer_id: int
+    customer_name: Optional[str] = None
+    matched_field: str
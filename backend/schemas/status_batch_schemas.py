@@ -0,0 +1,44 @@
+from datetime import date
+from pydantic import BaseModel, model_validator
+from typing import List, Literal, Optional
+
+
+class StatusBatchFilterSchema(BaseModel):
+    """
+    Schema for selecting documents of a bulk status change by their attributes.
+    """
+    status: Optional[str] = None
+    customer_id: Optional[int] = None
+    issue_date_from: Optional[date] = None
+    issue_date_to: Optional[date] = None
+
+class StatusBatchRequestSchema(BaseModel):
+    """
+    Schema for changing the status of many documents at once, selected by IDs or a filter.
+    """
+    status: str
+    ids: Optional[List[int]] = None
+    filter: Optional[StatusBatchFilterSchema] = None
+
+    @model_validator(mode="after")
+    def check_ids_or_filter(self) -> "StatusBatchRequestSchema":
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError(
+                "Exactly one of 'ids' or 'filter' must be provided.")
+        return self
+
+class StatusBatchResultSchema(BaseModel):
+    """
+    Schema for the outcome of a bulk status change for one document.
+    """
+    id: int
+    result: Literal["updated", "unchanged", "invalid_transition", "not_found"]
+    status: Optional[str] = None
+
+class StatusBatchResponseSchema(BaseModel):
+    """
+    Schema for the response of a bulk status change.
+    """
+    status: str
+    updated: int
+    results: List[StatusBatchResultSchema]
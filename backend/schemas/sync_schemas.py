@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List
+
+
+class SyncResponseSchema(BaseModel):
+    """
+    Schema for a delta sync response.
+
+    If reset is set, the client replaces its local copy with the rows in changes.
+    Otherwise it upserts the rows in changes and removes the IDs in deleted. For a deleted
+    invoice, order or quotation it also removes the items with that invoice_id, order_id or
+    quotation_id; they are not listed separately.
+    """
+    reset: bool
+    changes: Dict[str, List[Dict[str, Any]]]
+    deleted: Dict[str, List[int]]
+    next_token: str
+    has_more: bool
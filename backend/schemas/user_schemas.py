@@ -20,3 +20,14 @@ class UserUpdatePasswordSchema(BaseModel):
     Schema for updating a user's password.
     """
     new_password: str
+
+class UserSummarySchema(BaseModel):
+    """
+    Schema for a user embedded in another response, without password and role.
+    """
+    id: int
+    name: str
+    email: str
+
+    class Config:
+        from_attributes = True
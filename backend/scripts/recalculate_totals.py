@@ -0,0 +1,23 @@
+"""
+Recomputes the stored net, tax and gross totals of all invoices, orders, and quotations
+from their items. Use it to repair totals after items were changed outside the services.
+
+Usage (inside the backend container):
+    python scripts/recalculate_totals.py
+"""
+from app.database.session import Session
+from services.document_totals_service import DocumentTotalsService
+
+
+def main() -> None:
+    session = Session()
+    try:
+        counts = DocumentTotalsService(session).recalculate_all()
+        for table, count in counts.items():
+            print(f"{table}: {count} documents recalculated")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Small thread-safe in-process cache whose entries expire after a fixed time.
+
+    Every worker process holds its own instance, so values may be stale for at most ttl_seconds.
+    """
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 256):
+        """
+        Initializes an empty cache.
+
+        Args:
+            ttl_seconds (float): Lifetime of an entry in seconds.
+            maxsize (int): Maximum number of entries, the oldest entry is evicted first.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value for a key, or default if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            return value
+
+
+    def set(self, key, value) -> None:
+        """
+        Stores a value under a key, replacing an existing entry.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+    def delete(self, key) -> None:
+        """
+        Removes a key from the cache if present.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+    def clear(self) -> None:
+        """
+        Removes all entries.
+        """
+        with self._lock:
+            self._entries.clear()
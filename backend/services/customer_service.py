@@ -1,13 +1,35 @@
 import re
 import logging
-from sqlalchemy import select
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import select, update, delete, func, literal, or_
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
 from models.customer import Customer
+from models.invoice import Invoice
+from models.order import Order
+from models.quotation import Quotation
+from models.recurring_invoice import RecurringInvoice
+from services.integrity_errors import raise_for_constraint_violation
+from services.references import ReferenceInUseError, find_references, reference_constraint_names
+from services.outbox_service import record_event, CREATED, UPDATED, DELETED
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CUSTOMER_EMAIL_KEY = "customers_email_key"
+CUSTOMER_COMPANY_NAME_KEY = "customers_company_name_key"
+CUSTOMER_TAX_ID_KEY = "customers_tax_id_key"
+
+# Documents that keep a customer from being deleted.
+CUSTOMER_REFERENCES = {
+    "invoices": Invoice.customer_id,
+    "orders": Order.customer_id,
+    "quotations": Quotation.customer_id,
+    "recurring invoices": RecurringInvoice.customer_id,
+}
+
+SEARCH_MIN_LENGTH = 3
+SEARCH_MAX_LIMIT = 100
+
 
 class CustomerService:
     """
@@ -65,10 +87,10 @@ class CustomerService:
         notes: str = None
     ) -> None:
         """
-        Creates a new customer, checking for duplicates and validating email.
+        Creates a new customer, validating the email and relying on unique constraints for duplicates.
 
         Raises:
-            ValueError: If required data is missing or validation fails.
+            ValueError: If required data is missing, validation fails or a unique value is already in use.
         """
         if not name and not company_name:
             raise ValueError("At least one of 'name' or 'company_name' must be provided.")
@@ -76,27 +98,6 @@ class CustomerService:
         if email is not None and not self.is_valid_email(email):
             raise ValueError("Invalid email address format")
 
-        if email is not None:
-            existing_customer = self.session.scalars(
-                select(Customer).where(Customer.email == email)
-            ).first()
-            if existing_customer:
-                raise ValueError("Email address already in use.")
-
-        if company_name is not None:
-            existing_customer = self.session.scalars(
-                select(Customer).where(Customer.company_name == company_name)
-            ).first()
-            if existing_customer:
-                raise ValueError("Company name already in use.")
-
-        if tax_id is not None:
-            existing_customer = self.session.scalars(
-                select(Customer).where(Customer.tax_id == tax_id)
-            ).first()
-            if existing_customer:
-                raise ValueError("Tax ID already in use.")
-
         new_customer = Customer(
             name=name,
             company_name=company_name,
@@ -109,9 +110,19 @@ class CustomerService:
 
         try:
             self.session.add(new_customer)
+            self.session.flush()
+            record_event(self.session, "customer", new_customer.id, CREATED, {"name": name, "company_name": company_name})
             self.session.commit()
             identifier = name if name else company_name
             logger.info(f"Customer '{identifier}' created successfully.")
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Customer '{name}' violates a unique constraint: {e.orig}")
+            raise_for_constraint_violation(e, {
+                CUSTOMER_EMAIL_KEY: "Email address already in use.",
+                CUSTOMER_COMPANY_NAME_KEY: "Company name already in use.",
+                CUSTOMER_TAX_ID_KEY: "Tax ID already in use.",
+            })
         except SQLAlchemyError as e:
             self.session.rollback()
             logger.error(f"Error creating customer '{name}': {e}")
@@ -132,6 +143,120 @@ class CustomerService:
             return []
 
 
+    def search_customers(self, query: str, limit: int = 20) -> list[Customer]:
+        """
+        Searches customers by partial or misspelled name, company name, email or tax ID.
+
+        A customer matches if a word starts with one of the search words (full-text index), if
+        a search column contains the query (trigram index), or if a name is similar to it
+        (trigram word similarity). Results are ranked by full-text rank plus the best similarity.
+
+        Args:
+            query (str): Search text, at least SEARCH_MIN_LENGTH characters.
+            limit (int): Maximum number of results, at most SEARCH_MAX_LIMIT.
+
+        Returns:
+            list[Customer]: Matching customers, best match first.
+
+        Raises:
+            ValueError: If the query is too short or the limit is invalid.
+        """
+        query = (query or "").strip()
+        if len(query) < SEARCH_MIN_LENGTH:
+            raise ValueError(f"Search query must be at least {SEARCH_MIN_LENGTH} characters long.")
+        if limit < 1 or limit > SEARCH_MAX_LIMIT:
+            raise ValueError(f"Limit must be between 1 and {SEARCH_MAX_LIMIT}.")
+
+        words = re.findall(r"\w[\w@.-]*", query.lower())
+        prefix_query = " & ".join(f"'{word}':*" for word in words)
+        ts_query = func.to_tsquery("simple", prefix_query)
+        contains = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        search_text = literal(query)
+
+        conditions = [Customer.search_vector.op("@@")(ts_query)] if words else []
+        conditions += [column.ilike(contains) for column in (Customer.name, Customer.company_name, Customer.email, Customer.tax_id)]
+        conditions += [search_text.op("<%")(column) for column in (Customer.name, Customer.company_name)]
+
+        rank = func.ts_rank(Customer.search_vector, ts_query) if words else literal(0)
+        similarity = func.greatest(*[
+            func.word_similarity(search_text, column)
+            for column in (Customer.name, Customer.company_name, Customer.email, Customer.tax_id)
+        ])
+        score = rank + func.coalesce(similarity, 0)
+
+        stmt = (
+            select(Customer)
+            .where(or_(*conditions))
+            .order_by(score.desc(), Customer.id)
+            .limit(limit)
+        )
+
+        try:
+            return self.session.scalars(stmt).all()
+        except SQLAlchemyError as e:
+            logger.error(f"Error searching customers: {e}")
+            raise
+
+
+    def patch_customer(self, customer_id: int, fields: dict) -> Customer:
+        """
+        Applies a partial update to a customer in a single UPDATE ... RETURNING statement.
+
+        Args:
+            customer_id (int): ID of the customer.
+            fields (dict): Column names mapped to their new values.
+
+        Returns:
+            Customer: The updated customer.
+
+        Raises:
+            ValueError: If validation fails, a unique value is already in use or the customer does not exist.
+        """
+        if not fields:
+            raise ValueError("No fields to update.")
+
+        if fields.get("email") is not None and not self.is_valid_email(fields["email"]):
+            raise ValueError("Invalid email address format")
+
+        # The stored value counts for a field that is not sent, so clearing the name of a
+        # customer without company name is rejected in the same statement.
+        name, company_name = [
+            literal(fields[key], Customer.__table__.c[key].type) if key in fields else getattr(Customer, key)
+            for key in ("name", "company_name")
+        ]
+        stmt = (
+            update(Customer)
+            .where(Customer.id == customer_id)
+            .where(func.coalesce(func.nullif(name, ""), func.nullif(company_name, "")).is_not(None))
+            .values(**fields)
+            .returning(Customer)
+        )
+
+        try:
+            customer = self.session.scalars(stmt).first()
+            if not customer:
+                self.session.rollback()
+                if self.session.get(Customer, customer_id):
+                    raise ValueError("At least one of 'name' or 'company_name' must be provided.")
+                raise ValueError(f"Customer with id '{customer_id}' not found!")
+            record_event(self.session, "customer", customer_id, UPDATED, fields)
+            self.session.commit()
+            logger.info(f"Customer updated successfully for id {customer_id}.")
+            return customer
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Customer update for id {customer_id} violates a unique constraint: {e.orig}")
+            raise_for_constraint_violation(e, {
+                CUSTOMER_EMAIL_KEY: "Email address already in use by another customer.",
+                CUSTOMER_COMPANY_NAME_KEY: "Company name already in use by another customer.",
+                CUSTOMER_TAX_ID_KEY: "Tax ID already in use by another customer.",
+            })
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error updating customer with id '{customer_id}': {e}")
+            raise
+
+
     def update_customer_company_name(self, customer_id: int, new_company_name: str) -> None:
         """
         Updates the company name of a customer.
@@ -139,18 +264,19 @@ class CustomerService:
         Raises:
             ValueError: If the company name already exists or customer not found.
         """
-        existing_customer = self.session.scalars(
-            select(Customer).where(Customer.company_name == new_company_name)
-        ).first()
-        if existing_customer and existing_customer.id != customer_id:
-            raise ValueError("Company name already in use by another customer.")
-
         customer = self.get_customer_by_id_or_raise(customer_id)
 
         try:
             customer.company_name = new_company_name
+            record_event(self.session, "customer", customer_id, UPDATED, {"company_name": new_company_name})
             self.session.commit()
             logger.info(f"Customer company name updated successfully for id {customer_id}.")
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Company name update for customer {customer_id} violates a unique constraint: {e.orig}")
+            raise_for_constraint_violation(e, {
+                CUSTOMER_COMPANY_NAME_KEY: "Company name already in use by another customer.",
+            })
         except SQLAlchemyError as e:
             self.session.rollback()
             logger.error(f"Error updating customer company name: {e}")
@@ -164,20 +290,22 @@ class CustomerService:
         Raises:
             ValueError: If the email is invalid or already in use.
         """
-        customer = self.get_customer_by_id_or_raise(customer_id)
-        existing_customer = self.session.scalars(
-            select(Customer).where(Customer.email == new_email)
-        ).first()
-        if existing_customer and existing_customer.id != customer_id:
-            raise ValueError("Email address already in use by another customer.")
-
         if not self.is_valid_email(new_email):
             raise ValueError("Invalid email address format")
 
+        customer = self.get_customer_by_id_or_raise(customer_id)
+
         try:
             customer.email = new_email
+            record_event(self.session, "customer", customer_id, UPDATED, {"email": new_email})
             self.session.commit()
             logger.info(f"Customer email updated successfully for id {customer_id}.")
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Email update for customer {customer_id} violates a unique constraint: {e.orig}")
+            raise_for_constraint_violation(e, {
+                CUSTOMER_EMAIL_KEY: "Email address already in use by another customer.",
+            })
         except SQLAlchemyError as e:
             self.session.rollback()
             logger.error(f"Error updating customer email: {e}")
@@ -192,6 +320,7 @@ class CustomerService:
 
         try:
             customer.phone = new_phone
+            record_event(self.session, "customer", customer_id, UPDATED, {"phone": new_phone})
             self.session.commit()
             logger.info(f"Customer phone updated successfully for id {customer_id}.")
         except SQLAlchemyError as e:
@@ -208,6 +337,7 @@ class CustomerService:
 
         try:
             customer.address = new_address
+            record_event(self.session, "customer", customer_id, UPDATED, {"address": new_address})
             self.session.commit()
             logger.info(f"Customer address updated successfully for id {customer_id}.")
         except SQLAlchemyError as e:
@@ -224,6 +354,7 @@ class CustomerService:
 
         try:
             customer.notes = new_notes
+            record_event(self.session, "customer", customer_id, UPDATED, {"notes": new_notes})
             self.session.commit()
             logger.info(f"Customer notes updated successfully for id {customer_id}.")
         except SQLAlchemyError as e:
@@ -234,17 +365,42 @@ class CustomerService:
 
     def delete_customer(self, customer_id: int) -> None:
         """
-        Deletes a customer by ID.
+        Deletes a customer by ID with a single DELETE statement.
+
+        Whether any document still references the customer is checked with one query
+        before, the foreign keys reject references created concurrently.
 
         Raises:
+            ReferenceInUseError: If documents or recurring invoices reference the customer.
             ValueError: If the customer does not exist.
         """
-        customer = self.get_customer_by_id_or_raise(customer_id)
-
+        used_by = find_references(self.session, CUSTOMER_REFERENCES, customer_id)
+        in_use_message = (
+            f"Customer with id '{customer_id}' is still used by {', '.join(used_by) or 'documents'} "
+            "and cannot be deleted."
+        )
+        if used_by:
+            raise ReferenceInUseError(in_use_message)
+
+        stmt = (
+            delete(Customer)
+            .where(Customer.id == customer_id)
+            .returning(Customer.id)
+            .execution_options(synchronize_session=False)
+        )
         try:
-            self.session.delete(customer)
+            if self.session.scalar(stmt) is None:
+                self.session.rollback()
+                raise ValueError(f"Customer with id '{customer_id}' not found!")
+            record_event(self.session, "customer", customer_id, DELETED)
             self.session.commit()
             logger.info(f"Customer with id '{customer_id}' deleted successfully.")
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Customer with id '{customer_id}' was referenced concurrently: {e.orig}")
+            raise_for_constraint_violation(e, {
+                name: in_use_message for name in reference_constraint_names(CUSTOMER_REFERENCES)
+            })
         except SQLAlchemyError as e:
             self.session.rollback()
             logger.error(f"Error deleting customer with id '{customer_id}': {e}")
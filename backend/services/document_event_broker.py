@@ -0,0 +1,190 @@
+"""
+Fan-out of committed document events to live subscribers.
+
+Each worker process keeps one dedicated Postgres connection that LISTENs on the document
+events channel. The connection's socket is watched by the asyncio event loop, so waiting for
+notifications needs no thread and no pooled connection. Every notification is copied into the
+bounded queue of each subscriber; an idle subscriber costs one queue and one suspended task.
+"""
+import json
+import asyncio
+import logging
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+
+from app.database.session import engine
+from services.outbox_service import DOCUMENT_EVENTS_CHANNEL
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 256
+RECONNECT_MAX_DELAY_SECONDS = 30
+
+# Put into a subscriber's queue when events were lost, e.g. because the queue was full or the
+# listener reconnected. Subscribers should reload their data from the regular endpoints.
+RESYNC = object()
+
+
+class DocumentEventBroker:
+    """
+    Listens for document events on one connection and distributes them to subscriber queues.
+
+    The listener connection is opened with the first subscription and reconnects with
+    exponential backoff if it is lost.
+    """
+
+    def __init__(self, channel: str = DOCUMENT_EVENTS_CHANNEL, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        """
+        Initializes the broker without connecting.
+        """
+        self.channel = channel
+        self.queue_size = queue_size
+        self._subscribers: set[asyncio.Queue] = set()
+        self._connection = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connect_lock = asyncio.Lock()
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+
+    async def subscribe(self) -> asyncio.Queue:
+        """
+        Registers a new subscriber and starts listening if necessary.
+
+        Returns:
+            asyncio.Queue: Queue receiving lists of event dicts and RESYNC markers.
+
+        Raises:
+            Exception: If the listener connection cannot be opened.
+        """
+        if self._connection is None and self._reconnect_task is None:
+            await self._connect()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """
+        Removes a subscriber. The listener connection stays open for the next one.
+        """
+        self._subscribers.discard(queue)
+
+
+    @property
+    def subscriber_count(self) -> int:
+        """
+        Number of currently connected subscribers in this worker.
+        """
+        return len(self._subscribers)
+
+
+    async def _connect(self) -> None:
+        """
+        Opens the listener connection outside the pool and registers its socket with the event loop.
+        """
+        async with self._connect_lock:
+            if self._connection is not None:
+                return
+            self._loop = asyncio.get_running_loop()
+            connection = await run_in_threadpool(self._open_connection)
+            self._loop.add_reader(connection.fileno(), self._on_readable)
+            self._connection = connection
+            logger.info(f"Listening for notifications on channel '{self.channel}'.")
+
+
+    def _open_connection(self):
+        """
+        Creates a dedicated autocommit DBAPI connection and runs LISTEN on it.
+        """
+        connect_args, connect_params = engine.dialect.create_connect_args(engine.url)
+        connection = engine.dialect.connect(*connect_args, **connect_params)
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+        return connection
+
+
+    def _on_readable(self) -> None:
+        """
+        Reads all pending notifications from the listener socket and dispatches them.
+        """
+        try:
+            self._connection.poll()
+        except Exception as e:
+            logger.error(f"Listener connection for channel '{self.channel}' lost: {e}")
+            self._disconnect()
+            self._broadcast(RESYNC)
+            self._reconnect_task = self._loop.create_task(self._reconnect())
+            return
+
+        while self._connection.notifies:
+            notification = self._connection.notifies.pop(0)
+            try:
+                events = json.loads(notification.payload)
+            except ValueError:
+                logger.error(f"Ignoring malformed notification on channel '{self.channel}'.")
+                continue
+            self._broadcast(events)
+
+
+    def _broadcast(self, message) -> None:
+        """
+        Puts a message into every subscriber queue. A full queue is emptied and replaced by RESYNC.
+        """
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+
+
+    async def _reconnect(self) -> None:
+        """
+        Reopens the listener connection with exponential backoff while there are subscribers.
+        """
+        delay = 1
+        try:
+            while self._subscribers:
+                await asyncio.sleep(delay)
+                try:
+                    await self._connect()
+                    self._broadcast(RESYNC)
+                    return
+                except Exception as e:
+                    logger.error(f"Reconnecting listener for channel '{self.channel}' failed: {e}")
+                    delay = min(delay * 2, RECONNECT_MAX_DELAY_SECONDS)
+        finally:
+            self._reconnect_task = None
+
+
+    def _disconnect(self) -> None:
+        """
+        Unregisters and closes the listener connection.
+        """
+        if self._connection is None:
+            return
+        try:
+            self._loop.remove_reader(self._connection.fileno())
+        except Exception:
+            pass
+        try:
+            self._connection.close()
+        except Exception:
+            pass
+        self._connection = None
+
+
+    async def stop(self) -> None:
+        """
+        Closes the listener connection and stops reconnecting.
+        """
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        self._disconnect()
+
+
+document_event_broker = DocumentEventBroker()
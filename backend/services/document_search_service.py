@@ -0,0 +1,121 @@
+import logging
+from sqlalchemy import select, union_all, literal, case, cast, func, or_, String
+from sqlalchemy.exc import SQLAlchemyError
+
+from models.customer import Customer
+from models.invoice import Invoice, INVOICE_SEARCH_COLUMNS
+from models.order import Order, ORDER_SEARCH_COLUMNS
+from models.quotation import Quotation, QUOTATION_SEARCH_COLUMNS
+from models.enums import InvoiceStatus, OrderStatus, QuotationStatus
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DOCUMENT_SEARCH_MIN_LENGTH = 3
+DOCUMENT_SEARCH_MAX_LIMIT = 100
+
+# Document type, model, number column, searched columns and status enum.
+SEARCHABLE_DOCUMENTS = (
+    ("invoice", Invoice, Invoice.invoice_number, INVOICE_SEARCH_COLUMNS, InvoiceStatus),
+    ("order", Order, Order.order_number, ORDER_SEARCH_COLUMNS, OrderStatus),
+    ("quotation", Quotation, Quotation.quotation_number, QUOTATION_SEARCH_COLUMNS, QuotationStatus),
+)
+
+
+class DocumentSearchService:
+    """
+    Service class for searching invoices, orders and quotations at once.
+    """
+
+    def __init__(self, session):
+        """
+        Initializes the service with a database session.
+        """
+        self.session = session
+
+
+    def search_documents(self, query: str, limit: int = 20) -> list[dict]:
+        """
+        Searches document numbers, notes and order references of all document types in one
+        UNION ALL query served by trigram indexes.
+
+        Hits are ranked by how well the document number matches: exact, prefix, substring,
+        then notes or reference only. Ties go to the most recent document.
+
+        Args:
+            query (str): Search text, at least DOCUMENT_SEARCH_MIN_LENGTH characters.
+            limit (int): Maximum number of hits, at most DOCUMENT_SEARCH_MAX_LIMIT.
+
+        Returns:
+            list[dict]: Hits with type, id, number, status, issue_date, gross_total,
+                customer_id, customer_name and matched_field, best match first.
+
+        Raises:
+            ValueError: If the query is too short or the limit is invalid.
+        """
+        query = (query or "").strip()
+        if len(query) < DOCUMENT_SEARCH_MIN_LENGTH:
+            raise ValueError(f"Search query must be at least {DOCUMENT_SEARCH_MIN_LENGTH} characters long.")
+        if limit < 1 or limit > DOCUMENT_SEARCH_MAX_LIMIT:
+            raise ValueError(f"Limit must be between 1 and {DOCUMENT_SEARCH_MAX_LIMIT}.")
+
+        escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        hits = union_all(*[
+            self._search_statement(document_type, model, number_column, columns, query, escaped)
+            for document_type, model, number_column, columns, _ in SEARCHABLE_DOCUMENTS
+        ]).subquery()
+        stmt = (
+            select(hits)
+            .order_by(hits.c.score.desc(), hits.c.issue_date.desc(), hits.c.id.desc())
+            .limit(limit)
+        )
+
+        try:
+            rows = self.session.execute(stmt).mappings().all()
+        except SQLAlchemyError as e:
+            logger.error(f"Error searching documents: {e}")
+            raise
+
+        # Statuses are selected as text because the enum types differ between the branches.
+        status_enums = {document_type: status_enum for document_type, *_, status_enum in SEARCHABLE_DOCUMENTS}
+        return [
+            {
+                **{key: value for key, value in row.items() if key != "score"},
+                "status": status_enums[row["type"]][row["status"]].value,
+            }
+            for row in rows
+        ]
+
+
+    @staticmethod
+    def _search_statement(document_type: str, model, number_column, columns, query: str, escaped: str):
+        """
+        Builds the SELECT of one document type for the UNION.
+        """
+        search_columns = [getattr(model, column) for column in columns]
+        score = case(
+            (func.lower(number_column) == query.lower(), 3),
+            (number_column.ilike(f"{escaped}%"), 2),
+            (number_column.ilike(f"%{escaped}%"), 1),
+            else_=0,
+        ) + func.coalesce(func.similarity(number_column, query), 0)
+        matched_field = case(
+            *[(column.ilike(f"%{escaped}%"), column.key) for column in search_columns]
+        )
+
+        return (
+            select(
+                literal(document_type).label("type"),
+                model.id,
+                number_column.label("number"),
+                cast(model.status, String).label("status"),
+                model.issue_date,
+                model.gross_total,
+                model.customer_id,
+                func.coalesce(Customer.company_name, Customer.name).label("customer_name"),
+                matched_field.label("matched_field"),
+                score.label("score"),
+            )
+            .join(Customer, Customer.id == model.customer_id)
+            .where(or_(*[column.ilike(f"%{escaped}%") for column in search_columns]))
+        )
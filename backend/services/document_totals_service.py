@@ -0,0 +1,177 @@
+import logging
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import select, update, func
+from sqlalchemy.exc import SQLAlchemyError
+
+from models.invoice import Invoice
+from models.invoice_item import InvoiceItem
+from models.order import Order
+from models.order_item import OrderItem
+from models.quotation import Quotation
+from models.quotation_item import QuotationItem
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+VAT_RATE = Decimal("0.19")
+CENT = Decimal("0.01")
+
+DOCUMENT_ITEMS = {
+    Invoice: (InvoiceItem, InvoiceItem.invoice_id),
+    Order: (OrderItem, OrderItem.order_id),
+    Quotation: (QuotationItem, QuotationItem.quotation_id),
+}
+
+
+def line_total(quantity, unit_price) -> Decimal:
+    """
+    Calculates the rounded total of one item the same way the database does.
+
+    Args:
+        quantity (Decimal): Quantity of the item.
+        unit_price (Decimal): Price per unit.
+
+    Returns:
+        Decimal: Quantity times unit price, rounded half up to cents.
+    """
+    return (_decimal(quantity) * _decimal(unit_price)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _decimal(value) -> Decimal:
+    """
+    Returns stored and validated amounts unchanged and converts other numbers via their shortest repr.
+    """
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def document_totals(net_total: Decimal) -> tuple[Decimal, Decimal]:
+    """
+    Calculates VAT and gross total for a net total the same way the database does.
+
+    Args:
+        net_total (Decimal): Sum of the rounded line totals.
+
+    Returns:
+        tuple[Decimal, Decimal]: Tax total and gross total.
+    """
+    tax_total = (net_total * VAT_RATE).quantize(CENT, rounding=ROUND_HALF_UP)
+    return tax_total, net_total + tax_total
+
+
+def line_total_expression(item_model):
+    """
+    Builds the SQL expression for the rounded total of one item.
+
+    Args:
+        item_model: InvoiceItem, OrderItem or QuotationItem.
+
+    Returns:
+        ColumnElement: Quantity times unit price, rounded to cents.
+    """
+    return func.round(item_model.quantity * item_model.unit_price, 2)
+
+
+class DocumentTotalsService:
+    """
+    Service class for maintaining the stored totals of invoices, orders, and quotations.
+
+    Except for recalculate_all(), the methods do not commit and run inside the caller's transaction.
+    """
+
+    def __init__(self, session):
+        """
+        Initializes the service with a database session.
+        """
+        self.session = session
+
+
+    def apply_item_delta(self, document_model, document_id: int, net_delta: Decimal, count_delta: int) -> None:
+        """
+        Adds an item change to the stored totals of one document with a single UPDATE.
+
+        Args:
+            document_model: Invoice, Order or Quotation.
+            document_id (int): ID of the document.
+            net_delta (Decimal): Change of the net total.
+            count_delta (int): Change of the item count.
+        """
+        new_net = document_model.net_total + net_delta
+        new_tax = func.round(new_net * VAT_RATE, 2)
+        stmt = (
+            update(document_model)
+            .where(document_model.id == document_id)
+            .values(
+                net_total=new_net,
+                tax_total=new_tax,
+                gross_total=new_net + new_tax,
+                item_count=document_model.item_count + count_delta
+            )
+            .execution_options(synchronize_session="fetch")
+        )
+        self.session.execute(stmt)
+
+
+    def recalculate(self, document_model, document_ids=None) -> int:
+        """
+        Recomputes the stored totals from the items with one set-based UPDATE.
+
+        Args:
+            document_model: Invoice, Order or Quotation.
+            document_ids (Iterable[int], optional): Documents to repair, all documents if omitted.
+
+        Returns:
+            int: Number of documents updated.
+        """
+        item_model, parent_column = DOCUMENT_ITEMS[document_model]
+
+        sums = (
+            select(
+                document_model.id.label("document_id"),
+                func.coalesce(func.sum(line_total_expression(item_model)), 0).label("net"),
+                func.count(item_model.id).label("item_count")
+            )
+            .select_from(document_model)
+            .outerjoin(item_model, parent_column == document_model.id)
+            .group_by(document_model.id)
+        )
+        if document_ids is not None:
+            document_ids = list(document_ids)
+            if not document_ids:
+                return 0
+            sums = sums.where(document_model.id.in_(document_ids))
+        sums = sums.subquery()
+
+        tax = func.round(sums.c.net * VAT_RATE, 2)
+        stmt = (
+            update(document_model)
+            .where(document_model.id == sums.c.document_id)
+            .values(
+                net_total=sums.c.net,
+                tax_total=tax,
+                gross_total=sums.c.net + tax,
+                item_count=sums.c.item_count
+            )
+            .execution_options(synchronize_session="fetch")
+        )
+        return self.session.execute(stmt).rowcount
+
+
+    def recalculate_all(self) -> dict[str, int]:
+        """
+        Repairs the stored totals of all invoices, orders, and quotations and commits.
+
+        Returns:
+            dict[str, int]: Table names mapped to the number of documents updated.
+        """
+        try:
+            counts = {
+                document_model.__tablename__: self.recalculate(document_model)
+                for document_model in DOCUMENT_ITEMS
+            }
+            self.session.commit()
+            logger.info(f"Document totals recalculated: {counts}.")
+            return counts
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error recalculating document totals: {e}")
+            raise
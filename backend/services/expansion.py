@@ -0,0 +1,60 @@
+from typing import Optional
+from sqlalchemy.orm import selectinload, joinedload
+
+DOCUMENT_EXPANSIONS = ("items", "items.product", "customer", "user")
+
+
+def parse_expand(expand: Optional[str]) -> frozenset[str]:
+    """
+    Validates a comma separated expand parameter.
+
+    Args:
+        expand (str, optional): e.g. 'items.product,customer'.
+
+    Returns:
+        frozenset[str]: Requested relations. 'items.product' implies 'items'.
+
+    Raises:
+        ValueError: If a relation cannot be expanded.
+    """
+    if not expand:
+        return frozenset()
+
+    relations = {relation.strip() for relation in expand.split(",") if relation.strip()}
+    invalid = relations - set(DOCUMENT_EXPANSIONS)
+    if invalid:
+        raise ValueError(
+            f"Invalid expand: {', '.join(sorted(invalid))}. Allowed: {', '.join(DOCUMENT_EXPANSIONS)}."
+        )
+    if "items.product" in relations:
+        relations.add("items")
+    return frozenset(relations)
+
+
+def document_load_options(document_model, item_model, expand: frozenset[str]) -> list:
+    """
+    Builds eager loading options for the expanded relations of a document query.
+
+    Items are loaded with one extra SELECT ... WHERE id IN (...) for all documents, their
+    products are joined into that query, and customer and user are joined into the main query.
+    The number of queries therefore does not depend on the number of documents.
+
+    Args:
+        document_model: Invoice, Order or Quotation.
+        item_model: The matching item model.
+        expand (frozenset[str]): Relations returned by parse_expand().
+
+    Returns:
+        list: Loader options for Select.options().
+    """
+    options = []
+    if "items" in expand:
+        items_loader = selectinload(document_model.items)
+        if "items.product" in expand:
+            items_loader = items_loader.joinedload(item_model.product)
+        options.append(items_loader)
+    if "customer" in expand:
+        options.append(joinedload(document_model.customer))
+    if "user" in expand:
+        options.append(joinedload(document_model.user))
+    return options
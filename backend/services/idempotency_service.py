@@ -0,0 +1,147 @@
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from models.idempotency_key import IdempotencyKey
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24"))
+# A claim of a request that never finished, e.g. because the worker died, can be taken over after this time.
+IDEMPOTENCY_IN_PROGRESS_SECONDS = int(os.getenv("IDEMPOTENCY_IN_PROGRESS_SECONDS", "300"))
+
+
+class IdempotencyService:
+    """
+    Service class for storing and replaying responses of idempotent POST requests.
+
+    claim() commits an in-progress row for the key before the request is handled, and
+    save_response() or release() completes or removes it. Every step is a short transaction
+    of its own, so no connection is held while the request runs.
+    """
+
+    def __init__(self, session):
+        """
+        Initializes the service with a database session.
+        """
+        self.session = session
+
+
+    def claim(self, key: str, request_fingerprint: str) -> Optional[IdempotencyKey]:
+        """
+        Claims a key for a request unless it is in use, taking over expired entries.
+
+        Args:
+            key (str): Hashed idempotency key.
+            request_fingerprint (str): Hash of the request.
+
+        Returns:
+            IdempotencyKey | None: None if the key was claimed, otherwise the existing entry;
+                its status_code is None while the first request is still running.
+        """
+        values = {
+            "request_fingerprint": request_fingerprint,
+            "status_code": None,
+            "content_type": None,
+            "response_body": None,
+            "created_at": datetime.now(),
+            "expires_at": datetime.now() + timedelta(seconds=IDEMPOTENCY_IN_PROGRESS_SECONDS),
+        }
+        stmt = (
+            insert(IdempotencyKey)
+            .values(key=key, **values)
+            .on_conflict_do_update(
+                index_elements=[IdempotencyKey.key],
+                set_=values,
+                where=IdempotencyKey.expires_at <= func.now()
+            )
+            .returning(IdempotencyKey.key)
+        )
+        try:
+            claimed = self.session.execute(stmt).first() is not None
+            existing = None if claimed else self.session.scalars(
+                select(IdempotencyKey).where(IdempotencyKey.key == key)
+            ).first()
+            self.session.commit()
+            return existing
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error claiming idempotency key: {e}")
+            raise
+
+
+    def save_response(
+            self,
+            key: str,
+            status_code: int,
+            content_type: Optional[str],
+            response_body: bytes
+    ) -> None:
+        """
+        Stores the response of a claimed key and commits.
+
+        Args:
+            key (str): Hashed idempotency key.
+            status_code (int): HTTP status code.
+            content_type (str, optional): Content type header.
+            response_body (bytes): Response body.
+        """
+        stmt = (
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .values(
+                status_code=status_code,
+                content_type=content_type,
+                response_body=response_body,
+                expires_at=datetime.now() + timedelta(hours=IDEMPOTENCY_KEY_TTL_HOURS)
+            )
+        )
+        try:
+            self.session.execute(stmt)
+            self.session.commit()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error storing idempotent response: {e}")
+            raise
+
+
+    def release(self, key: str) -> None:
+        """
+        Removes the claim of a key without a stored response, so the request can be retried.
+
+        Args:
+            key (str): Hashed idempotency key.
+        """
+        try:
+            self.session.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None))
+            )
+            self.session.commit()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error releasing idempotency key: {e}")
+            raise
+
+
+    def prune_expired(self) -> dict:
+        """
+        Deletes expired idempotency keys.
+
+        Returns:
+            dict: affected_rows.
+        """
+        try:
+            count = self.session.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.expires_at <= func.now())
+            ).rowcount
+            self.session.commit()
+            return {"affected_rows": count}
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error pruning idempotency keys: {e}")
+            raise
@@ -0,0 +1,363 @@
+import io
+import csv
+import logging
+from sqlalchemy import (
+    Table, Column, MetaData, Integer, Text, Numeric, String,
+    select, insert, exists, func, cast, case, literal, values, column
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from models.customer import Customer
+from models.product import Product
+from models.enums import UnitType
+from services.outbox_service import record_events, CREATED
+from services.product_index import product_index, index_entry
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_ROWS = 5000
+
+CUSTOMER_IMPORT_COLUMNS = ("name", "company_name", "email", "phone", "address", "tax_id", "notes")
+CUSTOMER_UNIQUE_COLUMNS = ("email", "company_name", "tax_id")
+PRODUCT_IMPORT_COLUMNS = ("name", "description", "unit_price", "unit")
+# Columns the header must contain; a group of several names needs at least one of them.
+CUSTOMER_REQUIRED_COLUMNS = (("email",), ("name", "company_name"))
+PRODUCT_REQUIRED_COLUMNS = (("name",), ("unit_price",), ("unit",))
+
+# Same rules as CustomerService.is_valid_email, in Postgres regular expression syntax.
+EMAIL_PATTERN = r"^[\w.-]+@[\w.-]+\.\w+$"
+NUMBER_PATTERN = r"^-?[0-9]+(\.[0-9]+)?$"
+# Fits products.unit_price, NUMERIC(12, 2).
+PRICE_PATTERN = r"^-?[0-9]{1,10}(\.[0-9]{1,2})?$"
+
+
+def _staging_table(name: str, columns: tuple[str, ...]) -> Table:
+    """
+    Defines a temporary table holding the raw CSV values of one import, dropped on commit.
+    """
+    return Table(
+        name,
+        MetaData(),
+        Column("line", Integer, primary_key=True, autoincrement=False),
+        *[Column(column_name, Text) for column_name in columns],
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP"
+    )
+
+
+def _errors_table() -> Table:
+    """
+    Defines the temporary table collecting validation errors by CSV line.
+    """
+    return Table(
+        "import_errors",
+        MetaData(),
+        Column("line", Integer, nullable=False),
+        Column("message", Text, nullable=False),
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP"
+    )
+
+
+def format_error_report(errors: list[dict]) -> str:
+    """
+    Renders import errors as CSV with the columns line and message.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["line", "message"])
+    writer.writerows([error["line"], error["message"]] for error in errors)
+    return buffer.getvalue()
+
+
+class ImportService:
+    """
+    Service class for bulk imports of customers and products from CSV files.
+
+    The file is parsed in chunks and loaded with COPY into a temporary staging table.
+    Validation and duplicate detection run as set-based statements over the staging table,
+    then all valid rows are merged with a single INSERT ... SELECT. Invalid rows are skipped
+    and reported by line; everything is committed in one transaction.
+    """
+
+    def __init__(self, session):
+        """
+        Initializes the service with a database session.
+        """
+        self.session = session
+
+
+    def import_customers(self, file) -> dict:
+        """
+        Imports customers from a CSV file with a header row.
+
+        Columns: email (required), name and/or company_name (one required), phone, address,
+        tax_id and notes. Email, company name and tax ID must be unique in the file and
+        must not belong to an existing customer.
+
+        Args:
+            file (BinaryIO): UTF-8 encoded CSV file.
+
+        Returns:
+            dict: total_rows, imported, failed and errors (line and message, sorted by line).
+
+        Raises:
+            ValueError: If the file cannot be parsed or the header is invalid.
+        """
+        staging = _staging_table("customer_import", CUSTOMER_IMPORT_COLUMNS)
+        errors = _errors_table()
+
+        def checks():
+            yield "email is required.", staging.c.email.is_(None)
+            yield "Invalid email address format.", staging.c.email.op("!~")(EMAIL_PATTERN)
+            yield (
+                "name or company_name is required.",
+                staging.c.name.is_(None) & staging.c.company_name.is_(None)
+            )
+            for column_name in CUSTOMER_UNIQUE_COLUMNS:
+                yield (
+                    f"{column_name} already in use by another customer.",
+                    exists().where(getattr(Customer, column_name) == staging.c[column_name])
+                )
+
+        def duplicates():
+            for column_name in CUSTOMER_UNIQUE_COLUMNS:
+                yield f"Duplicate {column_name} in file.", staging.c[column_name]
+
+        def merge(valid_rows):
+            stmt = (
+                pg_insert(Customer)
+                .from_select(list(CUSTOMER_IMPORT_COLUMNS), select(*staging.c[CUSTOMER_IMPORT_COLUMNS]).where(valid_rows))
+                .on_conflict_do_nothing()
+                .returning(Customer.id, Customer.name, Customer.company_name)
+            )
+            rows = self.session.execute(stmt).all()
+            record_events(self.session, [
+                {
+                    "entity_type": "customer", "entity_id": row.id, "action": CREATED,
+                    "payload": {"name": row.name, "company_name": row.company_name}
+                }
+                for row in rows
+            ])
+            return rows
+
+        result, _ = self._run_import(
+            file, staging, CUSTOMER_REQUIRED_COLUMNS, errors, checks(), duplicates(), merge
+        )
+        return result
+
+
+    def import_products(self, file) -> dict:
+        """
+        Imports products from a CSV file with a header row.
+
+        Columns: name, unit_price and unit (required) and description. The unit is a UnitType
+        value or name, e.g. 'kg' or 'KILOGRAM'. Prices must be numbers of zero or more and
+        names must be unique in the file and among existing products.
+
+        Args:
+            file (BinaryIO): UTF-8 encoded CSV file.
+
+        Returns:
+            dict: total_rows, imported, failed and errors (line and message, sorted by line).
+
+        Raises:
+            ValueError: If the file cannot be parsed or the header is invalid.
+        """
+        staging = _staging_table("product_import", PRODUCT_IMPORT_COLUMNS)
+        errors = _errors_table()
+        units = values(column("key", String), column("name", String), name="units").data(
+            [(unit.value.lower(), unit.name) for unit in UnitType]
+            + [(unit.name.lower(), unit.name) for unit in UnitType if unit.name.lower() != unit.value.lower()]
+        )
+        is_number = staging.c.unit_price.op("~")(NUMBER_PATTERN)
+
+        def checks():
+            yield "name is required.", staging.c.name.is_(None)
+            yield "unit_price is required.", staging.c.unit_price.is_(None)
+            yield literal("Invalid unit_price: ") + staging.c.unit_price, ~is_number
+            yield (
+                "unit_price must have at most 10 digits before and 2 after the decimal point.",
+                is_number & staging.c.unit_price.op("!~")(PRICE_PATTERN)
+            )
+            # CASE makes sure only values matching the number pattern are cast.
+            yield "Unit price must be zero or positive.", case(
+                (is_number, cast(staging.c.unit_price, Numeric) < 0), else_=False
+            )
+            yield "unit is required.", staging.c.unit.is_(None)
+            yield literal("Invalid unit: ") + staging.c.unit, staging.c.unit.is_not(None) & ~exists().where(
+                units.c.key == func.lower(staging.c.unit)
+            )
+            yield "Product name already in use by another product.", exists().where(Product.name == staging.c.name)
+
+        def duplicates():
+            yield "Duplicate name in file.", staging.c.name
+
+        def merge(valid_rows):
+            unit_type = Product.__table__.c.unit.type
+            rows_to_insert = (
+                select(
+                    staging.c.name,
+                    staging.c.description,
+                    cast(staging.c.unit_price, Numeric),
+                    cast(units.c.name, unit_type),
+                )
+                .join(units, units.c.key == func.lower(staging.c.unit))
+                .where(valid_rows)
+            )
+            stmt = (
+                pg_insert(Product)
+                .from_select(["name", "description", "unit_price", "unit"], rows_to_insert)
+                .on_conflict_do_nothing()
+                .returning(Product.id, Product.name, Product.description, Product.unit, Product.unit_price)
+            )
+            rows = self.session.execute(stmt).all()
+            record_events(self.session, [
+                {
+                    "entity_type": "product", "entity_id": row.id, "action": CREATED,
+                    "payload": {"name": row.name, "unit_price": row.unit_price}
+                }
+                for row in rows
+            ])
+            return rows
+
+        result, rows = self._run_import(
+            file, staging, PRODUCT_REQUIRED_COLUMNS, errors, checks(), duplicates(), merge
+        )
+        for row in rows:
+            product_index.upsert(index_entry(row))
+        return result
+
+
+    def _run_import(
+        self, file, staging: Table, required: tuple, errors: Table, checks, duplicates, merge
+    ) -> tuple[dict, list]:
+        """
+        Loads the file into the staging table, records validation errors, merges the valid rows and commits.
+
+        Args:
+            file (BinaryIO): CSV file.
+            staging (Table): Temporary staging table.
+            required (tuple): Groups of column names; the header must contain one name of each group.
+            errors (Table): Temporary error table.
+            checks (Iterable): (message, condition) pairs; rows matching a condition are invalid.
+            duplicates (Iterable): (message, column) pairs; every row repeating an earlier
+                row's value in the column is invalid.
+            merge (Callable): Inserts the rows matching the given condition and returns the inserted rows.
+
+        Returns:
+            tuple[dict, list]: The import summary and the inserted rows.
+        """
+        try:
+            connection = self.session.connection()
+            staging.create(connection)
+            errors.create(connection)
+            total_rows = self._copy_csv(connection, file, staging, required)
+
+            for message, condition in checks:
+                message = literal(message) if isinstance(message, str) else message
+                self.session.execute(
+                    insert(errors).from_select(["line", "message"], select(staging.c.line, message).where(condition))
+                )
+            for message, duplicate_column in duplicates:
+                ranked = (
+                    select(
+                        staging.c.line,
+                        func.row_number().over(partition_by=duplicate_column, order_by=staging.c.line).label("position")
+                    )
+                    .where(duplicate_column.is_not(None))
+                    .subquery()
+                )
+                self.session.execute(
+                    insert(errors).from_select(
+                        ["line", "message"],
+                        select(ranked.c.line, literal(message)).where(ranked.c.position > 1)
+                    )
+                )
+
+            rows = merge(~exists().where(errors.c.line == staging.c.line))
+            error_rows = self.session.execute(
+                select(errors.c.line, errors.c.message).order_by(errors.c.line, errors.c.message)
+            ).all()
+            self.session.commit()
+        except (SQLAlchemyError, ValueError) as e:
+            self.session.rollback()
+            logger.error(f"Error importing into {staging.name}: {e}")
+            raise
+
+        error_list = [{"line": line, "message": message} for line, message in error_rows]
+        failed = len({error["line"] for error in error_list})
+        logger.info(f"Imported {len(rows)} of {total_rows} rows from {staging.name}, {failed} rows failed.")
+        return {
+            "total_rows": total_rows,
+            "imported": len(rows),
+            "failed": failed,
+            # Valid rows that collided with a row committed concurrently are skipped without a line.
+            "skipped": total_rows - failed - len(rows),
+            "errors": error_list,
+        }, rows
+
+
+    @staticmethod
+    def _copy_csv(connection, file, staging: Table, required: tuple) -> int:
+        """
+        Parses the CSV file in chunks and streams each chunk into the staging table with COPY.
+
+        Header names are matched case-insensitively, blank values are loaded as NULL and every
+        row keeps its line number in the file.
+
+        Returns:
+            int: Number of data rows.
+
+        Raises:
+            ValueError: If the file is not UTF-8 CSV, a required column is missing or a column is unknown.
+        """
+        columns = [column_name for column_name in staging.c.keys() if column_name != "line"]
+        text_file = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        cursor = connection.connection.cursor()
+        copy_sql = f"COPY {staging.name} (line, {', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+
+        try:
+            reader = csv.reader(text_file)
+            header = [name.strip().lower() for name in next(reader, [])]
+            unknown = [name for name in header if name not in columns]
+            if not header or unknown:
+                raise ValueError(
+                    f"Invalid CSV header. Unknown columns: {', '.join(unknown) or 'none'}. "
+                    f"Allowed: {', '.join(columns)}."
+                )
+            missing = [" or ".join(group) for group in required if not any(name in header for name in group)]
+            if missing:
+                raise ValueError(f"Invalid CSV header. Missing required columns: {', '.join(missing)}.")
+            positions = [header.index(name) if name in header else None for name in columns]
+
+            total_rows = 0
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in reader:
+                if not any(value.strip() for value in row):
+                    continue
+                values_by_column = [
+                    (row[position].strip() or None) if position is not None and position < len(row) else None
+                    for position in positions
+                ]
+                writer.writerow([reader.line_num, *values_by_column])
+                total_rows += 1
+                if total_rows % IMPORT_CHUNK_ROWS == 0:
+                    buffer.seek(0)
+                    cursor.copy_expert(copy_sql, buffer)
+                    buffer.seek(0)
+                    buffer.truncate()
+            if buffer.tell():
+                buffer.seek(0)
+                cursor.copy_expert(copy_sql, buffer)
+        except UnicodeDecodeError:
+            raise ValueError("The file must be UTF-8 encoded.")
+        except csv.Error as e:
+            raise ValueError(f"Invalid CSV in line {reader.line_num}: {e}")
+        finally:
+            cursor.close()
+            text_file.detach()
+        return total_rows
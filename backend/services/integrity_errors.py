@@ -0,0 +1,33 @@
+from sqlalchemy.exc import IntegrityError
+
+
+def get_constraint_name(error: IntegrityError) -> str | None:
+    """
+    Extracts the name of the violated constraint from a database error.
+
+    Args:
+        error (IntegrityError): Error raised by the database driver.
+
+    Returns:
+        str | None: Name of the constraint, or None if the driver does not report it.
+    """
+    diag = getattr(error.orig, "diag", None)
+    return getattr(diag, "constraint_name", None)
+
+
+def raise_for_constraint_violation(error: IntegrityError, messages: dict[str, str]) -> None:
+    """
+    Translates a unique or foreign key violation into a user-facing ValueError.
+
+    Args:
+        error (IntegrityError): Error raised while writing to the database.
+        messages (dict[str, str]): Constraint names mapped to error messages.
+
+    Raises:
+        ValueError: If the violated constraint is listed in messages.
+        IntegrityError: The original error for any other constraint.
+    """
+    constraint_name = get_constraint_name(error)
+    if constraint_name in messages:
+        raise ValueError(messages[constraint_name]) from error
+    raise error
@@ -1,14 +1,26 @@
 import logging
-from sqlalchemy import select
-from sqlalchemy.exc import SQLAlchemyError
+from decimal import Decimal
+from datetime import date
+from typing import Iterator, Optional
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
 from models.invoice_item import InvoiceItem
 from models.invoice import Invoice
 from models.product import Product
+from services.integrity_errors import raise_for_constraint_violation
+from services.document_totals_service import DocumentTotalsService, line_total
+from services.sorting import apply_sort, ITEM_SORT_FIELDS
+from services.outbox_service import record_event, record_events, CREATED, UPDATED, DELETED
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+ITEM_STREAM_BATCH_SIZE = 1000
+
+INVOICE_ITEM_INVOICE_FKEY = "invoice_items_invoice_id_fkey"
+INVOICE_ITEM_PRODUCT_FKEY = "invoice_items_product_id_fkey"
+
 
 class InvoiceItemService:
     """
@@ -58,17 +70,20 @@ class InvoiceItemService:
         return product
 
 
-    def get_item_by_id_or_raise(self, item_id: int):
+    def get_item_by_id_or_raise(self, item_id: int, for_update: bool = False):
         """
         Retrieves an invoice item by ID or raises an error if not found.
 
         Args:
             item_id (int): The ID of the invoice item.
+            for_update (bool): Lock the item row until the transaction ends.
 
         Returns:
             InvoiceItem: The found invoice item.
         """
         stmt = select(InvoiceItem).where(InvoiceItem.id == item_id)
+        if for_update:
+            stmt = stmt.with_for_update().execution_options(populate_existing=True)
         item = self.session.scalars(stmt).first()
 
         if not item:
@@ -76,36 +91,76 @@ class InvoiceItemService:
         return item
 
 
-    def get_all_items(self):
+    def get_items_page(self, invoice: Invoice, limit: int = 100, offset: int = 0, sort_by: Optional[str] = None) -> dict:
         """
-        Retrieves all invoice items from the database.
+        Retrieves one page of the items of an invoice using the index on (invoice_id, id).
+
+        Args:
+            invoice (Invoice): The invoice whose items are listed.
+            limit (int): Maximum number of items.
+            offset (int): Number of items to skip.
+            sort_by (str, optional): Sort field such as 'unit_price', prefix with '-' for descending order.
 
         Returns:
-            list: List of all InvoiceItem instances.
+            dict: items, total, limit and offset. total is the stored item count of the invoice.
+
+        Raises:
+            ValueError: If the sort field is invalid.
         """
+        stmt = select(InvoiceItem).where(InvoiceItem.invoice_id == invoice.id)
+        stmt = apply_sort(stmt, InvoiceItem, sort_by or "id", ITEM_SORT_FIELDS).limit(limit).offset(offset)
+
         try:
-            return self.session.scalars(select(InvoiceItem)).all()
+            items = self.session.scalars(stmt).all()
         except SQLAlchemyError as e:
-            logger.error(f"Error retrieving invoice items: {e}")
-            return []
+            logger.error(f"Error retrieving items of invoice id {invoice.id}: {e}")
+            raise
+        return {"items": items, "total": invoice.item_count, "limit": limit, "offset": offset}
+
 
+    def stream_items(
+            self,
+            product_id: Optional[int] = None,
+            date_from: Optional[date] = None,
+            date_to: Optional[date] = None
+    ) -> Iterator[InvoiceItem]:
+        """
+        Yields invoice items in ID order, read in batches through a server-side cursor.
+
+        Args:
+            product_id (int, optional): Only items of this product.
+            date_from (date, optional): Only items of invoices issued on or after this day.
+            date_to (date, optional): Only items of invoices issued on or before this day.
 
-    def create_item(self, invoice_id: int, product_id: int, quantity: float, unit_price: float) -> None:
+        Yields:
+            InvoiceItem: The matching items.
+        """
+        stmt = select(InvoiceItem).order_by(InvoiceItem.id)
+        if product_id:
+            stmt = stmt.where(InvoiceItem.product_id == product_id)
+        if date_from or date_to:
+            stmt = stmt.join(Invoice, Invoice.id == InvoiceItem.invoice_id)
+            if date_from:
+                stmt = stmt.where(Invoice.issue_date >= date_from)
+            if date_to:
+                stmt = stmt.where(Invoice.issue_date <= date_to)
+
+        yield from self.session.scalars(stmt.execution_options(yield_per=ITEM_STREAM_BATCH_SIZE))
+
+
+    def create_item(self, invoice_id: int, product_id: int, quantity: Decimal, unit_price: Decimal) -> None:
         """
         Creates a new invoice item.
 
         Args:
             invoice_id (int): The invoice the item belongs to.
             product_id (int): The associated product.
-            quantity (float): Quantity of the product.
-            unit_price (float): Price per unit.
+            quantity (Decimal): Quantity of the product.
+            unit_price (Decimal): Price per unit.
 
         Raises:
             ValueError: If quantity or price is negative or foreign key targets don't exist.
         """
-        self.get_invoice_or_raise(invoice_id)
-        self.get_product_or_raise(product_id)
-
         if quantity < 0:
             raise ValueError("Quantity must be zero or positive.")
         if unit_price < 0:
@@ -120,36 +175,54 @@ class InvoiceItemService:
 
         try:
             self.session.add(new_item)
+            DocumentTotalsService(self.session).apply_item_delta(
+                Invoice, invoice_id, line_total(quantity, unit_price), 1
+            )
+            self.session.flush()
+            record_event(self.session, "invoice_item", new_item.id, CREATED, {"invoice_id": invoice_id})
             self.session.commit()
             logger.info(f"Item created successfully for invoice id {invoice_id}.")
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Invoice item for invoice id {invoice_id} violates a constraint: {e.orig}")
+            raise_for_constraint_violation(e, {
+                INVOICE_ITEM_INVOICE_FKEY: f"Invoice with id '{invoice_id}' not found.",
+                INVOICE_ITEM_PRODUCT_FKEY: f"Product with id '{product_id}' not found.",
+            })
         except SQLAlchemyError as e:
             self.session.rollback()
             logger.error(f"Error creating invoice item: {e}")
             raise
 
 
-    def update_item(self, item_id: int, new_quantity: float, new_unit_price: float) -> None:
+    def update_item(self, item_id: int, new_quantity: Decimal, new_unit_price: Decimal) -> None:
         """
         Updates quantity and unit price of an existing invoice item.
 
         Args:
             item_id (int): ID of the invoice item to update.
-            new_quantity (float): New quantity.
-            new_unit_price (float): New unit price.
+            new_quantity (Decimal): New quantity.
+            new_unit_price (Decimal): New unit price.
 
         Raises:
             ValueError: If quantity or price is negative.
         """
-        item = self.get_item_by_id_or_raise(item_id)
-
         if new_quantity < 0:
             raise ValueError("Quantity must be zero or positive.")
         if new_unit_price < 0:
             raise ValueError("Unit price must be zero or positive.")
 
+        # The lock keeps concurrent edits of the item from computing their deltas from the same values.
+        item = self.get_item_by_id_or_raise(item_id, for_update=True)
+
         try:
+            net_delta = line_total(new_quantity, new_unit_price) - line_total(item.quantity, item.unit_price)
             item.quantity = new_quantity
             item.unit_price = new_unit_price
+            DocumentTotalsService(self.session).apply_item_delta(Invoice, item.invoice_id, net_delta, 0)
+            record_event(self.session, "invoice_item", item_id, UPDATED, {
+                "invoice_id": item.invoice_id, "quantity": new_quantity, "unit_price": new_unit_price
+            })
             self.session.commit()
             logger.info(f"Invoice item updated successfully for id {item_id}.")
         except SQLAlchemyError as e:
@@ -165,13 +238,143 @@ class InvoiceItemService:
         Args:
             item_id (int): ID of the invoice item to delete.
         """
-        item = self.get_item_by_id_or_raise(item_id)
+        # Locked so a concurrent update cannot change the line total subtracted below.
+        item = self.get_item_by_id_or_raise(item_id, for_update=True)
 
         try:
             self.session.delete(item)
+            DocumentTotalsService(self.session).apply_item_delta(
+                Invoice, item.invoice_id, -line_total(item.quantity, item.unit_price), -1
+            )
+            record_event(self.session, "invoice_item", item_id, DELETED, {"invoice_id": item.invoice_id})
             self.session.commit()
             logger.info(f"Invoice item with id '{item_id}' deleted successfully.")
         except SQLAlchemyError as e:
             self.session.rollback()
             logger.error(f"Error deleting invoice item with id '{item_id}': {e}")
             raise
+
+
+    def apply_bulk(self, creates: list[dict], updates: list[dict], deletes: list[int]) -> dict:
+        """
+        Creates, updates and deletes many invoice items in one transaction using batched statements.
+
+        Rows that reference a missing invoice, product or item are reported and skipped,
+        all other rows are applied.
+
+        Args:
+            creates (list[dict]): New items with invoice_id, product_id, quantity and unit_price.
+            updates (list[dict]): Changes with the item id and a new quantity and/or unit_price.
+            deletes (list[int]): IDs of the items to delete.
+
+        Returns:
+            dict: Per-row results under the keys 'created', 'updated' and 'deleted'.
+        """
+        results = {"created": [], "updated": [], "deleted": []}
+        events = []
+
+        try:
+            invoice_ids = set(self.session.scalars(
+                select(Invoice.id).where(Invoice.id.in_({row["invoice_id"] for row in creates}))
+            ))
+            product_ids = set(self.session.scalars(
+                select(Product.id).where(Product.id.in_({row["product_id"] for row in creates}))
+            ))
+
+            valid_creates = []
+            for index, row in enumerate(creates):
+                if row["invoice_id"] not in invoice_ids:
+                    detail = f"Invoice with id '{row['invoice_id']}' not found."
+                elif row["product_id"] not in product_ids:
+                    detail = f"Product with id '{row['product_id']}' not found."
+                elif row["quantity"] < 0 or row["unit_price"] < 0:
+                    detail = "Quantity and unit price must be zero or positive."
+                else:
+                    valid_creates.append((index, row))
+                    continue
+                results["created"].append({"index": index, "status": "error", "detail": detail})
+
+            if valid_creates:
+                stmt = insert(InvoiceItem).returning(InvoiceItem.id, sort_by_parameter_order=True)
+                new_ids = self.session.scalars(stmt, [row for _, row in valid_creates]).all()
+                for (index, row), item_id in zip(valid_creates, new_ids):
+                    results["created"].append({"index": index, "id": item_id, "status": "created"})
+                    events.append({
+                        "entity_type": "invoice_item", "entity_id": item_id, "action": CREATED,
+                        "payload": {"invoice_id": row["invoice_id"]}
+                    })
+                results["created"].sort(key=lambda result: result["index"])
+
+            affected_invoice_ids = {row["invoice_id"] for _, row in valid_creates}
+
+            existing_items = dict(self.session.execute(
+                select(InvoiceItem.id, InvoiceItem.invoice_id).where(InvoiceItem.id.in_({row["id"] for row in updates}))
+            ).tuples().all())
+
+            valid_updates = []
+            for row in updates:
+                changes = {
+                    key: row[key]
+                    for key in ("quantity", "unit_price")
+                    if row.get(key) is not None
+                }
+                if row["id"] not in existing_items:
+                    detail = f"Item with id '{row['id']}' not found."
+                elif not changes:
+                    detail = "No fields to update."
+                elif any(value < 0 for value in changes.values()):
+                    detail = "Quantity and unit price must be zero or positive."
+                else:
+                    valid_updates.append({"id": row["id"], **changes})
+                    events.append({
+                        "entity_type": "invoice_item", "entity_id": row["id"], "action": UPDATED,
+                        "payload": {"invoice_id": existing_items[row["id"]], **changes}
+                    })
+                    affected_invoice_ids.add(existing_items[row["id"]])
+                    results["updated"].append({"id": row["id"], "status": "updated"})
+                    continue
+                results["updated"].append({"id": row["id"], "status": "error", "detail": detail})
+
+            if valid_updates:
+                self.session.execute(update(InvoiceItem), valid_updates)
+
+            deleted_ids = set()
+            if deletes:
+                stmt = delete(InvoiceItem).where(InvoiceItem.id.in_(deletes)).returning(InvoiceItem.id, InvoiceItem.invoice_id)
+                deleted_items = dict(self.session.execute(stmt).tuples().all())
+                deleted_ids = set(deleted_items)
+                events += [
+                    {
+                        "entity_type": "invoice_item", "entity_id": item_id, "action": DELETED,
+                        "payload": {"invoice_id": parent_id}
+                    }
+                    for item_id, parent_id in deleted_items.items()
+                ]
+                affected_invoice_ids.update(deleted_items.values())
+            for item_id in deletes:
+                if item_id in deleted_ids:
+                    results["deleted"].append({"id": item_id, "status": "deleted"})
+                else:
+                    results["deleted"].append({
+                        "id": item_id, "status": "error", "detail": f"Item with id '{item_id}' not found."
+                    })
+
+            DocumentTotalsService(self.session).recalculate(Invoice, affected_invoice_ids)
+            record_events(self.session, events)
+            self.session.commit()
+            logger.info(
+                f"Bulk invoice item operation applied: {len(valid_creates)} created, "
+                f"{len(valid_updates)} updated, {len(deleted_ids)} deleted."
+            )
+            return results
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Bulk invoice item operation violates a constraint: {e.orig}")
+            raise_for_constraint_violation(e, {
+                INVOICE_ITEM_INVOICE_FKEY: "Invoice not found.",
+                INVOICE_ITEM_PRODUCT_FKEY: "Product not found.",
+            })
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error applying bulk invoice item operation: {e}")
+            raise
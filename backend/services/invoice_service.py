@@ -1,19 +1,31 @@
 import logging
-from sqlalchemy import select
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import select, insert, delete
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from typing import Optional
 
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from models.invoice import Invoice
 from models.invoice_item import InvoiceItem
 from models.enums import InvoiceStatus
 from models.customer import Customer
 from models.user import User
+from services.integrity_errors import raise_for_constraint_violation
+from services.product_service import ProductService
+from services.document_totals_service import DocumentTotalsService, line_total
+from services.sorting import apply_sort
+from services.expansion import document_load_options
+from services.number_series_service import NumberSeriesService, INVOICE_PREFIX
+from services.outbox_service import record_event, record_events, item_events, CREATED, UPDATED, STATUS_CHANGED, DELETED
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+INVOICE_NUMBER_KEY = "invoices_invoice_number_key"
+INVOICE_CUSTOMER_FKEY = "invoices_customer_id_fkey"
+INVOICE_USER_FKEY = "invoices_user_id_fkey"
+
 
 class InvoiceService:
     """
@@ -27,17 +39,22 @@ class InvoiceService:
         self.session = session
 
 
-    def get_invoice_by_id_or_raise(self, invoice_id: int) -> Invoice:
+    def get_invoice_by_id_or_raise(self, invoice_id: int, expand: frozenset[str] = frozenset()) -> Invoice:
         """
         Retrieves an invoice by ID or raises a ValueError if not found.
 
         Args:
             invoice_id (int): ID of the invoice.
+            expand (frozenset[str], optional): Relations to eager-load, see parse_expand().
 
         Returns:
             Invoice: The found invoice instance.
         """
-        stmt = select(Invoice).where(Invoice.id == invoice_id)
+        stmt = (
+            select(Invoice)
+            .options(*document_load_options(Invoice, InvoiceItem, expand))
+            .where(Invoice.id == invoice_id)
+        )
         invoice = self.session.scalars(stmt).first()
 
         if not invoice:
@@ -111,8 +128,9 @@ class InvoiceService:
         due_date=None,
         invoice_number=None,
         status: str = "DRAFT",
-        notes: str = None
-    ) -> None:
+        notes: str = None,
+        items: list[dict] = None
+    ) -> Invoice:
         """
         Creates a new invoice with optional fields and validations.
 
@@ -121,26 +139,21 @@ class InvoiceService:
             user_id (int): ID of the user.
             issue_date (date): Invoice issue date.
             due_date (date, optional): Due date.
-            invoice_number (str, optional): Unique invoice number.
+            invoice_number (str, optional): Unique invoice number, allocated from the RE series if omitted.
             status (str): Status string, must match InvoiceStatus.
             notes (str, optional): Notes.
+            items (list[dict], optional): Line items with product_id, quantity and an optional unit_price.
+                Missing unit prices are taken from the product catalog.
+
+        Returns:
+            Invoice: The created invoice including its items.
 
         Raises:
-            ValueError: If status or invoice_number is invalid or already in use.
+            ValueError: If status is invalid, invoice_number is already in use or customer, user or a product do not exist.
         """
-        self.get_customer_or_raise(customer_id)
-        self.get_user_or_raise(user_id)
-
         if status.upper() not in InvoiceStatus.__members__:
             raise ValueError(f"Invalid invoice status: {status}")
 
-        if invoice_number is not None:
-            existing_invoice = self.session.scalars(
-                select(Invoice).where(Invoice.invoice_number == invoice_number)
-            ).first()
-            if existing_invoice:
-                raise ValueError("Invoice number already in use.")
-
         new_invoice = Invoice(
             customer_id=customer_id,
             user_id=user_id,
@@ -153,18 +166,92 @@ class InvoiceService:
 
         try:
             self.session.add(new_invoice)
+            self.session.flush()
+            created_items = self.insert_items(new_invoice, items or [])
+            NumberSeriesService(self.session).assign_number_if_missing(new_invoice, "invoice_number", INVOICE_PREFIX)
+            record_event(self.session, "invoice", new_invoice.id, CREATED, {
+                "customer_id": customer_id, "status": new_invoice.status, "invoice_number": new_invoice.invoice_number
+            })
+            record_events(self.session, item_events("invoice", new_invoice.id, [item.id for item in created_items], CREATED))
             self.session.commit()
             logger.info(f"Invoice created successfully for customer id {customer_id}.")
-        except SQLAlchemyError as e:
+            return new_invoice
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Invoice for customer id {customer_id} violates a constraint: {e.orig}")
+            raise_for_constraint_violation(e, {
+                INVOICE_NUMBER_KEY: "Invoice number already in use.",
+                INVOICE_CUSTOMER_FKEY: f"Customer with id {customer_id} not found.",
+                INVOICE_USER_FKEY: f"User with id {user_id} not found.",
+            })
+        except (SQLAlchemyError, ValueError) as e:
             self.session.rollback()
             logger.error(f"Error creating invoice: {e}")
             raise
 
+
+    def insert_items(self, invoice: Invoice, items: list[dict]) -> list[InvoiceItem]:
+        """
+        Inserts the line items of an invoice with one batched product lookup and one multi-row INSERT
+        and adds them to the stored totals.
+
+        The caller is responsible for committing the transaction.
+
+        Args:
+            invoice (Invoice): The flushed invoice the items belong to.
+            items (list[dict]): Line items with product_id, quantity and an optional unit_price.
+
+        Returns:
+            list[InvoiceItem]: The created items.
+
+        Raises:
+            ValueError: If a quantity or price is negative or a product does not exist.
+        """
+        for item in items:
+            if item["quantity"] < 0:
+                raise ValueError("Quantity must be zero or positive.")
+            if item.get("unit_price") is not None and item["unit_price"] < 0:
+                raise ValueError("Unit price must be zero or positive.")
+
+        unit_prices = ProductService(self.session).get_unit_prices_or_raise(
+            item["product_id"] for item in items
+        )
+
+        created_items = []
+        if items:
+            stmt = insert(InvoiceItem).returning(InvoiceItem, sort_by_parameter_order=True)
+            created_items = self.session.scalars(stmt, [
+                {
+                    "invoice_id": invoice.id,
+                    "product_id": item["product_id"],
+                    "quantity": item["quantity"],
+                    "unit_price": (
+                        item["unit_price"] if item.get("unit_price") is not None
+                        else unit_prices[item["product_id"]]
+                    ),
+                }
+                for item in items
+            ]).all()
+
+        if created_items:
+            DocumentTotalsService(self.session).apply_item_delta(
+                Invoice,
+                invoice.id,
+                sum(line_total(item.quantity, item.unit_price) for item in created_items),
+                len(created_items)
+            )
+
+        set_committed_value(invoice, "items", created_items)
+        return created_items
+
+
     def get_all_invoices(
             self,
             status: Optional[str] = None,
             invoice_number: Optional[str] = None,
-            customer_id: Optional[int] = None
+            customer_id: Optional[int] = None,
+            sort_by: Optional[str] = None,
+            expand: frozenset[str] = frozenset()
     ) -> list[Invoice]:
         """
         Retrieves all invoices, optionally filtered by status, invoice number, or customer ID.
@@ -173,11 +260,13 @@ class InvoiceService:
             status (str, optional): Filter by invoice status.
             invoice_number (str, optional): Filter by invoice number.
             customer_id (int, optional): Filter by customer ID.
+            sort_by (str, optional): Sort field such as 'gross_total', prefix with '-' for descending order.
+            expand (frozenset[str], optional): Relations to eager-load, see parse_expand().
 
         Returns:
             list[Invoice]: List of matching Invoice instances.
         """
-        stmt = select(Invoice)
+        stmt = select(Invoice).options(*document_load_options(Invoice, InvoiceItem, expand))
 
         if status:
             if status.upper() not in InvoiceStatus.__members__:
@@ -191,6 +280,8 @@ class InvoiceService:
         if customer_id:
             stmt = stmt.where(Invoice.customer_id == customer_id)
 
+        stmt = apply_sort(stmt, Invoice, sort_by)
+
         try:
             return self.session.scalars(stmt).all()
         except SQLAlchemyError as e:
@@ -215,6 +306,7 @@ class InvoiceService:
 
         try:
             invoice.status = InvoiceStatus[new_status.upper()]
+            record_event(self.session, "invoice", invoice_id, STATUS_CHANGED, {"status": invoice.status})
             self.session.commit()
             logger.info(f"Invoice status updated successfully for id {invoice_id}.")
         except SQLAlchemyError as e:
@@ -235,6 +327,7 @@ class InvoiceService:
 
         try:
             invoice.notes = new_notes
+            record_event(self.session, "invoice", invoice_id, UPDATED, {"notes": new_notes})
             self.session.commit()
             logger.info(f"Invoice notes updated successfully for id {invoice_id}.")
         except SQLAlchemyError as e:
@@ -245,15 +338,26 @@ class InvoiceService:
 
     def delete_invoice(self, invoice_id: int) -> None:
         """
-        Deletes an invoice by ID.
+        Deletes an invoice by ID with a single DELETE statement. The database removes
+        its items through ON DELETE CASCADE without loading them.
 
         Args:
             invoice_id (int): ID of the invoice to delete.
-        """
-        invoice = self.get_invoice_by_id_or_raise(invoice_id)
 
+        Raises:
+            ValueError: If the invoice does not exist.
+        """
+        stmt = (
+            delete(Invoice)
+            .where(Invoice.id == invoice_id)
+            .returning(Invoice.id)
+            .execution_options(synchronize_session=False)
+        )
         try:
-            self.session.delete(invoice)
+            if self.session.scalar(stmt) is None:
+                self.session.rollback()
+                raise ValueError(f"Invoice with id {invoice_id} not found.")
+            record_event(self.session, "invoice", invoice_id, DELETED)
             self.session.commit()
             logger.info(f"Invoice with id '{invoice_id}' deleted successfully.")
         except SQLAlchemyError as e:
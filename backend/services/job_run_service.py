@@ -0,0 +1,112 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, delete
+from sqlalchemy.exc import SQLAlchemyError
+
+from models.job_run import JobRun
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+JOB_RUN_RETENTION_DAYS = 30
+
+
+class JobRunService:
+    """
+    Service class for recording and reading runs of scheduled jobs.
+    """
+
+    def __init__(self, session):
+        """
+        Initializes the service with a database session.
+        """
+        self.session = session
+
+
+    def record_run(
+            self,
+            job_name: str,
+            status: str,
+            started_at: datetime,
+            duration_ms: float,
+            affected_rows: int = 0,
+            batches: int = 0,
+            error: Optional[str] = None
+    ) -> JobRun:
+        """
+        Stores the metrics of one job run.
+
+        Args:
+            job_name (str): Name of the job.
+            status (str): 'success' or 'failed'.
+            started_at (datetime): Start of the run.
+            duration_ms (float): Run time in milliseconds.
+            affected_rows (int): Rows changed by the run.
+            batches (int): Committed batches.
+            error (str, optional): Error message of a failed run.
+
+        Returns:
+            JobRun: The stored run.
+        """
+        job_run = JobRun(
+            job_name=job_name,
+            status=status,
+            started_at=started_at,
+            finished_at=started_at + timedelta(milliseconds=duration_ms),
+            duration_ms=duration_ms,
+            affected_rows=affected_rows,
+            batches=batches,
+            error=error
+        )
+        try:
+            self.session.add(job_run)
+            self.session.commit()
+            return job_run
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error recording run of job '{job_name}': {e}")
+            raise
+
+
+    def get_runs(self, job_name: Optional[str] = None, limit: int = 50) -> list[JobRun]:
+        """
+        Retrieves the most recent job runs, newest first.
+
+        Args:
+            job_name (str, optional): Filter by job name.
+            limit (int): Maximum number of runs.
+
+        Returns:
+            list[JobRun]: Job runs.
+        """
+        stmt = select(JobRun).order_by(JobRun.started_at.desc(), JobRun.id.desc()).limit(limit)
+        if job_name:
+            stmt = stmt.where(JobRun.job_name == job_name)
+
+        try:
+            return self.session.scalars(stmt).all()
+        except SQLAlchemyError as e:
+            logger.error(f"Error retrieving job runs: {e}")
+            raise
+
+
+    def prune_runs(self, retention_days: int = JOB_RUN_RETENTION_DAYS) -> dict:
+        """
+        Deletes job runs older than the retention period.
+
+        Args:
+            retention_days (int): Number of days to keep.
+
+        Returns:
+            dict: affected_rows.
+        """
+        cutoff = datetime.now() - timedelta(days=retention_days)
+        try:
+            count = self.session.execute(delete(JobRun).where(JobRun.started_at < cutoff)).rowcount
+            self.session.commit()
+            return {"affected_rows": count}
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error pruning job runs: {e}")
+            raise
@@ -0,0 +1,94 @@
+import logging
+from sqlalchemy.dialects.postgresql import insert
+
+from models.number_series import NumberSeries
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INVOICE_PREFIX = "RE"
+ORDER_PREFIX = "AU"
+QUOTATION_PREFIX = "AN"
+
+
+def format_document_number(prefix: str, year: int, value: int) -> str:
+    """
+    Formats a document number, e.g. RE-2026-000123.
+    """
+    return f"{prefix}-{year}-{value:06d}"
+
+
+class NumberSeriesService:
+    """
+    Service class for allocating document numbers from the number_series counter table.
+
+    There is one counter row per prefix and year. Allocation is a single upsert that locks
+    only that row until the caller commits, so numbers are gapless. To keep the lock short,
+    callers allocate after the document and its items are written; only the outbox events,
+    which carry the new number, and the commit follow. Recurring invoice generation inserts
+    its invoices without numbers and sets the allocated blocks with one UPDATE at the end.
+    """
+
+    def __init__(self, session):
+        """
+        Initializes the service with a database session.
+        """
+        self.session = session
+
+
+    def allocate_block(self, prefix: str, year: int, count: int) -> list[str]:
+        """
+        Allocates count consecutive numbers with a single upsert on the counter row.
+
+        The counter row stays locked until the caller's transaction ends.
+
+        Args:
+            prefix (str): Document prefix.
+            year (int): Year of the series.
+            count (int): Number of numbers to allocate.
+
+        Returns:
+            list[str]: The formatted numbers in ascending order.
+        """
+        if count <= 0:
+            return []
+
+        stmt = (
+            insert(NumberSeries)
+            .values(prefix=prefix, year=year, last_value=count)
+            .on_conflict_do_update(
+                index_elements=[NumberSeries.prefix, NumberSeries.year],
+                set_={"last_value": NumberSeries.last_value + count}
+            )
+            .returning(NumberSeries.last_value)
+        )
+        last_value = self.session.scalar(stmt)
+        first_value = last_value - count + 1
+        return [format_document_number(prefix, year, value) for value in range(first_value, last_value + 1)]
+
+
+    def allocate(self, prefix: str, year: int) -> str:
+        """
+        Allocates the next number of a series.
+
+        Args:
+            prefix (str): Document prefix.
+            year (int): Year of the series.
+
+        Returns:
+            str: The formatted number.
+        """
+        return self.allocate_block(prefix, year, 1)[0]
+
+
+    def assign_number_if_missing(self, document, number_attribute: str, prefix: str) -> None:
+        """
+        Sets the next number of the series for the document's issue year unless a number was given.
+
+        Args:
+            document: Invoice, Order or Quotation.
+            number_attribute (str): Name of the number column, e.g. 'invoice_number'.
+            prefix (str): Document prefix.
+        """
+        if not getattr(document, number_attribute):
+            setattr(document, number_attribute, self.allocate(prefix, document.issue_date.year))
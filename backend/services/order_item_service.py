@@ -1,14 +1,26 @@
 import logging
-from sqlalchemy import select
-from sqlalchemy.exc import SQLAlchemyError
+from decimal import Decimal
+from datetime import date
+from typing import Iterator, Optional
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
 from models.order_item import OrderItem
 from models.order import Order
 from models.product import Product
+from services.integrity_errors import raise_for_constraint_violation
+from services.document_totals_service import DocumentTotalsService, line_total
+from services.sorting import apply_sort, ITEM_SORT_FIELDS
+from services.outbox_service import record_event, record_events, CREATED, UPDATED, DELETED
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+ITEM_STREAM_BATCH_SIZE = 1000
+
+ORDER_ITEM_ORDER_FKEY = "order_items_order_id_fkey"
+ORDER_ITEM_PRODUCT_FKEY = "order_items_product_id_fkey"
+
 
 class OrderItemService:
     """
@@ -56,53 +68,96 @@ class OrderItemService:
         return product
 
 
-    def get_item_by_id_or_raise(self, item_id: int):
+    def get_item_by_id_or_raise(self, item_id: int, for_update: bool = False):
         """
         Retrieves an order item by ID or raises an error if not found.
 
         Args:
             item_id (int): ID of the order item.
+            for_update (bool): Lock the item row until the transaction ends.
 
         Returns:
             OrderItem: The found item.
         """
         stmt = select(OrderItem).where(OrderItem.id == item_id)
+        if for_update:
+            stmt = stmt.with_for_update().execution_options(populate_existing=True)
         item = self.session.scalars(stmt).first()
         if not item:
             raise ValueError(f"Item with id '{item_id}' does not exist.")
         return item
 
 
-    def get_all_items(self):
+    def get_items_page(self, order: Order, limit: int = 100, offset: int = 0, sort_by: Optional[str] = None) -> dict:
         """
-        Retrieves all order items from the database.
+        Retrieves one page of the items of an order using the index on (order_id, id).
+
+        Args:
+            order (Order): The order whose items are listed.
+            limit (int): Maximum number of items.
+            offset (int): Number of items to skip.
+            sort_by (str, optional): Sort field such as 'unit_price', prefix with '-' for descending order.
 
         Returns:
-            list: List of OrderItem objects.
+            dict: items, total, limit and offset. total is the stored item count of the order.
+
+        Raises:
+            ValueError: If the sort field is invalid.
         """
+        stmt = select(OrderItem).where(OrderItem.order_id == order.id)
+        stmt = apply_sort(stmt, OrderItem, sort_by or "id", ITEM_SORT_FIELDS).limit(limit).offset(offset)
+
         try:
-            return self.session.scalars(select(OrderItem)).all()
+            items = self.session.scalars(stmt).all()
         except SQLAlchemyError as e:
-            logger.error(f"Error retrieving order items: {e}")
-            return []
+            logger.error(f"Error retrieving items of order id {order.id}: {e}")
+            raise
+        return {"items": items, "total": order.item_count, "limit": limit, "offset": offset}
 
 
-    def create_item(self, order_id: int, product_id: int, quantity: float, unit_price: float) -> None:
+    def stream_items(
+            self,
+            product_id: Optional[int] = None,
+            date_from: Optional[date] = None,
+            date_to: Optional[date] = None
+    ) -> Iterator[OrderItem]:
+        """
+        Yields order items in ID order, read in batches through a server-side cursor.
+
+        Args:
+            product_id (int, optional): Only items of this product.
+            date_from (date, optional): Only items of orders issued on or after this day.
+            date_to (date, optional): Only items of orders issued on or before this day.
+
+        Yields:
+            OrderItem: The matching items.
+        """
+        stmt = select(OrderItem).order_by(OrderItem.id)
+        if product_id:
+            stmt = stmt.where(OrderItem.product_id == product_id)
+        if date_from or date_to:
+            stmt = stmt.join(Order, Order.id == OrderItem.order_id)
+            if date_from:
+                stmt = stmt.where(Order.issue_date >= date_from)
+            if date_to:
+                stmt = stmt.where(Order.issue_date <= date_to)
+
+        yield from self.session.scalars(stmt.execution_options(yield_per=ITEM_STREAM_BATCH_SIZE))
+
+
+    def create_item(self, order_id: int, product_id: int, quantity: Decimal, unit_price: Decimal) -> None:
         """
         Creates a new order item after checking related entities and input values.
 
         Args:
             order_id (int): ID of the order.
             product_id (int): ID of the product.
-            quantity (float): Quantity ordered.
-            unit_price (float): Unit price of the product.
+            quantity (Decimal): Quantity ordered.
+            unit_price (Decimal): Unit price of the product.
 
         Raises:
-            ValueError: If inputs are invalid.
+            ValueError: If inputs are invalid or the order or product does not exist.
         """
-        self.get_order_by_id_or_raise(order_id)
-        self.get_product_by_id_or_raise(product_id)
-
         if quantity < 0:
             raise ValueError("Quantity must be zero or positive.")
         if unit_price < 0:
@@ -117,36 +172,54 @@ class OrderItemService:
 
         try:
             self.session.add(new_item)
+            DocumentTotalsService(self.session).apply_item_delta(
+                Order, order_id, line_total(quantity, unit_price), 1
+            )
+            self.session.flush()
+            record_event(self.session, "order_item", new_item.id, CREATED, {"order_id": order_id})
             self.session.commit()
             logger.info(f"Item created successfully for order id {order_id}.")
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Order item for order id {order_id} violates a constraint: {e.orig}")
+            raise_for_constraint_violation(e, {
+                ORDER_ITEM_ORDER_FKEY: f"Order with id '{order_id}' not found.",
+                ORDER_ITEM_PRODUCT_FKEY: f"Product with id '{product_id}' not found.",
+            })
         except SQLAlchemyError as e:
             self.session.rollback()
             logger.error(f"Error creating order item: {e}")
             raise
 
 
-    def update_item(self, item_id: int, new_quantity: float, new_unit_price: float) -> None:
+    def update_item(self, item_id: int, new_quantity: Decimal, new_unit_price: Decimal) -> None:
         """
         Updates quantity and unit price of an existing order item.
 
         Args:
             item_id (int): ID of the item to update.
-            new_quantity (float): New quantity value.
-            new_unit_price (float): New price value.
+            new_quantity (Decimal): New quantity value.
+            new_unit_price (Decimal): New price value.
 
         Raises:
             ValueError: If inputs are invalid.
         """
-        item = self.get_item_by_id_or_raise(item_id)
-
         if new_quantity < 0:
             raise ValueError("Quantity must be zero or positive.")
         if new_unit_price < 0:
             raise ValueError("Unit price must be zero or positive.")
 
+        # The lock keeps concurrent edits of the item from computing their deltas from the same values.
+        item = self.get_item_by_id_or_raise(item_id, for_update=True)
+
         try:
+            net_delta = line_total(new_quantity, new_unit_price) - line_total(item.quantity, item.unit_price)
             item.quantity = new_quantity
             item.unit_price = new_unit_price
+            DocumentTotalsService(self.session).apply_item_delta(Order, item.order_id, net_delta, 0)
+            record_event(self.session, "order_item", item_id, UPDATED, {
+                "order_id": item.order_id, "quantity": new_quantity, "unit_price": new_unit_price
+            })
             self.session.commit()
             logger.info(f"Order item updated successfully for id {item_id}.")
         except SQLAlchemyError as e:
@@ -162,13 +235,143 @@ class OrderItemService:
         Args:
             item_id (int): ID of the item to delete.
         """
-        item = self.get_item_by_id_or_raise(item_id)
+        # Locked so a concurrent update cannot change the line total subtracted below.
+        item = self.get_item_by_id_or_raise(item_id, for_update=True)
 
         try:
             self.session.delete(item)
+            DocumentTotalsService(self.session).apply_item_delta(
+                Order, item.order_id, -line_total(item.quantity, item.unit_price), -1
+            )
+            record_event(self.session, "order_item", item_id, DELETED, {"order_id": item.order_id})
             self.session.commit()
             logger.info(f"Order item with id '{item_id}' deleted successfully.")
         except SQLAlchemyError as e:
             self.session.rollback()
             logger.error(f"Error deleting order item with id '{item_id}': {e}")
             raise
+
+
+    def apply_bulk(self, creates: list[dict], updates: list[dict], deletes: list[int]) -> dict:
+        """
+        Creates, updates and deletes many order items in one transaction using batched statements.
+
+        Rows that reference a missing order, product or item are reported and skipped,
+        all other rows are applied.
+
+        Args:
+            creates (list[dict]): New items with order_id, product_id, quantity and unit_price.
+            updates (list[dict]): Changes with the item id and a new quantity and/or unit_price.
+            deletes (list[int]): IDs of the items to delete.
+
+        Returns:
+            dict: Per-row results under the keys 'created', 'updated' and 'deleted'.
+        """
+        results = {"created": [], "updated": [], "deleted": []}
+        events = []
+
+        try:
+            order_ids = set(self.session.scalars(
+                select(Order.id).where(Order.id.in_({row["order_id"] for row in creates}))
+            ))
+            product_ids = set(self.session.scalars(
+                select(Product.id).where(Product.id.in_({row["product_id"] for row in creates}))
+            ))
+
+            valid_creates = []
+            for index, row in enumerate(creates):
+                if row["order_id"] not in order_ids:
+                    detail = f"Order with id '{row['order_id']}' not found."
+                elif row["product_id"] not in product_ids:
+                    detail = f"Product with id '{row['product_id']}' not found."
+                elif row["quantity"] < 0 or row["unit_price"] < 0:
+                    detail = "Quantity and unit price must be zero or positive."
+                else:
+                    valid_creates.append((index, row))
+                    continue
+                results["created"].append({"index": index, "status": "error", "detail": detail})
+
+            if valid_creates:
+                stmt = insert(OrderItem).returning(OrderItem.id, sort_by_parameter_order=True)
+                new_ids = self.session.scalars(stmt, [row for _, row in valid_creates]).all()
+                for (index, row), item_id in zip(valid_creates, new_ids):
+                    results["created"].append({"index": index, "id": item_id, "status": "created"})
+                    events.append({
+                        "entity_type": "order_item", "entity_id": item_id, "action": CREATED,
+                        "payload": {"order_id": row["order_id"]}
+                    })
+                results["created"].sort(key=lambda result: result["index"])
+
+            affected_order_ids = {row["order_id"] for _, row in valid_creates}
+
+            existing_items = dict(self.session.execute(
+                select(OrderItem.id, OrderItem.order_id).where(OrderItem.id.in_({row["id"] for row in updates}))
+            ).tuples().all())
+
+            valid_updates = []
+            for row in updates:
+                changes = {
+                    key: row[key]
+                    for key in ("quantity", "unit_price")
+                    if row.get(key) is not None
+                }
+                if row["id"] not in existing_items:
+                    detail = f"Item with id '{row['id']}' not found."
+                elif not changes:
+                    detail = "No fields to update."
+                elif any(value < 0 for value in changes.values()):
+                    detail = "Quantity and unit price must be zero or positive."
+                else:
+                    valid_updates.append({"id": row["id"], **changes})
+                    events.append({
+                        "entity_type": "order_item", "entity_id": row["id"], "action": UPDATED,
+                        "payload": {"order_id": existing_items[row["id"]], **changes}
+                    })
+                    affected_order_ids.add(existing_items[row["id"]])
+                    results["updated"].append({"id": row["id"], "status": "updated"})
+                    continue
+                results["updated"].append({"id": row["id"], "status": "error", "detail": detail})
+
+            if valid_updates:
+                self.session.execute(update(OrderItem), valid_updates)
+
+            deleted_ids = set()
+            if deletes:
+                stmt = delete(OrderItem).where(OrderItem.id.in_(deletes)).returning(OrderItem.id, OrderItem.order_id)
+                deleted_items = dict(self.session.execute(stmt).tuples().all())
+                deleted_ids = set(deleted_items)
+                events += [
+                    {
+                        "entity_type": "order_item", "entity_id": item_id, "action": DELETED,
+                        "payload": {"order_id": parent_id}
+                    }
+                    for item_id, parent_id in deleted_items.items()
+                ]
+                affected_order_ids.update(deleted_items.values())
+            for item_id in deletes:
+                if item_id in deleted_ids:
+                    results["deleted"].append({"id": item_id, "status": "deleted"})
+                else:
+                    results["deleted"].append({
+                        "id": item_id, "status": "error", "detail": f"Item with id '{item_id}' not found."
+                    })
+
+            DocumentTotalsService(self.session).recalculate(Order, affected_order_ids)
+            record_events(self.session, events)
+            self.session.commit()
+            logger.info(
+                f"Bulk order item operation applied: {len(valid_creates)} created, "
+                f"{len(valid_updates)} updated, {len(deleted_ids)} deleted."
+            )
+            return results
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Bulk order item operation violates a constraint: {e.orig}")
+            raise_for_constraint_violation(e, {
+                ORDER_ITEM_ORDER_FKEY: "Order not found.",
+                ORDER_ITEM_PRODUCT_FKEY: "Product not found.",
+            })
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error applying bulk order item operation: {e}")
+            raise
@@ -1,16 +1,43 @@
 import logging
-from sqlalchemy import select
-from sqlalchemy.exc import SQLAlchemyError
+from datetime import date
+from sqlalchemy import select, update, insert, literal, delete
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from typing import Optional
 
+from sqlalchemy.orm.attributes import set_committed_value
+
 from models.order import Order
-from models.enums import OrderStatus
+from models.order_item import OrderItem
+from models.invoice import Invoice
+from models.invoice_item import InvoiceItem
+from models.enums import OrderStatus, InvoiceStatus
 from models.customer import Customer
 from models.user import User
+from services.integrity_errors import raise_for_constraint_violation
+from services.product_service import ProductService
+from services.document_totals_service import DocumentTotalsService, line_total
+from services.sorting import apply_sort
+from services.expansion import document_load_options
+from services.number_series_service import NumberSeriesService, ORDER_PREFIX, INVOICE_PREFIX
+from services.outbox_service import record_event, record_events, item_events, CREATED, UPDATED, STATUS_CHANGED, DELETED
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+ORDER_NUMBER_KEY = "orders_order_number_key"
+ORDER_CUSTOMER_FKEY = "orders_customer_id_fkey"
+ORDER_USER_FKEY = "orders_user_id_fkey"
+
+CONVERTIBLE_ORDER_STATUSES = {
+    OrderStatus.DRAFT,
+    OrderStatus.OPEN,
+    OrderStatus.IN_PROGRESS,
+    OrderStatus.SHIPPED,
+    OrderStatus.COMPLETED,
+}
+INVOICE_ORDER_KEY = "invoices_order_id_key"
+INVOICE_NUMBER_KEY = "invoices_invoice_number_key"
+
 
 class OrderService:
     """
@@ -24,17 +51,22 @@ class OrderService:
         self.session = session
 
 
-    def get_order_by_id_or_raise(self, order_id: int) -> Order | None:
+    def get_order_by_id_or_raise(self, order_id: int, expand: frozenset[str] = frozenset()) -> Order | None:
         """
         Retrieves an order by ID or raises an error if not found.
 
         Args:
             order_id (int): ID of the order.
+            expand (frozenset[str], optional): Relations to eager-load, see parse_expand().
 
         Returns:
             Order: The order instance.
         """
-        stmt = select(Order).where(Order.id == order_id)
+        stmt = (
+            select(Order)
+            .options(*document_load_options(Order, OrderItem, expand))
+            .where(Order.id == order_id)
+        )
         order = self.session.scalars(stmt).first()
         if not order:
             raise ValueError(f"Order with id '{order_id}' not found.")
@@ -87,8 +119,9 @@ class OrderService:
         order_number=None,
         status: str = "DRAFT",
         reference: str = None,
-        notes: str = None
-    ) -> None:
+        notes: str = None,
+        items: list[dict] = None
+    ) -> Order:
         """
         Creates a new order with optional fields and validations.
 
@@ -98,23 +131,19 @@ class OrderService:
             issue_date (date): Date the order was issued.
             due_date (date, optional): Due date.
             delivery_date (date, optional): Delivery date.
-            order_number (str, optional): Unique order number.
+            order_number (str, optional): Unique order number, allocated from the AU series if omitted.
             status (str): Status string, must match OrderStatus enum.
             reference (str, optional): Reference text.
             notes (str, optional): Notes for the order.
+            items (list[dict], optional): Line items with product_id, quantity and an optional unit_price.
+                Missing unit prices are taken from the product catalog.
+
+        Returns:
+            Order: The created order including its items.
 
         Raises:
-            ValueError: If validation fails.
+            ValueError: If validation fails, order_number is already in use or customer, user or a product do not exist.
         """
-        self.get_user_or_raise(user_id)
-        self.get_customer_or_raise(customer_id)
-
-        if order_number is not None:
-            stmt = select(Order).where(Order.order_number == order_number)
-            existing_order = self.session.scalars(stmt).first()
-            if existing_order:
-                raise ValueError("Order number already in use.")
-
         if status.upper() not in OrderStatus.__members__:
             raise ValueError(f"Invalid order status: {status}")
 
@@ -132,19 +161,185 @@ class OrderService:
 
         try:
             self.session.add(new_order)
+            self.session.flush()
+            created_items = self.insert_items(new_order, items or [])
+            NumberSeriesService(self.session).assign_number_if_missing(new_order, "order_number", ORDER_PREFIX)
+            record_event(self.session, "order", new_order.id, CREATED, {
+                "customer_id": customer_id, "status": new_order.status, "order_number": new_order.order_number
+            })
+            record_events(self.session, item_events("order", new_order.id, [item.id for item in created_items], CREATED))
             self.session.commit()
             logger.info(f"Order created successfully for customer id {customer_id}.")
-        except SQLAlchemyError as e:
+            return new_order
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Order for customer id {customer_id} violates a constraint: {e.orig}")
+            raise_for_constraint_violation(e, {
+                ORDER_NUMBER_KEY: "Order number already in use.",
+                ORDER_CUSTOMER_FKEY: f"Customer with id {customer_id} not found.",
+                ORDER_USER_FKEY: f"User with id {user_id} not found.",
+            })
+        except (SQLAlchemyError, ValueError) as e:
             self.session.rollback()
             logger.error(f"Error creating order: {e}")
             raise
 
 
+    def insert_items(self, order: Order, items: list[dict]) -> list[OrderItem]:
+        """
+        Inserts the line items of an order with one batched product lookup and one multi-row INSERT
+        and adds them to the stored totals.
+
+        The caller is responsible for committing the transaction.
+
+        Args:
+            order (Order): The flushed order the items belong to.
+            items (list[dict]): Line items with product_id, quantity and an optional unit_price.
+
+        Returns:
+            list[OrderItem]: The created items.
+
+        Raises:
+            ValueError: If a quantity or price is negative or a product does not exist.
+        """
+        for item in items:
+            if item["quantity"] < 0:
+                raise ValueError("Quantity must be zero or positive.")
+            if item.get("unit_price") is not None and item["unit_price"] < 0:
+                raise ValueError("Unit price must be zero or positive.")
+
+        unit_prices = ProductService(self.session).get_unit_prices_or_raise(
+            item["product_id"] for item in items
+        )
+
+        created_items = []
+        if items:
+            stmt = insert(OrderItem).returning(OrderItem, sort_by_parameter_order=True)
+            created_items = self.session.scalars(stmt, [
+                {
+                    "order_id": order.id,
+                    "product_id": item["product_id"],
+                    "quantity": item["quantity"],
+                    "unit_price": (
+                        item["unit_price"] if item.get("unit_price") is not None
+                        else unit_prices[item["product_id"]]
+                    ),
+                }
+                for item in items
+            ]).all()
+
+        if created_items:
+            DocumentTotalsService(self.session).apply_item_delta(
+                Order,
+                order.id,
+                sum(line_total(item.quantity, item.unit_price) for item in created_items),
+                len(created_items)
+            )
+
+        set_committed_value(order, "items", created_items)
+        return created_items
+
+
+    def convert_to_invoice(
+        self,
+        order_id: int,
+        invoice_number: str = None,
+        issue_date=None,
+        due_date=None
+    ) -> Invoice:
+        """
+        Converts an order into an invoice within a single transaction.
+
+        The order header is copied to a new DRAFT invoice, all items are copied with one
+        INSERT ... SELECT and the order is marked as COMPLETED.
+        The stored totals are taken over from the order.
+
+        Args:
+            order_id (int): ID of the order to convert.
+            invoice_number (str, optional): Unique number of the new invoice, allocated from the RE series if omitted.
+            issue_date (date, optional): Issue date of the invoice, defaults to today.
+            due_date (date, optional): Payment due date, defaults to the order's due date.
+
+        Returns:
+            Invoice: The created invoice.
+
+        Raises:
+            ValueError: If the order does not exist, cannot be converted in its current
+                status, was already converted or the invoice number is already in use.
+        """
+        try:
+            order = self.session.scalars(
+                select(Order).where(Order.id == order_id).with_for_update()
+            ).first()
+            if not order:
+                raise ValueError(f"Order with id '{order_id}' not found.")
+            if order.status not in CONVERTIBLE_ORDER_STATUSES:
+                raise ValueError(
+                    f"Order with status '{order.status.value}' cannot be converted to an invoice."
+                )
+
+            new_invoice = Invoice(
+                customer_id=order.customer_id,
+                user_id=order.user_id,
+                issue_date=issue_date or date.today(),
+                due_date=due_date or order.due_date,
+                invoice_number=invoice_number,
+                status=InvoiceStatus.DRAFT,
+                notes=order.notes,
+                order_id=order.id,
+                net_total=order.net_total,
+                tax_total=order.tax_total,
+                gross_total=order.gross_total,
+                item_count=order.item_count
+            )
+            self.session.add(new_invoice)
+            self.session.flush()
+
+            item_ids = self.session.scalars(
+                insert(InvoiceItem).from_select(
+                    ["invoice_id", "product_id", "quantity", "unit_price"],
+                    select(
+                        literal(new_invoice.id),
+                        OrderItem.product_id,
+                        OrderItem.quantity,
+                        OrderItem.unit_price
+                    )
+                    .where(OrderItem.order_id == order_id)
+                    .order_by(OrderItem.id)
+                ).returning(InvoiceItem.id)
+            ).all()
+
+            order.status = OrderStatus.COMPLETED
+            NumberSeriesService(self.session).assign_number_if_missing(new_invoice, "invoice_number", INVOICE_PREFIX)
+            record_event(self.session, "invoice", new_invoice.id, CREATED, {
+                "customer_id": new_invoice.customer_id, "status": new_invoice.status,
+                "invoice_number": new_invoice.invoice_number, "order_id": order_id
+            })
+            record_events(self.session, item_events("invoice", new_invoice.id, item_ids, CREATED))
+            record_event(self.session, "order", order_id, STATUS_CHANGED, {"status": order.status})
+            self.session.commit()
+            logger.info(f"Order with id {order_id} converted to invoice id {new_invoice.id}.")
+            return new_invoice
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Converting order with id {order_id} violates a constraint: {e.orig}")
+            raise_for_constraint_violation(e, {
+                INVOICE_ORDER_KEY: f"Order with id '{order_id}' has already been converted to an invoice.",
+                INVOICE_NUMBER_KEY: "Invoice number already in use.",
+            })
+        except (SQLAlchemyError, ValueError) as e:
+            self.session.rollback()
+            logger.error(f"Error converting order with id {order_id}: {e}")
+            raise
+
+
     def get_all_orders(
             self,
             status: Optional[str] = None,
             order_number: Optional[str] = None,
-            customer_id: Optional[int] = None
+            customer_id: Optional[int] = None,
+            sort_by: Optional[str] = None,
+            expand: frozenset[str] = frozenset()
     ) -> list[Order]:
         """
         Retrieves all orders, optionally filtered by status, order number, or customer ID.
@@ -153,11 +348,13 @@ class OrderService:
             status (str, optional): Filter by order status.
             order_number (str, optional): Filter by exact order number.
             customer_id (int, optional): Filter by customer ID.
+            sort_by (str, optional): Sort field such as 'gross_total', prefix with '-' for descending order.
+            expand (frozenset[str], optional): Relations to eager-load, see parse_expand().
 
         Returns:
             list[Order]: List of matching Order instances.
         """
-        stmt = select(Order)
+        stmt = select(Order).options(*document_load_options(Order, OrderItem, expand))
 
         if status:
             if status.upper() not in OrderStatus.__members__:
@@ -171,6 +368,8 @@ class OrderService:
         if customer_id:
             stmt = stmt.where(Order.customer_id == customer_id)
 
+        stmt = apply_sort(stmt, Order, sort_by)
+
         try:
             return self.session.scalars(stmt).all()
         except SQLAlchemyError as e:
@@ -178,6 +377,60 @@ class OrderService:
             return []
 
 
+    def patch_order(self, order_id: int, fields: dict) -> Order:
+        """
+        Applies a partial update to an order in a single UPDATE ... RETURNING statement.
+
+        Args:
+            order_id (int): ID of the order.
+            fields (dict): Column names mapped to their new values.
+
+        Returns:
+            Order: The updated order.
+
+        Raises:
+            ValueError: If validation fails, the order number is already in use or the order does not exist.
+        """
+        if not fields:
+            raise ValueError("No fields to update.")
+
+        if "issue_date" in fields and fields["issue_date"] is None:
+            raise ValueError("Issue date must not be empty.")
+
+        if "status" in fields:
+            status = fields["status"] or ""
+            if status.upper() not in OrderStatus.__members__:
+                raise ValueError(f"Invalid order status: {status}")
+            fields["status"] = OrderStatus[status.upper()]
+
+        stmt = (
+            update(Order)
+            .where(Order.id == order_id)
+            .values(**fields)
+            .returning(Order)
+        )
+
+        try:
+            order = self.session.scalars(stmt).first()
+            if not order:
+                self.session.rollback()
+                raise ValueError(f"Order with id '{order_id}' not found.")
+            record_event(self.session, "order", order_id, STATUS_CHANGED if "status" in fields else UPDATED, fields)
+            self.session.commit()
+            logger.info(f"Order updated successfully for id {order_id}.")
+            return order
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Order update for id {order_id} violates a constraint: {e.orig}")
+            raise_for_constraint_violation(e, {
+                ORDER_NUMBER_KEY: "Order number already in use.",
+            })
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error updating order with id '{order_id}': {e}")
+            raise
+
+
     def update_order_status(self, order_id: int, new_status: str) -> None:
         """
         Updates the status of an order.
@@ -196,6 +449,7 @@ class OrderService:
 
         try:
             order.status = OrderStatus[new_status.upper()]
+            record_event(self.session, "order", order_id, STATUS_CHANGED, {"status": order.status})
             self.session.commit()
             logger.info(f"Order status updated successfully for id {order_id}.")
         except SQLAlchemyError as e:
@@ -216,6 +470,7 @@ class OrderService:
 
         try:
             order.reference = new_reference
+            record_event(self.session, "order", order_id, UPDATED, {"reference": new_reference})
             self.session.commit()
             logger.info(f"Order reference updated successfully for id {order_id}.")
         except SQLAlchemyError as e:
@@ -236,6 +491,7 @@ class OrderService:
 
         try:
             order.notes = new_notes
+            record_event(self.session, "order", order_id, UPDATED, {"notes": new_notes})
             self.session.commit()
             logger.info(f"Order notes updated successfully for id {order_id}.")
         except SQLAlchemyError as e:
@@ -246,15 +502,26 @@ class OrderService:
 
     def delete_order(self, order_id: int) -> None:
         """
-        Deletes an order by ID.
+        Deletes an order by ID with a single DELETE statement. The database removes
+        its items through ON DELETE CASCADE without loading them.
 
         Args:
             order_id (int): ID of the order to delete.
-        """
-        order = self.get_order_by_id_or_raise(order_id)
 
+        Raises:
+            ValueError: If the order does not exist.
+        """
+        stmt = (
+            delete(Order)
+            .where(Order.id == order_id)
+            .returning(Order.id)
+            .execution_options(synchronize_session=False)
+        )
         try:
-            self.session.delete(order)
+            if self.session.scalar(stmt) is None:
+                self.session.rollback()
+                raise ValueError(f"Order with id '{order_id}' not found.")
+            record_event(self.session, "order", order_id, DELETED)
             self.session.commit()
             logger.info(f"Order with id '{order_id}' deleted successfully.")
         except SQLAlchemyError as e:
@@ -0,0 +1,230 @@
+import enum
+import json
+import logging
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import select, insert, delete, tuple_, text, func
+from sqlalchemy.exc import SQLAlchemyError
+
+from models.outbox_event import OutboxEvent
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+OUTBOX_RETENTION_DAYS = 7
+CHANGES_MAX_LIMIT = 1000
+
+CREATED = "created"
+UPDATED = "updated"
+STATUS_CHANGED = "status_changed"
+DELETED = "deleted"
+
+# Events of these types are also published with NOTIFY for the live document event stream.
+DOCUMENT_EVENTS_CHANNEL = "document_events"
+DOCUMENT_ENTITY_TYPES = ("invoice", "order", "quotation")
+# Postgres rejects NOTIFY payloads of 8000 bytes or more.
+MAX_NOTIFY_BYTES = 7900
+
+# Oldest transaction id still running; every event below it is committed or rolled back for good.
+OLDEST_RUNNING_TXID = text("pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+
+
+def _json_value(value):
+    """
+    Converts enums, dates and decimals in an event payload into JSON values.
+    """
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def item_events(document_type: str, document_id: int, item_ids, action: str) -> list[dict]:
+    """
+    Builds one event per item of a document for record_events, e.g. for items written together with it.
+
+    Args:
+        document_type (str): 'invoice', 'order' or 'quotation'; items use e.g. 'invoice_item'.
+        document_id (int): ID of the document, stored in the payload like for single item changes.
+        item_ids (Iterable[int]): IDs of the items.
+        action (str): CREATED or DELETED.
+
+    Returns:
+        list[dict]: The events.
+    """
+    return [
+        {
+            "entity_type": f"{document_type}_item", "entity_id": item_id, "action": action,
+            "payload": {f"{document_type}_id": document_id}
+        }
+        for item_id in item_ids
+    ]
+
+
+def record_event(session, entity_type: str, entity_id: int, action: str, payload: Optional[dict] = None) -> None:
+    """
+    Writes one outbox event in the session's current transaction.
+
+    Args:
+        session (Session): Session of the change, the caller commits.
+        entity_type (str): Changed entity, e.g. 'invoice'.
+        entity_id (int): ID of the changed entity.
+        action (str): CREATED, UPDATED, STATUS_CHANGED or DELETED.
+        payload (dict, optional): Changed fields and parent IDs.
+    """
+    record_events(session, [
+        {"entity_type": entity_type, "entity_id": entity_id, "action": action, "payload": payload}
+    ])
+
+
+def record_events(session, events: list[dict]) -> None:
+    """
+    Writes many outbox events with one multi-row INSERT in the session's current transaction.
+
+    Invoice, order and quotation events are additionally published on DOCUMENT_EVENTS_CHANNEL.
+
+    Args:
+        session (Session): Session of the change, the caller commits.
+        events (list[dict]): Events with entity_type, entity_id, action and an optional payload.
+    """
+    if not events:
+        return
+    rows = [
+        {
+            **event,
+            "payload": (
+                {key: _json_value(value) for key, value in event["payload"].items()}
+                if event.get("payload") else None
+            ),
+        }
+        for event in events
+    ]
+    session.execute(insert(OutboxEvent), rows)
+    _notify_document_events(session, rows)
+
+
+def _notify_document_events(session, rows: list[dict]) -> None:
+    """
+    Publishes document events on DOCUMENT_EVENTS_CHANNEL.
+
+    Postgres delivers the notifications only when the transaction commits, so listeners never
+    see changes that are rolled back. Events are packed into JSON arrays below MAX_NOTIFY_BYTES;
+    an event that is too large on its own is sent without its payload.
+    """
+    encoded = []
+    for row in rows:
+        if row["entity_type"] not in DOCUMENT_ENTITY_TYPES:
+            continue
+        message = json.dumps(row, separators=(",", ":"))
+        if len(message.encode()) > MAX_NOTIFY_BYTES - 2:
+            message = json.dumps({**row, "payload": None}, separators=(",", ":"))
+        encoded.append(message)
+
+    batch, batch_size = [], 2
+    for message in encoded:
+        size = len(message.encode()) + 1
+        if batch and batch_size + size > MAX_NOTIFY_BYTES:
+            session.execute(select(func.pg_notify(DOCUMENT_EVENTS_CHANNEL, f"[{','.join(batch)}]")))
+            batch, batch_size = [], 2
+        batch.append(message)
+        batch_size += size
+    if batch:
+        session.execute(select(func.pg_notify(DOCUMENT_EVENTS_CHANNEL, f"[{','.join(batch)}]")))
+
+
+def encode_cursor(txid: int, event_id: int) -> str:
+    """
+    Encodes the position after an event as an opaque cursor.
+    """
+    return f"{txid}-{event_id}"
+
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    """
+    Decodes a cursor created by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        txid, event_id = cursor.split("-")
+        return int(txid), int(event_id)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+class OutboxService:
+    """
+    Service class for reading and pruning the outbox change feed.
+
+    Events are read in (txid, id) order and only up to the oldest transaction that is still
+    running. Every later commit therefore sorts after the returned cursor, so a consumer that
+    always continues from the last cursor never misses an event.
+    """
+
+    def __init__(self, session):
+        """
+        Initializes the service with a database session.
+        """
+        self.session = session
+
+
+    def get_changes(self, since: Optional[str] = None, limit: int = 100) -> dict:
+        """
+        Retrieves events after a cursor.
+
+        Args:
+            since (str, optional): Cursor returned by a previous call, from the oldest event if omitted.
+            limit (int): Maximum number of events, at most CHANGES_MAX_LIMIT.
+
+        Returns:
+            dict: events and next_cursor. next_cursor equals since if there are no new events.
+
+        Raises:
+            ValueError: If the cursor or limit is invalid.
+        """
+        if limit < 1 or limit > CHANGES_MAX_LIMIT:
+            raise ValueError(f"Limit must be between 1 and {CHANGES_MAX_LIMIT}.")
+
+        stmt = (
+            select(OutboxEvent)
+            .where(OutboxEvent.txid < OLDEST_RUNNING_TXID)
+            .order_by(OutboxEvent.txid, OutboxEvent.id)
+            .limit(limit)
+        )
+        if since:
+            stmt = stmt.where(tuple_(OutboxEvent.txid, OutboxEvent.id) > tuple_(*decode_cursor(since)))
+
+        try:
+            events = self.session.scalars(stmt).all()
+        except SQLAlchemyError as e:
+            logger.error(f"Error reading change feed: {e}")
+            raise
+
+        next_cursor = encode_cursor(events[-1].txid, events[-1].id) if events else since
+        return {"events": events, "next_cursor": next_cursor}
+
+
+    def prune_events(self, retention_days: int = OUTBOX_RETENTION_DAYS) -> dict:
+        """
+        Deletes events older than the retention period.
+
+        Args:
+            retention_days (int): Number of days to keep.
+
+        Returns:
+            dict: affected_rows.
+        """
+        cutoff = datetime.now() - timedelta(days=retention_days)
+        try:
+            count = self.session.execute(delete(OutboxEvent).where(OutboxEvent.created_at < cutoff)).rowcount
+            self.session.commit()
+            return {"affected_rows": count}
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error pruning outbox events: {e}")
+            raise
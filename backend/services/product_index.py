@@ -0,0 +1,333 @@
+"""
+In-memory prefix index for product autocomplete.
+
+Each worker process keeps a sorted array of (term, product_id) pairs built from product names
+and descriptions, so a prefix lookup is a binary search plus a short scan and needs no database
+round-trip. ProductService updates the index of its own worker after every commit. Changes made
+by other workers are picked up from the outbox at most every PRODUCT_INDEX_REFRESH_SECONDS, by
+re-reading only the products with new events.
+"""
+import re
+import time
+import logging
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+
+from models.product import Product
+from models.outbox_event import OutboxEvent
+from services.outbox_service import OLDEST_RUNNING_TXID, OUTBOX_RETENTION_DAYS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PRODUCT_INDEX_REFRESH_SECONDS = 5
+PRODUCT_INDEX_MAX_EVENTS = 5000
+# Older cursors may point at pruned outbox events, so the index is rebuilt instead.
+PRODUCT_INDEX_MAX_STALENESS = timedelta(days=OUTBOX_RETENTION_DAYS - 1)
+PRODUCT_SUGGEST_MAX_LIMIT = 50
+# Up to this many changed products are inserted term by term; larger batches filter and re-sort
+# each tier once, because every single insertion shifts the whole array.
+PRODUCT_INDEX_INSORT_MAX_PRODUCTS = 100
+# Terms scanned per tier and lookup; bounds the cost of very short prefixes that match most of the
+# catalog. Name prefix matches are complete anyway because that tier is sorted by name; in the word
+# tiers only the alphabetically first matching words are ranked.
+PRODUCT_SUGGEST_MAX_CANDIDATES = 200
+# Tiers of lookup terms, in rank order.
+NAME_TIER, NAME_WORD_TIER, DESCRIPTION_TIER = range(3)
+
+INDEX_COLUMNS = (Product.id, Product.name, Product.description, Product.unit, Product.unit_price)
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize_term(text: Optional[str]) -> str:
+    """
+    Lower-cases text and collapses whitespace so lookups ignore case and spacing.
+    """
+    return " ".join((text or "").casefold().split())
+
+
+def index_entry(product) -> dict:
+    """
+    Copies the indexed fields of a product or result row, e.g. before a commit expires them.
+    """
+    return {
+        "id": product.id,
+        "name": product.name,
+        "description": product.description,
+        "unit": product.unit,
+        "unit_price": product.unit_price,
+    }
+
+
+class ProductPrefixIndex:
+    """
+    Sorted-array prefix index over product names and descriptions.
+
+    Every product contributes its full normalized name, so multi-word prefixes match from the
+    start of the name, and each single word of its name and description. The three kinds of
+    terms are kept in separate sorted arrays, so suggestions are ranked by name prefix matches,
+    then name word matches, then description matches, each group ordered by name.
+    """
+
+    def __init__(self, refresh_seconds: float = PRODUCT_INDEX_REFRESH_SECONDS):
+        """
+        Initializes an empty index. It is built from the database on the first lookup.
+        """
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._keys: tuple[list[tuple[str, int]], ...] = ([], [], [])
+        self._entries: dict[int, dict] = {}
+        self._terms: dict[int, tuple[tuple[str, ...], ...]] = {}
+        self._names: dict[int, str] = {}
+        self._cursor: Optional[tuple[int, int]] = None
+        self._cursor_read_at: Optional[datetime] = None
+        self._next_refresh = 0.0
+
+
+    def suggest(self, session, prefix: str, limit: int = 10) -> list[dict]:
+        """
+        Returns the best products for a typed prefix.
+
+        Args:
+            session (Session): Used only when the index is built or refreshed.
+            prefix (str): Beginning of a product name, a name word or a description word.
+            limit (int): Maximum number of suggestions.
+
+        Returns:
+            list[dict]: id, name, unit and unit_price of the matching products.
+
+        Raises:
+            ValueError: If the prefix is empty or the limit is out of range.
+        """
+        prefix = normalize_term(prefix)
+        if not prefix:
+            raise ValueError("Prefix must not be empty.")
+        if not 1 <= limit <= PRODUCT_SUGGEST_MAX_LIMIT:
+            raise ValueError(f"Limit must be between 1 and {PRODUCT_SUGGEST_MAX_LIMIT}.")
+
+        self._refresh_if_due(session)
+
+        with self._lock:
+            ranked, seen = [], set()
+            for keys in self._keys:
+                candidates = []
+                position = bisect_left(keys, (prefix,))
+                end = min(len(keys), position + PRODUCT_SUGGEST_MAX_CANDIDATES)
+                while position < end and keys[position][0].startswith(prefix):
+                    product_id = keys[position][1]
+                    if product_id not in seen:
+                        seen.add(product_id)
+                        candidates.append(product_id)
+                    position += 1
+                ranked += sorted(candidates, key=lambda product_id: (self._names[product_id], product_id))
+                if len(ranked) >= limit:
+                    break
+            return [
+                {key: self._entries[product_id][key] for key in ("id", "name", "unit", "unit_price")}
+                for product_id in ranked[:limit]
+            ]
+
+
+    def upsert(self, entry: dict) -> None:
+        """
+        Adds a product or replaces its indexed terms.
+
+        Args:
+            entry (dict): Fields returned by index_entry.
+        """
+        with self._lock:
+            self._remove(entry["id"])
+            self._add(entry)
+
+
+    def upsert_many(self, entries: list[dict]) -> None:
+        """
+        Adds or replaces many products while holding the lock once, e.g. after a bulk change.
+
+        Args:
+            entries (list[dict]): Fields returned by index_entry.
+        """
+        latest = {entry["id"]: entry for entry in entries}
+        indexed = [(entry, *self._terms_of(entry)) for entry in latest.values()]
+        with self._lock:
+            self._replace(indexed)
+
+
+    def remove(self, product_id: int) -> None:
+        """
+        Removes a product from the index if it is present.
+        """
+        with self._lock:
+            self._remove(product_id)
+
+
+    @staticmethod
+    def _terms_of(entry: dict) -> tuple[tuple[tuple[str, ...], ...], str]:
+        """
+        Collects the distinct lookup terms of a product per tier and the normalized name used for ordering.
+        """
+        name = normalize_term(entry["name"])
+        name_words = tuple(dict.fromkeys(word for word in _WORD.findall(name) if word != name))
+        description_words = tuple(
+            dict.fromkeys(
+                word for word in _WORD.findall(normalize_term(entry["description"]))
+                if word != name and word not in name_words
+            )
+        )
+        return ((name,), name_words, description_words), name
+
+
+    def _replace(self, indexed: list[tuple], removed_ids: frozenset[int] = frozenset()) -> None:
+        """
+        Replaces the terms of many products and removes others. The caller holds the lock.
+
+        Args:
+            indexed (list[tuple]): (entry, terms, name) of the changed products, see _terms_of.
+            removed_ids (frozenset[int]): IDs of products to drop from the index.
+        """
+        if len(indexed) + len(removed_ids) <= PRODUCT_INDEX_INSORT_MAX_PRODUCTS:
+            for entry, terms, name in indexed:
+                self._remove(entry["id"])
+                self._add(entry, terms, name)
+            for product_id in removed_ids:
+                self._remove(product_id)
+            return
+
+        replaced_ids = {entry["id"] for entry, _, _ in indexed} | removed_ids
+        keys = []
+        for tier, tier_keys in enumerate(self._keys):
+            kept = [key for key in tier_keys if key[1] not in replaced_ids]
+            kept += [(term, entry["id"]) for entry, terms, _ in indexed for term in terms[tier]]
+            # The kept keys are one sorted run, so this costs little more than sorting the new terms.
+            kept.sort()
+            keys.append(kept)
+        self._keys = tuple(keys)
+        for product_id in replaced_ids:
+            self._entries.pop(product_id, None)
+            self._terms.pop(product_id, None)
+            self._names.pop(product_id, None)
+        for entry, terms, name in indexed:
+            self._entries[entry["id"]] = entry
+            self._terms[entry["id"]] = terms
+            self._names[entry["id"]] = name
+
+
+    def _add(self, entry: dict, terms: Optional[tuple] = None, name: Optional[str] = None) -> None:
+        """
+        Inserts the terms of a product that is not indexed yet. The caller holds the lock.
+        """
+        if terms is None:
+            terms, name = self._terms_of(entry)
+        for keys, tier_terms in zip(self._keys, terms):
+            for term in tier_terms:
+                insort(keys, (term, entry["id"]))
+        self._entries[entry["id"]] = entry
+        self._terms[entry["id"]] = terms
+        self._names[entry["id"]] = name
+
+
+    def _remove(self, product_id: int) -> None:
+        """
+        Deletes the terms of a product. The caller holds the lock.
+        """
+        for keys, tier_terms in zip(self._keys, self._terms.pop(product_id, ())):
+            for term in tier_terms:
+                position = bisect_left(keys, (term, product_id))
+                if position < len(keys) and keys[position] == (term, product_id):
+                    del keys[position]
+        self._entries.pop(product_id, None)
+        self._names.pop(product_id, None)
+
+
+    def _refresh_if_due(self, session) -> None:
+        """
+        Builds the index or applies other workers' changes if the refresh interval has passed.
+
+        While another thread refreshes, lookups are answered from the current data. Failed
+        refreshes are retried after the interval; only the very first build raises.
+        """
+        if time.monotonic() < self._next_refresh:
+            return
+        built = self._cursor is not None
+        if not self._refresh_lock.acquire(blocking=not built):
+            return
+        try:
+            if time.monotonic() < self._next_refresh:
+                return
+            try:
+                if not built or datetime.now() - self._cursor_read_at > PRODUCT_INDEX_MAX_STALENESS:
+                    self._rebuild(session)
+                else:
+                    self._apply_changes(session)
+            except SQLAlchemyError as e:
+                logger.error(f"Error refreshing the product index: {e}")
+                if not built:
+                    raise
+            self._next_refresh = time.monotonic() + self.refresh_seconds
+        finally:
+            self._refresh_lock.release()
+
+
+    def _rebuild(self, session) -> None:
+        """
+        Loads all products and replaces the index in one step.
+        """
+        last_event = (
+            select(OutboxEvent.txid, OutboxEvent.id)
+            .where(OutboxEvent.txid < OLDEST_RUNNING_TXID)
+            .order_by(OutboxEvent.txid.desc(), OutboxEvent.id.desc())
+            .limit(1)
+        )
+        read_at = datetime.now()
+        # The cursor is taken first: every product change up to it is visible to the read below.
+        cursor = tuple(session.execute(last_event).first() or (0, 0))
+        entries = {row.id: index_entry(row) for row in session.execute(select(*INDEX_COLUMNS))}
+
+        indexed = {product_id: self._terms_of(entry) for product_id, entry in entries.items()}
+        terms = {product_id: product_terms for product_id, (product_terms, _) in indexed.items()}
+        names = {product_id: name for product_id, (_, name) in indexed.items()}
+        keys = tuple(
+            sorted((term, product_id) for product_id, product_terms in terms.items() for term in product_terms[tier])
+            for tier in (NAME_TIER, NAME_WORD_TIER, DESCRIPTION_TIER)
+        )
+        with self._lock:
+            self._keys, self._entries, self._terms, self._names = keys, entries, terms, names
+        self._cursor, self._cursor_read_at = cursor, read_at
+        logger.info(f"Product index built with {len(entries)} products and {sum(map(len, keys))} terms.")
+
+
+    def _apply_changes(self, session) -> None:
+        """
+        Re-reads the products with outbox events after the cursor and updates their entries.
+        """
+        read_at = datetime.now()
+        stmt = (
+            select(OutboxEvent.txid, OutboxEvent.id, OutboxEvent.entity_id)
+            .where(OutboxEvent.txid < OLDEST_RUNNING_TXID)
+            .where(tuple_(OutboxEvent.txid, OutboxEvent.id) > tuple_(*self._cursor))
+            .where(OutboxEvent.entity_type == "product")
+            .order_by(OutboxEvent.txid, OutboxEvent.id)
+            .limit(PRODUCT_INDEX_MAX_EVENTS)
+        )
+        events = session.execute(stmt).all()
+        if len(events) == PRODUCT_INDEX_MAX_EVENTS:
+            self._rebuild(session)
+            return
+
+        if events:
+            changed_ids = {event.entity_id for event in events}
+            rows = session.execute(select(*INDEX_COLUMNS).where(Product.id.in_(changed_ids))).all()
+            indexed = [(entry, *self._terms_of(entry)) for entry in map(index_entry, rows)]
+            with self._lock:
+                self._replace(indexed, frozenset(changed_ids - {row.id for row in rows}))
+            self._cursor = (events[-1].txid, events[-1].id)
+        self._cursor_read_at = read_at
+
+
+product_index = ProductPrefixIndex()
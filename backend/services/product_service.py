@@ -1,13 +1,43 @@
 import logging
-from sqlalchemy import select
-from sqlalchemy.exc import SQLAlchemyError
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import select, update, delete, func, literal, any_, values, column, Numeric, ARRAY, Integer
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
 from models.product import Product
-from models.enums import UnitType
+from models.invoice_item import InvoiceItem
+from models.order import Order
+from models.order_item import OrderItem
+from models.quotation import Quotation
+from models.quotation_item import QuotationItem
+from models.recurring_invoice_item import RecurringInvoiceItem
+from models.enums import UnitType, OrderStatus, QuotationStatus
+from services.integrity_errors import raise_for_constraint_violation
+from services.references import ReferenceInUseError, find_references, reference_constraint_names
+from services.outbox_service import record_event, record_events, CREATED, UPDATED, DELETED
+from services.product_index import product_index, index_entry
+from services.document_totals_service import DocumentTotalsService
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+PRODUCT_NAME_KEY = "products_name_key"
+
+# Items that keep a product from being deleted.
+PRODUCT_REFERENCES = {
+    "invoices": InvoiceItem.product_id,
+    "orders": OrderItem.product_id,
+    "quotations": QuotationItem.product_id,
+    "recurring invoices": RecurringInvoiceItem.product_id,
+}
+
+REPRICE_MODES = ("set", "amount", "percent")
+# Documents whose items follow catalog price changes when repricing with update_open_documents.
+REPRICED_DOCUMENTS = (
+    ("order", Order, OrderItem, OrderItem.order_id, (OrderStatus.DRAFT, OrderStatus.OPEN, OrderStatus.IN_PROGRESS)),
+    ("quotation", Quotation, QuotationItem, QuotationItem.quotation_id, (QuotationStatus.DRAFT, QuotationStatus.SENT)),
+)
+
 
 class ProductService:
     """
@@ -21,24 +51,6 @@ class ProductService:
         self.session = session
 
 
-    def raise_if_product_name_exists(self, product_name: str) -> None:
-        """
-        Checks if a product name already exists and raises an error if it does.
-
-        Args:
-            product_name (str): Name to check.
-
-        Raises:
-            ValueError: If the product name is already in use.
-        """
-        stmt = select(Product).where(Product.name == product_name)
-        product = self.session.scalars(stmt).first()
-
-        if product:
-            raise ValueError("Product name already in use by another product.")
-        return None
-
-
     def get_product_by_id_or_raise(self, product_id: int) -> Product | None:
         """
         Retrieves a product by ID or raises an error if not found.
@@ -57,13 +69,41 @@ class ProductService:
         return product
 
 
-    def create_product(self, name: str, unit_price: float, unit: UnitType, description: str = None) -> None:
+    def get_unit_prices_or_raise(self, product_ids) -> dict[int, Decimal]:
         """
-        Creates a new product after checking for duplicates and valid unit.
+        Retrieves the unit prices of several products with a single query.
+
+        Args:
+            product_ids (Iterable[int]): IDs of the products.
+
+        Returns:
+            dict[int, Decimal]: Product IDs mapped to their current unit price.
+
+        Raises:
+            ValueError: If any of the products does not exist.
+        """
+        product_ids = set(product_ids)
+        if not product_ids:
+            return {}
+
+        stmt = select(Product.id, Product.unit_price).where(Product.id.in_(product_ids))
+        prices = {row.id: row.unit_price for row in self.session.execute(stmt)}
+
+        missing_ids = sorted(product_ids - prices.keys())
+        if len(missing_ids) == 1:
+            raise ValueError(f"Product with id '{missing_ids[0]}' not found.")
+        if missing_ids:
+            raise ValueError(f"Products with ids {', '.join(map(str, missing_ids))} not found.")
+        return prices
+
+
+    def create_product(self, name: str, unit_price: Decimal, unit: UnitType, description: str = None) -> None:
+        """
+        Creates a new product, relying on the unique constraint to detect duplicate names.
 
         Args:
             name (str): Product name.
-            unit_price (float): Price per unit.
+            unit_price (Decimal): Price per unit.
             unit (str): Unit of measurement.
             description (str, optional): Product description.
 
@@ -73,8 +113,6 @@ class ProductService:
         if unit_price < 0:
             raise ValueError("Unit price must be zero or positive.")
 
-        self.raise_if_product_name_exists(name)
-
         new_product = Product(
             name=name,
             unit_price=unit_price,
@@ -83,8 +121,18 @@ class ProductService:
         )
         try:
             self.session.add(new_product)
+            self.session.flush()
+            record_event(self.session, "product", new_product.id, CREATED, {"name": name, "unit_price": unit_price})
+            entry = index_entry(new_product)
             self.session.commit()
+            product_index.upsert(entry)
             logger.info(f"Product '{name}' created successfully.")
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Product '{name}' violates a unique constraint: {e.orig}")
+            raise_for_constraint_violation(e, {
+                PRODUCT_NAME_KEY: "Product name already in use by another product.",
+            })
         except SQLAlchemyError as e:
             self.session.rollback()
             logger.error(f"Error creating product '{name}': {e}")
@@ -105,13 +153,92 @@ class ProductService:
             return []
 
 
-    def update_product_price(self, product_id: int, new_unit_price: float) -> None:
+    def suggest_products(self, prefix: str, limit: int = 10) -> list[dict]:
+        """
+        Suggests products for a typed prefix from the in-memory product index.
+
+        The database is only queried when the index is built or periodically refreshed,
+        not for every lookup.
+
+        Args:
+            prefix (str): Beginning of a product name or of a word in its name or description.
+            limit (int): Maximum number of suggestions.
+
+        Returns:
+            list[dict]: id, name, unit and unit_price of the best matches.
+
+        Raises:
+            ValueError: If the prefix is empty or the limit is out of range.
+        """
+        return product_index.suggest(self.session, prefix, limit)
+
+
+    def patch_product(self, product_id: int, fields: dict) -> Product:
+        """
+        Applies a partial update to a product in a single UPDATE ... RETURNING statement.
+
+        Args:
+            product_id (int): Product ID.
+            fields (dict): Column names mapped to their new values.
+
+        Returns:
+            Product: The updated product.
+
+        Raises:
+            ValueError: If validation fails, the name is already in use or the product does not exist.
+        """
+        if not fields:
+            raise ValueError("No fields to update.")
+
+        if "name" in fields and not fields["name"]:
+            raise ValueError("Product name must not be empty.")
+
+        if fields.get("unit_price") is not None and fields["unit_price"] < 0:
+            raise ValueError("Unit price must be zero or positive.")
+
+        if "unit" in fields:
+            try:
+                fields["unit"] = UnitType(fields["unit"])
+            except ValueError:
+                raise ValueError(f"Invalid unit: {fields['unit']}")
+
+        stmt = (
+            update(Product)
+            .where(Product.id == product_id)
+            .values(**fields)
+            .returning(Product)
+        )
+
+        try:
+            product = self.session.scalars(stmt).first()
+            if not product:
+                self.session.rollback()
+                raise ValueError(f"Product with id '{product_id}' not found.")
+            record_event(self.session, "product", product_id, UPDATED, fields)
+            entry = index_entry(product)
+            self.session.commit()
+            product_index.upsert(entry)
+            logger.info(f"Product updated successfully for id {product_id}.")
+            return product
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Product update for id {product_id} violates a unique constraint: {e.orig}")
+            raise_for_constraint_violation(e, {
+                PRODUCT_NAME_KEY: "Product name already in use by another product.",
+            })
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error updating product with id '{product_id}': {e}")
+            raise
+
+
+    def update_product_price(self, product_id: int, new_unit_price: Decimal) -> None:
         """
         Updates the unit price of a product.
 
         Args:
             product_id (int): Product ID.
-            new_unit_price (float): New unit price.
+            new_unit_price (Decimal): New unit price.
 
         Raises:
             ValueError: If price is negative.
@@ -123,7 +250,10 @@ class ProductService:
 
         try:
             product.unit_price = new_unit_price
+            record_event(self.session, "product", product_id, UPDATED, {"unit_price": new_unit_price})
+            entry = index_entry(product)
             self.session.commit()
+            product_index.upsert(entry)
             logger.info(f"Product price updated successfully for id {product_id}.")
         except SQLAlchemyError as e:
             self.session.rollback()
@@ -131,6 +261,173 @@ class ProductService:
             raise
 
 
+    def reprice_products(
+            self,
+            mode: str,
+            value: Decimal,
+            ids: Optional[list[int]] = None,
+            unit: Optional[str] = None,
+            name_pattern: Optional[str] = None,
+            update_open_documents: bool = False,
+            dry_run: bool = False
+    ) -> dict:
+        """
+        Changes the prices of all selected products with a single UPDATE.
+
+        Products are selected by IDs, unit and a name pattern in which '*' matches any text;
+        all given filters must match. A dry run executes the same statements and rolls them
+        back, so the preview is exactly what a real run would change.
+
+        Args:
+            mode (str): 'set' to set value as the new price, 'amount' to add value to the price
+                or 'percent' to change the price by value percent. Results are rounded to cents.
+            value (Decimal): New price, amount or percentage.
+            ids (list[int], optional): Product IDs.
+            unit (str, optional): UnitType value, e.g. 'kg'.
+            name_pattern (str, optional): Case-insensitive name pattern, e.g. 'cable*'.
+            update_open_documents (bool): Also set the new prices on the items of draft, open and
+                in-progress orders and of draft and sent quotations that still have the old catalog
+                price and recompute their totals. Items with a negotiated price are kept.
+            dry_run (bool): Only report the changes.
+
+        Returns:
+            dict: dry_run, products (id, name, old_unit_price, new_unit_price), updated_products,
+                updated_order_items, updated_orders, updated_quotation_items and updated_quotations.
+
+        Raises:
+            ValueError: If the mode, value or a filter is invalid, no filter is given or a
+                price would become negative.
+        """
+        if mode not in REPRICE_MODES:
+            raise ValueError(f"Invalid mode: {mode}. Allowed: {', '.join(REPRICE_MODES)}.")
+        if mode == "set" and value < 0:
+            raise ValueError("Unit price must be zero or positive.")
+        if ids is None and unit is None and not name_pattern:
+            raise ValueError("Select products by ids, unit or name_pattern.")
+
+        old = select(Product.id, Product.unit_price)
+        if ids is not None:
+            old = old.where(Product.id == any_(literal(ids, ARRAY(Integer))))
+        if unit is not None:
+            try:
+                old = old.where(Product.unit == UnitType(unit))
+            except ValueError:
+                raise ValueError(f"Invalid unit: {unit}")
+        if name_pattern:
+            escaped = name_pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            old = old.where(Product.name.ilike(escaped.replace("*", "%")))
+        old = old.subquery()
+
+        new_price = {
+            "set": literal(value, Numeric),
+            "amount": Product.unit_price + value,
+            "percent": Product.unit_price * (1 + literal(value, Numeric) / 100),
+        }[mode]
+        stmt = (
+            update(Product)
+            .where(Product.id == old.c.id)
+            .values(unit_price=func.round(new_price, 2))
+            .returning(
+                Product.id, Product.name, Product.description, Product.unit,
+                old.c.unit_price.label("old_unit_price"), Product.unit_price
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        try:
+            products = sorted(self.session.execute(stmt).all(), key=lambda row: row.id)
+            negative = [row.id for row in products if row.unit_price < 0]
+            if negative:
+                raise ValueError(
+                    f"Unit price must be zero or positive, the change would make {len(negative)} prices negative."
+                )
+            result = {
+                "dry_run": dry_run,
+                "products": [
+                    {"id": row.id, "name": row.name, "old_unit_price": row.old_unit_price, "new_unit_price": row.unit_price}
+                    for row in products
+                ],
+                "updated_products": len(products),
+            }
+            events = [
+                {"entity_type": "product", "entity_id": row.id, "action": UPDATED, "payload": {"unit_price": row.unit_price}}
+                for row in products
+            ]
+
+            for entity_type, document_model, item_model, parent_column, statuses in REPRICED_DOCUMENTS:
+                item_rows, document_ids = [], []
+                if update_open_documents and products:
+                    item_rows, document_ids = self._reprice_open_items(
+                        products, document_model, item_model, parent_column, statuses
+                    )
+                    DocumentTotalsService(self.session).recalculate(document_model, document_ids)
+                events += [
+                    {
+                        "entity_type": f"{entity_type}_item", "entity_id": row.id, "action": UPDATED,
+                        "payload": {f"{entity_type}_id": row.document_id, "unit_price": row.unit_price}
+                    }
+                    for row in item_rows
+                ]
+                events += [
+                    {"entity_type": entity_type, "entity_id": document_id, "action": UPDATED, "payload": None}
+                    for document_id in document_ids
+                ]
+                result[f"updated_{entity_type}_items"] = len(item_rows)
+                result[f"updated_{entity_type}s"] = len(document_ids)
+
+            if dry_run:
+                self.session.rollback()
+                return result
+            record_events(self.session, events)
+            self.session.commit()
+        except (SQLAlchemyError, ValueError) as e:
+            self.session.rollback()
+            logger.error(f"Error repricing products: {e}")
+            raise
+
+        product_index.upsert_many([index_entry(row) for row in products])
+        logger.info(
+            f"Repriced {len(products)} products, {result['updated_order_items']} order items "
+            f"and {result['updated_quotation_items']} quotation items."
+        )
+        return result
+
+
+    def _reprice_open_items(self, products: list, document_model, item_model, parent_column, statuses):
+        """
+        Copies the current catalog prices of repriced products to the items of open documents with one UPDATE.
+
+        Only items whose price equals the product's old catalog price are changed, so manually
+        negotiated prices are kept. The old prices are passed in because the products are
+        already updated when this runs.
+
+        Args:
+            products (list): Rows with id and old_unit_price of the repriced products.
+
+        Returns:
+            tuple[list, list[int]]: Updated items (id, document_id, unit_price) and the IDs of their documents.
+        """
+        old = values(column("id", Integer), column("unit_price", Numeric), name="old_prices").data(
+            [(row.id, row.old_unit_price) for row in products]
+        )
+        stmt = (
+            update(item_model)
+            .where(
+                item_model.product_id == Product.id,
+                Product.id == old.c.id,
+                parent_column == document_model.id,
+                document_model.status.in_(statuses),
+                item_model.unit_price == old.c.unit_price,
+                Product.unit_price != old.c.unit_price,
+            )
+            .values(unit_price=Product.unit_price)
+            .returning(item_model.id, parent_column.label("document_id"), item_model.unit_price)
+            .execution_options(synchronize_session=False)
+        )
+        item_rows = self.session.execute(stmt).all()
+        return item_rows, sorted({row.document_id for row in item_rows})
+
+
     def update_product_name(self, product_id: int, new_name: str) -> None:
         """
         Updates the name of a product.
@@ -144,12 +441,19 @@ class ProductService:
         """
         product = self.get_product_by_id_or_raise(product_id)
 
-        self.raise_if_product_name_exists(new_name)
-
         try:
             product.name = new_name
+            record_event(self.session, "product", product_id, UPDATED, {"name": new_name})
+            entry = index_entry(product)
             self.session.commit()
+            product_index.upsert(entry)
             logger.info(f"Product name updated successfully for id {product_id}.")
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Name update for product {product_id} violates a unique constraint: {e.orig}")
+            raise_for_constraint_violation(e, {
+                PRODUCT_NAME_KEY: "Product name already in use by another product.",
+            })
         except (SQLAlchemyError, ValueError) as e:
             self.session.rollback()
             logger.error(f"Error updating product name: {e}")
@@ -168,7 +472,10 @@ class ProductService:
 
         try:
             product.description = new_description
+            record_event(self.session, "product", product_id, UPDATED, {"description": new_description})
+            entry = index_entry(product)
             self.session.commit()
+            product_index.upsert(entry)
             logger.info(f"Product description updated successfully for id {product_id}.")
         except SQLAlchemyError as e:
             self.session.rollback()
@@ -195,7 +502,10 @@ class ProductService:
 
         try:
             product.unit = unit_enum
+            record_event(self.session, "product", product_id, UPDATED, {"unit": unit_enum})
+            entry = index_entry(product)
             self.session.commit()
+            product_index.upsert(entry)
             logger.info(
                 f"Product unit updated successfully for id {product_id}.")
         except SQLAlchemyError as e:
@@ -205,17 +515,46 @@ class ProductService:
 
     def delete_product(self, product_id: int) -> None:
         """
-        Deletes a product by ID.
+        Deletes a product by ID with a single DELETE statement.
+
+        Whether any item still references the product is checked with one query before,
+        the foreign keys reject references created concurrently.
 
         Args:
             product_id (int): ID of the product to delete.
-        """
-        product = self.get_product_by_id_or_raise(product_id)
 
+        Raises:
+            ReferenceInUseError: If items of any document reference the product.
+            ValueError: If the product does not exist.
+        """
+        used_by = find_references(self.session, PRODUCT_REFERENCES, product_id)
+        in_use_message = (
+            f"Product with id '{product_id}' is still used by {', '.join(used_by) or 'documents'} "
+            "and cannot be deleted."
+        )
+        if used_by:
+            raise ReferenceInUseError(in_use_message)
+
+        stmt = (
+            delete(Product)
+            .where(Product.id == product_id)
+            .returning(Product.id)
+            .execution_options(synchronize_session=False)
+        )
         try:
-            self.session.delete(product)
+            if self.session.scalar(stmt) is None:
+                self.session.rollback()
+                raise ValueError(f"Product with id '{product_id}' not found.")
+            record_event(self.session, "product", product_id, DELETED)
             self.session.commit()
+            product_index.remove(product_id)
             logger.info(f"Product with id '{product_id}' deleted successfully.")
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Product with id '{product_id}' was referenced concurrently: {e.orig}")
+            raise_for_constraint_violation(e, {
+                name: in_use_message for name in reference_constraint_names(PRODUCT_REFERENCES)
+            })
         except SQLAlchemyError as e:
             self.session.rollback()
             logger.error(f"Error deleting product with id '{product_id}': {e}")
@@ -1,14 +1,26 @@
 import logging
-from sqlalchemy import select
-from sqlalchemy.exc import SQLAlchemyError
+from decimal import Decimal
+from datetime import date
+from typing import Iterator, Optional
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
 from models.quotation_item import QuotationItem
 from models.quotation import Quotation
 from models.product import Product
+from services.integrity_errors import raise_for_constraint_violation
+from services.document_totals_service import DocumentTotalsService, line_total
+from services.sorting import apply_sort, ITEM_SORT_FIELDS
+from services.outbox_service import record_event, record_events, CREATED, UPDATED, DELETED
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+ITEM_STREAM_BATCH_SIZE = 1000
+
+QUOTATION_ITEM_QUOTATION_FKEY = "quotation_items_quotation_id_fkey"
+QUOTATION_ITEM_PRODUCT_FKEY = "quotation_items_product_id_fkey"
+
 
 class QuotationItemService:
     """
@@ -58,17 +70,20 @@ class QuotationItemService:
         return product
 
 
-    def get_item_by_id_or_raise(self, item_id: int):
+    def get_item_by_id_or_raise(self, item_id: int, for_update: bool = False):
         """
         Retrieves a quotation item by ID or raises an error if not found.
 
         Args:
             item_id (int): The ID of the item.
+            for_update (bool): Lock the item row until the transaction ends.
 
         Returns:
             QuotationItem: The found item.
         """
         stmt = select(QuotationItem).where(QuotationItem.id == item_id)
+        if for_update:
+            stmt = stmt.with_for_update().execution_options(populate_existing=True)
         item = self.session.scalars(stmt).first()
 
         if not item:
@@ -76,22 +91,19 @@ class QuotationItemService:
         return item
 
 
-    def create_item(self, quotation_id: int, product_id: int, quantity: float, unit_price: float) -> None:
+    def create_item(self, quotation_id: int, product_id: int, quantity: Decimal, unit_price: Decimal) -> None:
         """
         Creates a new quotation item.
 
         Args:
             quotation_id (int): ID of the quotation.
             product_id (int): ID of the product.
-            quantity (float): Quantity of the product.
-            unit_price (float): Unit price of the product.
+            quantity (Decimal): Quantity of the product.
+            unit_price (Decimal): Unit price of the product.
 
         Raises:
-            ValueError: If input values are invalid.
+            ValueError: If input values are invalid or the quotation or product does not exist.
         """
-        self.get_quotation_or_raise(quotation_id)
-        self.get_product_or_raise(product_id)
-
         if quantity < 0:
             raise ValueError("Quantity must be zero or positive.")
         if unit_price < 0:
@@ -106,50 +118,111 @@ class QuotationItemService:
 
         try:
             self.session.add(new_item)
+            DocumentTotalsService(self.session).apply_item_delta(
+                Quotation, quotation_id, line_total(quantity, unit_price), 1
+            )
+            self.session.flush()
+            record_event(self.session, "quotation_item", new_item.id, CREATED, {"quotation_id": quotation_id})
             self.session.commit()
             logger.info(f"Item created successfully for quotation id {quotation_id}.")
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Quotation item for quotation id {quotation_id} violates a constraint: {e.orig}")
+            raise_for_constraint_violation(e, {
+                QUOTATION_ITEM_QUOTATION_FKEY: f"Quotation with id {quotation_id} not found.",
+                QUOTATION_ITEM_PRODUCT_FKEY: f"Product with id '{product_id}' not found.",
+            })
         except SQLAlchemyError as e:
             self.session.rollback()
             logger.error(f"Error creating quotation item: {e}")
             raise
 
 
-    def get_all_items(self):
+    def get_items_page(self, quotation: Quotation, limit: int = 100, offset: int = 0, sort_by: Optional[str] = None) -> dict:
         """
-        Retrieves all quotation items from the database.
+        Retrieves one page of the items of a quotation using the index on (quotation_id, id).
+
+        Args:
+            quotation (Quotation): The quotation whose items are listed.
+            limit (int): Maximum number of items.
+            offset (int): Number of items to skip.
+            sort_by (str, optional): Sort field such as 'unit_price', prefix with '-' for descending order.
 
         Returns:
-            list: List of QuotationItem instances.
+            dict: items, total, limit and offset. total is the stored item count of the quotation.
+
+        Raises:
+            ValueError: If the sort field is invalid.
         """
+        stmt = select(QuotationItem).where(QuotationItem.quotation_id == quotation.id)
+        stmt = apply_sort(stmt, QuotationItem, sort_by or "id", ITEM_SORT_FIELDS).limit(limit).offset(offset)
+
         try:
-            return self.session.scalars(select(QuotationItem)).all()
+            items = self.session.scalars(stmt).all()
         except SQLAlchemyError as e:
-            logger.error(f"Error retrieving quotation items: {e}")
-            return []
+            logger.error(f"Error retrieving items of quotation id {quotation.id}: {e}")
+            raise
+        return {"items": items, "total": quotation.item_count, "limit": limit, "offset": offset}
+
+
+    def stream_items(
+            self,
+            product_id: Optional[int] = None,
+            date_from: Optional[date] = None,
+            date_to: Optional[date] = None
+    ) -> Iterator[QuotationItem]:
+        """
+        Yields quotation items in ID order, read in batches through a server-side cursor.
+
+        Args:
+            product_id (int, optional): Only items of this product.
+            date_from (date, optional): Only items of quotations issued on or after this day.
+            date_to (date, optional): Only items of quotations issued on or before this day.
+
+        Yields:
+            QuotationItem: The matching items.
+        """
+        stmt = select(QuotationItem).order_by(QuotationItem.id)
+        if product_id:
+            stmt = stmt.where(QuotationItem.product_id == product_id)
+        if date_from or date_to:
+            stmt = stmt.join(Quotation, Quotation.id == QuotationItem.quotation_id)
+            if date_from:
+                stmt = stmt.where(Quotation.issue_date >= date_from)
+            if date_to:
+                stmt = stmt.where(Quotation.issue_date <= date_to)
+
+        yield from self.session.scalars(stmt.execution_options(yield_per=ITEM_STREAM_BATCH_SIZE))
 
 
-    def update_item(self, item_id: int, new_quantity: float, new_unit_price: float) -> None:
+    def update_item(self, item_id: int, new_quantity: Decimal, new_unit_price: Decimal) -> None:
         """
         Updates quantity and unit price of an existing quotation item.
 
         Args:
             item_id (int): ID of the item.
-            new_quantity (float): New quantity.
-            new_unit_price (float): New unit price.
+            new_quantity (Decimal): New quantity.
+            new_unit_price (Decimal): New unit price.
 
         Raises:
             ValueError: If values are invalid.
         """
-        item = self.get_item_by_id_or_raise(item_id)
-
         if new_quantity < 0:
             raise ValueError("Quantity must be zero or positive.")
         if new_unit_price < 0:
             raise ValueError("Unit price must be zero or positive.")
 
+        # The lock keeps concurrent edits of the item from computing their deltas from the same values.
+        item = self.get_item_by_id_or_raise(item_id, for_update=True)
+
         try:
+            net_delta = line_total(new_quantity, new_unit_price) - line_total(item.quantity, item.unit_price)
             item.quantity = new_quantity
             item.unit_price = new_unit_price
+            DocumentTotalsService(self.session).apply_item_delta(Quotation, item.quotation_id, net_delta, 0)
+            record_event(self.session, "quotation_item", item_id, UPDATED, {
+                "quotation_id": item.quotation_id, "quantity": new_quantity, "unit_price": new_unit_price
+            })
             self.session.commit()
             logger.info(f"Quotation item updated successfully for id {item_id}.")
         except SQLAlchemyError as e:
@@ -165,13 +238,143 @@ class QuotationItemService:
         Args:
             item_id (int): ID of the item to delete.
         """
-        item = self.get_item_by_id_or_raise(item_id)
+        # Locked so a concurrent update cannot change the line total subtracted below.
+        item = self.get_item_by_id_or_raise(item_id, for_update=True)
 
         try:
             self.session.delete(item)
+            DocumentTotalsService(self.session).apply_item_delta(
+                Quotation, item.quotation_id, -line_total(item.quantity, item.unit_price), -1
+            )
+            record_event(self.session, "quotation_item", item_id, DELETED, {"quotation_id": item.quotation_id})
             self.session.commit()
             logger.info(f"Quotation item with id '{item_id}' deleted successfully.")
         except SQLAlchemyError as e:
             self.session.rollback()
             logger.error(f"Error deleting quotation item with id '{item_id}': {e}")
             raise
+
+
+    def apply_bulk(self, creates: list[dict], updates: list[dict], deletes: list[int]) -> dict:
+        """
+        Creates, updates and deletes many quotation items in one transaction using batched statements.
+
+        Rows that reference a missing quotation, product or item are reported and skipped,
+        all other rows are applied.
+
+        Args:
+            creates (list[dict]): New items with quotation_id, product_id, quantity and unit_price.
+            updates (list[dict]): Changes with the item id and a new quantity and/or unit_price.
+            deletes (list[int]): IDs of the items to delete.
+
+        Returns:
+            dict: Per-row results under the keys 'created', 'updated' and 'deleted'.
+        """
+        results = {"created": [], "updated": [], "deleted": []}
+        events = []
+
+        try:
+            quotation_ids = set(self.session.scalars(
+                select(Quotation.id).where(Quotation.id.in_({row["quotation_id"] for row in creates}))
+            ))
+            product_ids = set(self.session.scalars(
+                select(Product.id).where(Product.id.in_({row["product_id"] for row in creates}))
+            ))
+
+            valid_creates = []
+            for index, row in enumerate(creates):
+                if row["quotation_id"] not in quotation_ids:
+                    detail = f"Quotation with id '{row['quotation_id']}' not found."
+                elif row["product_id"] not in product_ids:
+                    detail = f"Product with id '{row['product_id']}' not found."
+                elif row["quantity"] < 0 or row["unit_price"] < 0:
+                    detail = "Quantity and unit price must be zero or positive."
+                else:
+                    valid_creates.append((index, row))
+                    continue
+                results["created"].append({"index": index, "status": "error", "detail": detail})
+
+            if valid_creates:
+                stmt = insert(QuotationItem).returning(QuotationItem.id, sort_by_parameter_order=True)
+                new_ids = self.session.scalars(stmt, [row for _, row in valid_creates]).all()
+                for (index, row), item_id in zip(valid_creates, new_ids):
+                    results["created"].append({"index": index, "id": item_id, "status": "created"})
+                    events.append({
+                        "entity_type": "quotation_item", "entity_id": item_id, "action": CREATED,
+                        "payload": {"quotation_id": row["quotation_id"]}
+                    })
+                results["created"].sort(key=lambda result: result["index"])
+
+            affected_quotation_ids = {row["quotation_id"] for _, row in valid_creates}
+
+            existing_items = dict(self.session.execute(
+                select(QuotationItem.id, QuotationItem.quotation_id).where(QuotationItem.id.in_({row["id"] for row in updates}))
+            ).tuples().all())
+
+            valid_updates = []
+            for row in updates:
+                changes = {
+                    key: row[key]
+                    for key in ("quantity", "unit_price")
+                    if row.get(key) is not None
+                }
+                if row["id"] not in existing_items:
+                    detail = f"Item with id '{row['id']}' not found."
+                elif not changes:
+                    detail = "No fields to update."
+                elif any(value < 0 for value in changes.values()):
+                    detail = "Quantity and unit price must be zero or positive."
+                else:
+                    valid_updates.append({"id": row["id"], **changes})
+                    events.append({
+                        "entity_type": "quotation_item", "entity_id": row["id"], "action": UPDATED,
+                        "payload": {"quotation_id": existing_items[row["id"]], **changes}
+                    })
+                    affected_quotation_ids.add(existing_items[row["id"]])
+                    results["updated"].append({"id": row["id"], "status": "updated"})
+                    continue
+                results["updated"].append({"id": row["id"], "status": "error", "detail": detail})
+
+            if valid_updates:
+                self.session.execute(update(QuotationItem), valid_updates)
+
+            deleted_ids = set()
+            if deletes:
+                stmt = delete(QuotationItem).where(QuotationItem.id.in_(deletes)).returning(QuotationItem.id, QuotationItem.quotation_id)
+                deleted_items = dict(self.session.execute(stmt).tuples().all())
+                deleted_ids = set(deleted_items)
+                events += [
+                    {
+                        "entity_type": "quotation_item", "entity_id": item_id, "action": DELETED,
+                        "payload": {"quotation_id": parent_id}
+                    }
+                    for item_id, parent_id in deleted_items.items()
+                ]
+                affected_quotation_ids.update(deleted_items.values())
+            for item_id in deletes:
+                if item_id in deleted_ids:
+                    results["deleted"].append({"id": item_id, "status": "deleted"})
+                else:
+                    results["deleted"].append({
+                        "id": item_id, "status": "error", "detail": f"Item with id '{item_id}' not found."
+                    })
+
+            DocumentTotalsService(self.session).recalculate(Quotation, affected_quotation_ids)
+            record_events(self.session, events)
+            self.session.commit()
+            logger.info(
+                f"Bulk quotation item operation applied: {len(valid_creates)} created, "
+                f"{len(valid_updates)} updated, {len(deleted_ids)} deleted."
+            )
+            return results
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Bulk quotation item operation violates a constraint: {e.orig}")
+            raise_for_constraint_violation(e, {
+                QUOTATION_ITEM_QUOTATION_FKEY: "Quotation not found.",
+                QUOTATION_ITEM_PRODUCT_FKEY: "Product not found.",
+            })
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error applying bulk quotation item operation: {e}")
+            raise
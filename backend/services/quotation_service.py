@@ -1,15 +1,36 @@
 import logging
-from sqlalchemy import select
-from sqlalchemy.exc import SQLAlchemyError
+from datetime import date
+from sqlalchemy import select, insert, literal, delete
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+
+from sqlalchemy.orm.attributes import set_committed_value
 
 from models.quotation import Quotation
-from models.enums import QuotationStatus
+from models.quotation_item import QuotationItem
+from models.order import Order
+from models.order_item import OrderItem
+from models.enums import QuotationStatus, OrderStatus
 from models.customer import Customer
 from models.user import User
+from services.integrity_errors import raise_for_constraint_violation
+from services.product_service import ProductService
+from services.document_totals_service import DocumentTotalsService, line_total
+from services.sorting import apply_sort
+from services.expansion import document_load_options
+from services.number_series_service import NumberSeriesService, QUOTATION_PREFIX, ORDER_PREFIX
+from services.outbox_service import record_event, record_events, item_events, CREATED, UPDATED, STATUS_CHANGED, DELETED
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+QUOTATION_NUMBER_KEY = "quotations_quotation_number_key"
+QUOTATION_CUSTOMER_FKEY = "quotations_customer_id_fkey"
+QUOTATION_USER_FKEY = "quotations_user_id_fkey"
+
+CONVERTIBLE_QUOTATION_STATUSES = {QuotationStatus.DRAFT, QuotationStatus.SENT, QuotationStatus.ACCEPTED}
+ORDER_QUOTATION_KEY = "orders_quotation_id_key"
+ORDER_NUMBER_KEY = "orders_order_number_key"
+
 
 class QuotationService:
     """
@@ -23,17 +44,22 @@ class QuotationService:
         self.session = session
 
 
-    def get_quotation_by_id_or_raise(self, quotation_id: int) -> Quotation | None:
+    def get_quotation_by_id_or_raise(self, quotation_id: int, expand: frozenset[str] = frozenset()) -> Quotation | None:
         """
         Retrieves a quotation by ID or raises an error if not found.
 
         Args:
             quotation_id (int): ID of the quotation.
+            expand (frozenset[str], optional): Relations to eager-load, see parse_expand().
 
         Returns:
             Quotation: The found quotation.
         """
-        stmt = select(Quotation).where(Quotation.id == quotation_id)
+        stmt = (
+            select(Quotation)
+            .options(*document_load_options(Quotation, QuotationItem, expand))
+            .where(Quotation.id == quotation_id)
+        )
         quotation = self.session.scalars(stmt).first()
 
         if not quotation:
@@ -103,8 +129,9 @@ class QuotationService:
         due_date=None,
         quotation_number: str = None,
         status: str = "DRAFT",
-        notes: str = None
-    ) -> None:
+        notes: str = None,
+        items: list[dict] = None
+    ) -> Quotation:
         """
         Creates a new quotation with optional metadata.
 
@@ -113,23 +140,18 @@ class QuotationService:
             user_id (int): ID of the user creating the quotation.
             issue_date (date): Date the quotation is issued.
             due_date (date, optional): Expiration date of the quotation.
-            quotation_number (str, optional): Unique identifier.
+            quotation_number (str, optional): Unique identifier, allocated from the AN series if omitted.
             status (str): Initial status.
             notes (str, optional): Additional notes.
+            items (list[dict], optional): Line items with product_id, quantity and an optional unit_price.
+                Missing unit prices are taken from the product catalog.
+
+        Returns:
+            Quotation: The created quotation including its items.
 
         Raises:
-            ValueError: If data is invalid or already in use.
+            ValueError: If data is invalid, already in use or customer, user or a product do not exist.
         """
-        self.get_customer_or_raise(customer_id)
-        self.get_user_or_raise(user_id)
-
-        if quotation_number is not None:
-            stmt = select(Quotation).where(Quotation.quotation_number == quotation_number)
-            existing_quotation = self.session.scalars(stmt).first()
-
-            if existing_quotation:
-                raise ValueError("Quotation number already in use.")
-
         if status.upper() not in QuotationStatus.__members__:
             raise ValueError(f"Invalid quotation status: {status}")
 
@@ -145,26 +167,195 @@ class QuotationService:
 
         try:
             self.session.add(new_quotation)
+            self.session.flush()
+            created_items = self.insert_items(new_quotation, items or [])
+            NumberSeriesService(self.session).assign_number_if_missing(new_quotation, "quotation_number", QUOTATION_PREFIX)
+            record_event(self.session, "quotation", new_quotation.id, CREATED, {
+                "customer_id": customer_id, "status": new_quotation.status,
+                "quotation_number": new_quotation.quotation_number
+            })
+            record_events(self.session, item_events("quotation", new_quotation.id, [item.id for item in created_items], CREATED))
             self.session.commit()
             logger.info(f"Quotation created successfully for customer id {customer_id}.")
-        except SQLAlchemyError as e:
+            return new_quotation
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Quotation for customer id {customer_id} violates a constraint: {e.orig}")
+            raise_for_constraint_violation(e, {
+                QUOTATION_NUMBER_KEY: "Quotation number already in use.",
+                QUOTATION_CUSTOMER_FKEY: f"Customer with id {customer_id} not found.",
+                QUOTATION_USER_FKEY: f"User with id {user_id} not found.",
+            })
+        except (SQLAlchemyError, ValueError) as e:
             self.session.rollback()
             logger.error(f"Error creating quotation: {e}")
             raise
 
 
-    def get_all_quotations(self, status=None, customer_id=None) -> list[Quotation]:
+    def insert_items(self, quotation: Quotation, items: list[dict]) -> list[QuotationItem]:
+        """
+        Inserts the line items of a quotation with one batched product lookup and one multi-row INSERT
+        and adds them to the stored totals.
+
+        The caller is responsible for committing the transaction.
+
+        Args:
+            quotation (Quotation): The flushed quotation the items belong to.
+            items (list[dict]): Line items with product_id, quantity and an optional unit_price.
+
+        Returns:
+            list[QuotationItem]: The created items.
+
+        Raises:
+            ValueError: If a quantity or price is negative or a product does not exist.
+        """
+        for item in items:
+            if item["quantity"] < 0:
+                raise ValueError("Quantity must be zero or positive.")
+            if item.get("unit_price") is not None and item["unit_price"] < 0:
+                raise ValueError("Unit price must be zero or positive.")
+
+        unit_prices = ProductService(self.session).get_unit_prices_or_raise(
+            item["product_id"] for item in items
+        )
+
+        created_items = []
+        if items:
+            stmt = insert(QuotationItem).returning(QuotationItem, sort_by_parameter_order=True)
+            created_items = self.session.scalars(stmt, [
+                {
+                    "quotation_id": quotation.id,
+                    "product_id": item["product_id"],
+                    "quantity": item["quantity"],
+                    "unit_price": (
+                        item["unit_price"] if item.get("unit_price") is not None
+                        else unit_prices[item["product_id"]]
+                    ),
+                }
+                for item in items
+            ]).all()
+
+        if created_items:
+            DocumentTotalsService(self.session).apply_item_delta(
+                Quotation,
+                quotation.id,
+                sum(line_total(item.quantity, item.unit_price) for item in created_items),
+                len(created_items)
+            )
+
+        set_committed_value(quotation, "items", created_items)
+        return created_items
+
+
+    def convert_to_order(
+        self,
+        quotation_id: int,
+        order_number: str = None,
+        issue_date=None,
+        delivery_date=None
+    ) -> Order:
+        """
+        Converts a quotation into an order within a single transaction.
+
+        The quotation header is copied to a new OPEN order, all items are copied with one
+        INSERT ... SELECT and the quotation is marked as ACCEPTED.
+        The stored totals are taken over from the quotation.
+
+        Args:
+            quotation_id (int): ID of the quotation to convert.
+            order_number (str, optional): Unique number of the new order, allocated from the AU series if omitted.
+            issue_date (date, optional): Issue date of the order, defaults to today.
+            delivery_date (date, optional): Planned delivery date.
+
+        Returns:
+            Order: The created order.
+
+        Raises:
+            ValueError: If the quotation does not exist, cannot be converted in its current
+                status, was already converted or the order number is already in use.
+        """
+        try:
+            quotation = self.session.scalars(
+                select(Quotation).where(Quotation.id == quotation_id).with_for_update()
+            ).first()
+            if not quotation:
+                raise ValueError(f"Quotation with id {quotation_id} not found.")
+            if quotation.status not in CONVERTIBLE_QUOTATION_STATUSES:
+                raise ValueError(
+                    f"Quotation with status '{quotation.status.value}' cannot be converted to an order."
+                )
+
+            new_order = Order(
+                customer_id=quotation.customer_id,
+                user_id=quotation.user_id,
+                issue_date=issue_date or date.today(),
+                due_date=quotation.due_date,
+                delivery_date=delivery_date,
+                order_number=order_number,
+                status=OrderStatus.OPEN,
+                reference=quotation.quotation_number,
+                notes=quotation.notes,
+                quotation_id=quotation.id,
+                net_total=quotation.net_total,
+                tax_total=quotation.tax_total,
+                gross_total=quotation.gross_total,
+                item_count=quotation.item_count
+            )
+            self.session.add(new_order)
+            self.session.flush()
+
+            item_ids = self.session.scalars(
+                insert(OrderItem).from_select(
+                    ["order_id", "product_id", "quantity", "unit_price"],
+                    select(
+                        literal(new_order.id),
+                        QuotationItem.product_id,
+                        QuotationItem.quantity,
+                        QuotationItem.unit_price
+                    )
+                    .where(QuotationItem.quotation_id == quotation_id)
+                    .order_by(QuotationItem.id)
+                ).returning(OrderItem.id)
+            ).all()
+
+            quotation.status = QuotationStatus.ACCEPTED
+            NumberSeriesService(self.session).assign_number_if_missing(new_order, "order_number", ORDER_PREFIX)
+            record_event(self.session, "order", new_order.id, CREATED, {
+                "customer_id": new_order.customer_id, "status": new_order.status,
+                "order_number": new_order.order_number, "quotation_id": quotation_id
+            })
+            record_events(self.session, item_events("order", new_order.id, item_ids, CREATED))
+            record_event(self.session, "quotation", quotation_id, STATUS_CHANGED, {"status": quotation.status})
+            self.session.commit()
+            logger.info(f"Quotation with id {quotation_id} converted to order id {new_order.id}.")
+            return new_order
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Converting quotation with id {quotation_id} violates a constraint: {e.orig}")
+            raise_for_constraint_violation(e, {
+                ORDER_QUOTATION_KEY: f"Quotation with id {quotation_id} has already been converted to an order.",
+                ORDER_NUMBER_KEY: "Order number already in use.",
+            })
+        except (SQLAlchemyError, ValueError) as e:
+            self.session.rollback()
+            logger.error(f"Error converting quotation with id {quotation_id}: {e}")
+            raise
+
+
+    def get_all_quotations(self, status=None, customer_id=None, sort_by=None, expand=frozenset()) -> list[Quotation]:
         """
         Retrieves all quotations, optionally filtered by status or customer.
 
         Args:
             status (str, optional): Filter by status (e.g. 'DRAFT', 'SENT').
             customer_id (int, optional): Filter by customer ID.
+            sort_by (str, optional): Sort field such as 'gross_total', prefix with '-' for descending order.
+            expand (frozenset[str], optional): Relations to eager-load, see parse_expand().
 
         Returns:
             list: List of matching Quotation instances, or empty list if none found.
         """
-        stmt = select(Quotation)
+        stmt = select(Quotation).options(*document_load_options(Quotation, QuotationItem, expand))
 
         if status:
             if status.upper() not in QuotationStatus.__members__:
@@ -177,6 +368,8 @@ class QuotationService:
             self.get_customer_or_raise(customer_id)
             stmt = stmt.where(Quotation.customer_id == customer_id)
 
+        stmt = apply_sort(stmt, Quotation, sort_by)
+
         try:
             return self.session.scalars(stmt).all()
         except SQLAlchemyError as e:
@@ -202,6 +395,7 @@ class QuotationService:
 
         try:
             quotation.status = QuotationStatus[new_status.upper()]
+            record_event(self.session, "quotation", quotation_id, STATUS_CHANGED, {"status": quotation.status})
             self.session.commit()
             logger.info(f"Quotation status updated successfully for id {quotation_id}.")
         except SQLAlchemyError as e:
@@ -222,6 +416,7 @@ class QuotationService:
 
         try:
             quotation.notes = new_notes
+            record_event(self.session, "quotation", quotation_id, UPDATED, {"notes": new_notes})
             self.session.commit()
             logger.info(f"Quotation notes updated successfully for id {quotation_id}.")
         except SQLAlchemyError as e:
@@ -232,15 +427,26 @@ class QuotationService:
 
     def delete_quotation(self, quotation_id: int) -> None:
         """
-        Deletes a quotation by ID.
+        Deletes a quotation by ID with a single DELETE statement. The database removes
+        its items through ON DELETE CASCADE without loading them.
 
         Args:
             quotation_id (int): ID of the quotation to delete.
-        """
-        quotation = self.get_quotation_by_id_or_raise(quotation_id)
 
+        Raises:
+            ValueError: If the quotation does not exist.
+        """
+        stmt = (
+            delete(Quotation)
+            .where(Quotation.id == quotation_id)
+            .returning(Quotation.id)
+            .execution_options(synchronize_session=False)
+        )
         try:
-            self.session.delete(quotation)
+            if self.session.scalar(stmt) is None:
+                self.session.rollback()
+                raise ValueError(f"Quotation with id {quotation_id} not found.")
+            record_event(self.session, "quotation", quotation_id, DELETED)
             self.session.commit()
             logger.info(f"Quotation with id '{quotation_id}' deleted successfully.")
         except SQLAlchemyError as e:
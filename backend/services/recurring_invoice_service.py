@@ -0,0 +1,443 @@
+import calendar
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import select, insert, update, delete, values, column, Integer, Date, String
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from sqlalchemy.orm import selectinload
+
+from models.enums import InvoiceStatus, RecurrenceInterval
+from models.invoice import Invoice
+from models.invoice_item import InvoiceItem
+from models.recurring_invoice import RecurringInvoice
+from models.recurring_invoice_item import RecurringInvoiceItem
+from services.integrity_errors import raise_for_constraint_violation
+from services.product_service import ProductService
+from services.document_totals_service import document_totals, line_total
+from services.number_series_service import NumberSeriesService, INVOICE_PREFIX
+from services.outbox_service import record_event, record_events, item_events, CREATED, UPDATED, DELETED
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RECURRING_INVOICE_CUSTOMER_FKEY = "recurring_invoices_customer_id_fkey"
+RECURRING_INVOICE_USER_FKEY = "recurring_invoices_user_id_fkey"
+
+GENERATION_BATCH_SIZE = 1000
+
+INTERVAL_MONTHS = {
+    RecurrenceInterval.MONTHLY: 1,
+    RecurrenceInterval.QUARTERLY: 3,
+    RecurrenceInterval.YEARLY: 12,
+}
+
+
+def add_months(day: date, months: int) -> date:
+    """
+    Adds months to a date, clamping the day to the length of the target month.
+    """
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def run_date_for(start_date: date, interval: RecurrenceInterval, run_number: int) -> date:
+    """
+    Calculates the issue date of the n-th invoice of a template, counting from 0.
+
+    Dates are derived from the start date, so a template starting on the 31st
+    returns to the 31st after shorter months.
+    """
+    if interval == RecurrenceInterval.WEEKLY:
+        return start_date + timedelta(weeks=run_number)
+    return add_months(start_date, INTERVAL_MONTHS[interval] * run_number)
+
+
+class RecurringInvoiceService:
+    """
+    Service class for recurring invoice templates and the generation of their invoices.
+    """
+
+    def __init__(self, session):
+        """
+        Initializes the service with a database session.
+        """
+        self.session = session
+
+
+    def get_recurring_invoice_or_raise(self, recurring_invoice_id: int) -> RecurringInvoice:
+        """
+        Retrieves a recurring invoice with its items or raises a ValueError if not found.
+
+        Args:
+            recurring_invoice_id (int): ID of the recurring invoice.
+
+        Returns:
+            RecurringInvoice: The found template.
+        """
+        stmt = (
+            select(RecurringInvoice)
+            .options(selectinload(RecurringInvoice.items))
+            .where(RecurringInvoice.id == recurring_invoice_id)
+        )
+        recurring_invoice = self.session.scalars(stmt).first()
+
+        if not recurring_invoice:
+            raise ValueError(f"Recurring invoice with id {recurring_invoice_id} not found.")
+        return recurring_invoice
+
+
+    def get_all_recurring_invoices(
+            self,
+            customer_id: Optional[int] = None,
+            active: Optional[bool] = None
+    ) -> list[RecurringInvoice]:
+        """
+        Retrieves all recurring invoices, optionally filtered by customer or active flag.
+
+        Args:
+            customer_id (int, optional): Filter by customer ID.
+            active (bool, optional): Filter by active flag.
+
+        Returns:
+            list[RecurringInvoice]: Matching templates with their items.
+        """
+        stmt = select(RecurringInvoice).options(selectinload(RecurringInvoice.items)).order_by(RecurringInvoice.id)
+        if customer_id:
+            stmt = stmt.where(RecurringInvoice.customer_id == customer_id)
+        if active is not None:
+            stmt = stmt.where(RecurringInvoice.active == active)
+
+        try:
+            return self.session.scalars(stmt).all()
+        except SQLAlchemyError as e:
+            logger.error(f"Error retrieving recurring invoices: {e}")
+            raise
+
+
+    def create_recurring_invoice(
+            self,
+            customer_id: int,
+            user_id: int,
+            interval: str,
+            start_date: date,
+            items: list[dict],
+            payment_terms_days: Optional[int] = None,
+            notes: Optional[str] = None
+    ) -> RecurringInvoice:
+        """
+        Creates a recurring invoice template with its items.
+
+        Args:
+            customer_id (int): ID of the customer.
+            user_id (int): ID of the issuing user.
+            interval (str): Interval name, must match RecurrenceInterval.
+            start_date (date): Issue date of the first invoice.
+            items (list[dict]): Items with product_id, quantity and an optional unit_price.
+                Missing unit prices are taken from the product catalog.
+            payment_terms_days (int, optional): Days between issue and due date.
+            notes (str, optional): Notes copied to each invoice.
+
+        Returns:
+            RecurringInvoice: The created template including its items.
+
+        Raises:
+            ValueError: If a value is invalid or customer, user or a product do not exist.
+        """
+        if interval.upper() not in RecurrenceInterval.__members__:
+            raise ValueError(f"Invalid interval: {interval}")
+        if not items:
+            raise ValueError("A recurring invoice needs at least one item.")
+        if payment_terms_days is not None and payment_terms_days < 0:
+            raise ValueError("Payment terms must be zero or positive.")
+        for item in items:
+            if item["quantity"] < 0:
+                raise ValueError("Quantity must be zero or positive.")
+            if item.get("unit_price") is not None and item["unit_price"] < 0:
+                raise ValueError("Unit price must be zero or positive.")
+
+        unit_prices = ProductService(self.session).get_unit_prices_or_raise(
+            item["product_id"] for item in items
+        )
+
+        recurring_invoice = RecurringInvoice(
+            customer_id=customer_id,
+            user_id=user_id,
+            interval=RecurrenceInterval[interval.upper()],
+            start_date=start_date,
+            next_run_date=start_date,
+            run_count=0,
+            payment_terms_days=payment_terms_days,
+            notes=notes,
+            active=True,
+            items=[
+                RecurringInvoiceItem(
+                    product_id=item["product_id"],
+                    quantity=item["quantity"],
+                    unit_price=(
+                        item["unit_price"] if item.get("unit_price") is not None
+                        else unit_prices[item["product_id"]]
+                    )
+                )
+                for item in items
+            ]
+        )
+
+        try:
+            self.session.add(recurring_invoice)
+            self.session.flush()
+            record_event(self.session, "recurring_invoice", recurring_invoice.id, CREATED, {"customer_id": customer_id})
+            self.session.commit()
+            logger.info(f"Recurring invoice created successfully for customer id {customer_id}.")
+            return recurring_invoice
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.warning(f"Recurring invoice for customer id {customer_id} violates a constraint: {e.orig}")
+            raise_for_constraint_violation(e, {
+                RECURRING_INVOICE_CUSTOMER_FKEY: f"Customer with id {customer_id} not found.",
+                RECURRING_INVOICE_USER_FKEY: f"User with id {user_id} not found.",
+            })
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error creating recurring invoice: {e}")
+            raise
+
+
+    def set_active(self, recurring_invoice_id: int, active: bool) -> None:
+        """
+        Pauses or resumes a recurring invoice.
+
+        Args:
+            recurring_invoice_id (int): ID of the recurring invoice.
+            active (bool): New active flag.
+
+        Raises:
+            ValueError: If the recurring invoice does not exist.
+        """
+        recurring_invoice = self.get_recurring_invoice_or_raise(recurring_invoice_id)
+
+        try:
+            recurring_invoice.active = active
+            record_event(self.session, "recurring_invoice", recurring_invoice_id, UPDATED, {"active": active})
+            self.session.commit()
+            logger.info(f"Recurring invoice {recurring_invoice_id} set to active={active}.")
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error updating recurring invoice: {e}")
+            raise
+
+
+    def delete_recurring_invoice(self, recurring_invoice_id: int) -> None:
+        """
+        Deletes a recurring invoice with a single DELETE statement; its items are removed by
+        ON DELETE CASCADE. Generated invoices are kept.
+
+        Args:
+            recurring_invoice_id (int): ID of the recurring invoice.
+
+        Raises:
+            ValueError: If the recurring invoice does not exist.
+        """
+        stmt = (
+            delete(RecurringInvoice)
+            .where(RecurringInvoice.id == recurring_invoice_id)
+            .returning(RecurringInvoice.id)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            if self.session.scalar(stmt) is None:
+                self.session.rollback()
+                raise ValueError(f"Recurring invoice with id {recurring_invoice_id} not found.")
+            record_event(self.session, "recurring_invoice", recurring_invoice_id, DELETED)
+            self.session.commit()
+            logger.info(f"Recurring invoice {recurring_invoice_id} deleted successfully.")
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error deleting recurring invoice: {e}")
+            raise
+
+
+    def generate_due_invoices(self, run_date: Optional[date] = None, batch_size: int = GENERATION_BATCH_SIZE) -> dict:
+        """
+        Generates the invoices of all active templates whose next run date is on or before run_date.
+
+        Templates are processed in batches, each in one transaction: the invoices and their
+        items are written with one multi-row INSERT each and all templates are advanced with a
+        single UPDATE. The numbers are allocated last, as one block per year, and set with one
+        UPDATE, so the number series stays locked only until the commit. Templates that missed several
+        runs get one invoice per missed run. Templates locked by a concurrent generator are skipped.
+
+        Args:
+            run_date (date, optional): Generate everything due up to this day, defaults to today.
+            batch_size (int): Templates per transaction.
+
+        Returns:
+            dict: affected_rows (generated invoices), batches and the invoice_ids.
+        """
+        run_date = run_date or date.today()
+        invoice_ids = []
+        batches = 0
+
+        try:
+            while True:
+                stmt = (
+                    select(RecurringInvoice)
+                    .where(RecurringInvoice.active.is_(True), RecurringInvoice.next_run_date <= run_date)
+                    .order_by(RecurringInvoice.next_run_date, RecurringInvoice.id)
+                    .limit(batch_size)
+                    .with_for_update(skip_locked=True)
+                    .execution_options(populate_existing=True)
+                )
+                templates = self.session.scalars(stmt).all()
+                if not templates:
+                    self.session.commit()
+                    break
+
+                invoice_ids += self._generate_batch(templates)
+                self.session.commit()
+                batches += 1
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error generating recurring invoices: {e}")
+            raise
+
+        logger.info(f"{len(invoice_ids)} recurring invoices generated in {batches} batches for {run_date}.")
+        return {"affected_rows": len(invoice_ids), "batches": batches, "invoice_ids": invoice_ids}
+
+
+    def _generate_batch(self, templates: list[RecurringInvoice]) -> list[int]:
+        """
+        Writes one invoice per template and advances the templates. Does not commit.
+
+        Args:
+            templates (list[RecurringInvoice]): Locked templates that are due.
+
+        Returns:
+            list[int]: IDs of the created invoices, in template order.
+        """
+        template_items = defaultdict(list)
+        item_stmt = select(RecurringInvoiceItem).where(
+            RecurringInvoiceItem.recurring_invoice_id.in_([template.id for template in templates])
+        ).order_by(RecurringInvoiceItem.id)
+        for item in self.session.scalars(item_stmt):
+            template_items[item.recurring_invoice_id].append(item)
+
+        invoice_rows = []
+        for template in templates:
+            items = template_items[template.id]
+            net_total = sum((line_total(item.quantity, item.unit_price) for item in items), Decimal("0"))
+            tax_total, gross_total = document_totals(net_total)
+            issue_date = template.next_run_date
+            invoice_rows.append({
+                "customer_id": template.customer_id,
+                "user_id": template.user_id,
+                "issue_date": issue_date,
+                "due_date": (
+                    issue_date + timedelta(days=template.payment_terms_days)
+                    if template.payment_terms_days is not None else None
+                ),
+                "status": InvoiceStatus.OPEN,
+                "notes": template.notes,
+                "net_total": net_total,
+                "tax_total": tax_total,
+                "gross_total": gross_total,
+                "item_count": len(items),
+            })
+
+        invoice_ids = self.session.scalars(
+            insert(Invoice).returning(Invoice.id, sort_by_parameter_order=True), invoice_rows
+        ).all()
+
+        item_rows = [
+            {
+                "invoice_id": invoice_id,
+                "product_id": item.product_id,
+                "quantity": item.quantity,
+                "unit_price": item.unit_price,
+            }
+            for template, invoice_id in zip(templates, invoice_ids)
+            for item in template_items[template.id]
+        ]
+        created_items = []
+        if item_rows:
+            created_items = self.session.execute(
+                insert(InvoiceItem).returning(InvoiceItem.id, InvoiceItem.invoice_id, sort_by_parameter_order=True),
+                item_rows
+            ).all()
+
+        advanced = values(
+            column("id", Integer),
+            column("next_run_date", Date),
+            column("last_run_date", Date),
+            name="advanced"
+        ).data([
+            (
+                template.id,
+                run_date_for(template.start_date, template.interval, template.run_count + 1),
+                template.next_run_date
+            )
+            for template in templates
+        ])
+        self.session.execute(
+            update(RecurringInvoice)
+            .where(RecurringInvoice.id == advanced.c.id)
+            .values(
+                next_run_date=advanced.c.next_run_date,
+                last_run_date=advanced.c.last_run_date,
+                run_count=RecurringInvoice.run_count + 1
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        numbers = self._number_invoices(templates, invoice_ids)
+        events = [
+            {
+                "entity_type": "invoice", "entity_id": invoice_id, "action": CREATED,
+                "payload": {
+                    "customer_id": row["customer_id"], "status": row["status"],
+                    "invoice_number": numbers[invoice_id], "recurring_invoice_id": template.id
+                }
+            }
+            for invoice_id, row, template in zip(invoice_ids, invoice_rows, templates)
+        ]
+        for item_id, invoice_id in created_items:
+            events += item_events("invoice", invoice_id, [item_id], CREATED)
+        record_events(self.session, events)
+
+        return list(invoice_ids)
+
+
+    def _number_invoices(self, templates: list[RecurringInvoice], invoice_ids: list[int]) -> dict[int, str]:
+        """
+        Allocates one block of numbers per issue year and sets them on the generated invoices with one UPDATE.
+
+        Args:
+            templates (list[RecurringInvoice]): Templates in the order the invoices were created.
+            invoice_ids (list[int]): IDs of the generated invoices, in template order.
+
+        Returns:
+            dict[int, str]: Invoice number by invoice ID.
+        """
+        invoice_ids_by_year = defaultdict(list)
+        for template, invoice_id in zip(templates, invoice_ids):
+            invoice_ids_by_year[template.next_run_date.year].append(invoice_id)
+
+        numbers = {}
+        for year, year_invoice_ids in invoice_ids_by_year.items():
+            block = NumberSeriesService(self.session).allocate_block(INVOICE_PREFIX, year, len(year_invoice_ids))
+            numbers.update(zip(year_invoice_ids, block))
+
+        numbered = values(
+            column("id", Integer),
+            column("invoice_number", String),
+            name="numbered"
+        ).data(list(numbers.items()))
+        self.session.execute(
+            update(Invoice)
+            .where(Invoice.id == numbered.c.id)
+            .values(invoice_number=numbered.c.invoice_number)
+            .execution_options(synchronize_session=False)
+        )
+        return numbers
@@ -0,0 +1,31 @@
+from sqlalchemy import select, exists
+
+
+class ReferenceInUseError(ValueError):
+    """
+    Raised when a row cannot be deleted because other rows still reference it.
+    """
+
+
+def find_references(session, references: dict, value) -> list[str]:
+    """
+    Checks with a single query which of several foreign key columns contain a value.
+
+    Args:
+        session (Session): Database session.
+        references (dict): Labels mapped to referencing columns, e.g. {"invoices": Invoice.customer_id}.
+        value: Referenced key, e.g. a customer ID.
+
+    Returns:
+        list[str]: Labels of the columns that reference the value.
+    """
+    stmt = select(*[exists().where(column == value).label(label) for label, column in references.items()])
+    row = session.execute(stmt).one()
+    return [label for label, in_use in zip(references, row) if in_use]
+
+
+def reference_constraint_names(references: dict) -> list[str]:
+    """
+    Returns the default Postgres names of the foreign key constraints behind the referencing columns.
+    """
+    return [f"{column.table.name}_{column.name}_fkey" for column in references.values()]
@@ -0,0 +1,269 @@
+import os
+import logging
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import select, func, text, table, column, literal, Date, Integer, Numeric, String
+from sqlalchemy.exc import SQLAlchemyError
+
+from models.customer import Customer
+from models.enums import InvoiceStatus
+from models.invoice import Invoice, UNPAID_INVOICE_STATUSES
+from models.product import Product
+from models.user import User
+from services.cache import TTLCache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+REVENUE_VIEW_NAME = "invoice_revenue_daily"
+REVENUE_VIEW_LOCK_ID = 740_002
+REVENUE_VIEW_REFRESH_SECONDS = int(os.getenv("REVENUE_VIEW_REFRESH_SECONDS", "300"))
+
+REVENUE_GROUP_BY = ("customer", "product", "month", "user")
+DEFAULT_REVENUE_STATUSES = tuple(
+    status.name for status in InvoiceStatus
+    if status not in (InvoiceStatus.DRAFT, InvoiceStatus.CANCELLED)
+)
+
+# Daily pre-aggregate of invoice items, created by migration 0003_invoice_revenue_daily.
+invoice_revenue_daily = table(
+    REVENUE_VIEW_NAME,
+    column("day", Date),
+    column("customer_id", Integer),
+    column("user_id", Integer),
+    column("product_id", Integer),
+    column("status", String),
+    column("net_revenue", Numeric),
+    column("quantity", Numeric),
+    column("item_count", Integer),
+)
+
+AGING_BUCKETS = ("current", "days_1_30", "days_31_60", "days_61_90", "days_over_90")
+
+revenue_cache = TTLCache(ttl_seconds=60)
+# Keyed by the report day; entries expire quickly so payments show up within minutes.
+ar_aging_cache = TTLCache(ttl_seconds=300)
+
+
+class ReportService:
+    """
+    Service class for aggregated reports over invoices.
+
+    Revenue is read from the invoice_revenue_daily materialized view, which is refreshed
+    every REVENUE_VIEW_REFRESH_SECONDS, so the latest changes may be missing until then.
+    """
+
+    def __init__(self, session):
+        """
+        Initializes the service with a database session.
+        """
+        self.session = session
+
+
+    @staticmethod
+    def normalize_statuses(statuses: Optional[list[str]]) -> tuple[str, ...]:
+        """
+        Validates invoice status filters.
+
+        Args:
+            statuses (list[str], optional): Status names, case-insensitive.
+
+        Returns:
+            tuple[str, ...]: Sorted status names, all booked statuses if none are given.
+
+        Raises:
+            ValueError: If a status is invalid.
+        """
+        if not statuses:
+            return DEFAULT_REVENUE_STATUSES
+
+        normalized = set()
+        for status in statuses:
+            if status.upper() not in InvoiceStatus.__members__:
+                raise ValueError(f"Invalid status: {status}")
+            normalized.add(status.upper())
+        return tuple(sorted(normalized))
+
+
+    def get_revenue(
+            self,
+            group_by: str,
+            date_from: Optional[date] = None,
+            date_to: Optional[date] = None,
+            statuses: Optional[list[str]] = None
+    ) -> list[dict]:
+        """
+        Aggregates net revenue, quantity, and item count per customer, product, month, or user.
+
+        Args:
+            group_by (str): One of 'customer', 'product', 'month', 'user'.
+            date_from (date, optional): First invoice issue date to include.
+            date_to (date, optional): Last invoice issue date to include.
+            statuses (list[str], optional): Invoice statuses to include, defaults to all except DRAFT and CANCELLED.
+
+        Returns:
+            list[dict]: One row per group with key, label, net_revenue, quantity, and item_count.
+
+        Raises:
+            ValueError: If a filter is invalid.
+        """
+        if group_by not in REVENUE_GROUP_BY:
+            raise ValueError(f"Invalid group_by: {group_by}. Allowed: {', '.join(REVENUE_GROUP_BY)}.")
+        if date_from and date_to and date_from > date_to:
+            raise ValueError("date_from must not be after date_to.")
+        statuses = self.normalize_statuses(statuses)
+
+        cache_key = (group_by, date_from, date_to, statuses)
+        cached = revenue_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        stmt = self._build_revenue_query(group_by, date_from, date_to, statuses)
+        try:
+            rows = [dict(row) for row in self.session.execute(stmt).mappings()]
+        except SQLAlchemyError as e:
+            logger.error(f"Error building revenue report: {e}")
+            raise
+
+        revenue_cache.set(cache_key, rows)
+        return rows
+
+
+    @staticmethod
+    def _build_revenue_query(group_by: str, date_from, date_to, statuses):
+        """
+        Builds the GROUP BY query over the daily revenue view.
+        """
+        view = invoice_revenue_daily
+        if group_by == "month":
+            key = func.to_char(func.date_trunc("month", view.c.day), "YYYY-MM")
+        else:
+            key = view.c[f"{group_by}_id"]
+
+        sums = (
+            select(
+                key.label("key"),
+                func.sum(view.c.net_revenue).label("net_revenue"),
+                func.sum(view.c.quantity).label("quantity"),
+                func.sum(view.c.item_count).label("item_count")
+            )
+            .where(view.c.status.in_(statuses))
+            .group_by(key)
+        )
+        if date_from:
+            sums = sums.where(view.c.day >= date_from)
+        if date_to:
+            sums = sums.where(view.c.day <= date_to)
+        sums = sums.subquery()
+
+        totals = [sums.c.net_revenue, sums.c.quantity, sums.c.item_count]
+        if group_by == "month":
+            return select(sums.c.key, sums.c.key.label("label"), *totals).order_by(sums.c.key)
+
+        label_model, label = {
+            "customer": (Customer, func.coalesce(Customer.company_name, Customer.name)),
+            "product": (Product, Product.name),
+            "user": (User, User.name),
+        }[group_by]
+        return (
+            select(sums.c.key, label.label("label"), *totals)
+            .outerjoin(label_model, label_model.id == sums.c.key)
+            .order_by(sums.c.net_revenue.desc(), sums.c.key)
+        )
+
+
+    def refresh_revenue_view(self) -> bool:
+        """
+        Refreshes the daily revenue view without blocking readers and clears the local cache.
+
+        Only one process refreshes at a time, others return immediately.
+
+        Returns:
+            bool: True if the view was refreshed, False if another process is already refreshing it.
+        """
+        try:
+            acquired = self.session.scalar(
+                text("SELECT pg_try_advisory_xact_lock(:lock_id)"),
+                {"lock_id": REVENUE_VIEW_LOCK_ID}
+            )
+            if not acquired:
+                self.session.rollback()
+                return False
+
+            self.session.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {REVENUE_VIEW_NAME}"))
+            self.session.commit()
+            revenue_cache.clear()
+            logger.info(f"Materialized view '{REVENUE_VIEW_NAME}' refreshed.")
+            return True
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error refreshing materialized view '{REVENUE_VIEW_NAME}': {e}")
+            raise
+
+
+    def get_ar_aging(self, as_of: Optional[date] = None, customer_id: Optional[int] = None) -> dict:
+        """
+        Buckets the open amount of unpaid invoices per customer by days past due.
+
+        Invoices without a due date are due on their issue date. All totals come from one
+        aggregate query over the partial index on unpaid invoices.
+
+        Args:
+            as_of (date, optional): Day the ages are calculated for, defaults to today.
+            customer_id (int, optional): Restrict the report to one customer.
+
+        Returns:
+            dict: as_of, one row per customer with the buckets, total and invoice_count,
+                and the totals over all customers.
+        """
+        as_of = as_of or date.today()
+        cache_key = (as_of, customer_id)
+        cached = ar_aging_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        days_overdue = literal(as_of, Date) - func.coalesce(Invoice.due_date, Invoice.issue_date)
+        bucket_conditions = {
+            "current": days_overdue <= 0,
+            "days_1_30": days_overdue.between(1, 30),
+            "days_31_60": days_overdue.between(31, 60),
+            "days_61_90": days_overdue.between(61, 90),
+            "days_over_90": days_overdue > 90,
+        }
+        buckets = [
+            func.coalesce(func.sum(Invoice.gross_total).filter(condition), 0).label(name)
+            for name, condition in bucket_conditions.items()
+        ]
+
+        stmt = (
+            select(
+                Invoice.customer_id,
+                func.coalesce(Customer.company_name, Customer.name).label("customer_name"),
+                *buckets,
+                func.sum(Invoice.gross_total).label("total"),
+                func.count().label("invoice_count")
+            )
+            .join(Customer, Customer.id == Invoice.customer_id)
+            .where(Invoice.status.in_(UNPAID_INVOICE_STATUSES))
+            .group_by(Invoice.customer_id, Customer.company_name, Customer.name)
+            .order_by(func.sum(Invoice.gross_total).desc(), Invoice.customer_id)
+        )
+        if customer_id:
+            stmt = stmt.where(Invoice.customer_id == customer_id)
+
+        try:
+            rows = [dict(row) for row in self.session.execute(stmt).mappings()]
+        except SQLAlchemyError as e:
+            logger.error(f"Error building AR aging report: {e}")
+            raise
+
+        totals = {
+            name: sum((row[name] for row in rows), Decimal("0"))
+            for name in (*AGING_BUCKETS, "total")
+        }
+        totals["invoice_count"] = sum(row["invoice_count"] for row in rows)
+
+        report = {"as_of": as_of, "customers": rows, "totals": totals}
+        ar_aging_cache.set(cache_key, report)
+        return report
@@ -0,0 +1,29 @@
+DOCUMENT_SORT_FIELDS = ("id", "issue_date", "due_date", "net_total", "tax_total", "gross_total", "item_count")
+ITEM_SORT_FIELDS = ("id", "product_id", "quantity", "unit_price")
+
+
+def apply_sort(stmt, model, sort_by: str | None, allowed_fields=DOCUMENT_SORT_FIELDS):
+    """
+    Orders a select statement by a column given as 'field' or '-field' for descending order.
+
+    Args:
+        stmt (Select): Statement to order.
+        model: ORM model that owns the column.
+        sort_by (str | None): Sort field, optionally prefixed with '-'.
+        allowed_fields (Iterable[str]): Column names that may be sorted by.
+
+    Returns:
+        Select: The ordered statement, with the primary key as tie-breaker.
+
+    Raises:
+        ValueError: If the field is not sortable.
+    """
+    if not sort_by:
+        return stmt
+
+    field = sort_by.lstrip("-")
+    if field not in allowed_fields:
+        raise ValueError(f"Invalid sort field: {sort_by}")
+
+    column = getattr(model, field)
+    return stmt.order_by(column.desc() if sort_by.startswith("-") else column.asc(), model.id)
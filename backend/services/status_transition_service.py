@@ -0,0 +1,280 @@
+import logging
+from datetime import date
+from typing import Optional
+from sqlalchemy import select, update, any_, literal, ARRAY, Integer
+from sqlalchemy.exc import SQLAlchemyError
+
+from models.enums import InvoiceStatus, OrderStatus, QuotationStatus
+from models.invoice import Invoice
+from models.order import Order
+from models.quotation import Quotation
+from services.outbox_service import record_events, STATUS_CHANGED
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TRANSITION_BATCH_SIZE = 500
+
+OVERDUE_FROM_STATUSES = (InvoiceStatus.OPEN, InvoiceStatus.SENT)
+EXPIRED_FROM_STATUSES = (QuotationStatus.DRAFT, QuotationStatus.SENT)
+
+# Allowed manual transitions: current status mapped to the statuses it may change to.
+INVOICE_TRANSITIONS = {
+    InvoiceStatus.DRAFT: (InvoiceStatus.OPEN, InvoiceStatus.SENT, InvoiceStatus.CANCELLED),
+    InvoiceStatus.OPEN: (InvoiceStatus.SENT, InvoiceStatus.PAID, InvoiceStatus.OVERDUE, InvoiceStatus.CANCELLED),
+    InvoiceStatus.SENT: (InvoiceStatus.PAID, InvoiceStatus.OVERDUE, InvoiceStatus.CANCELLED),
+    InvoiceStatus.OVERDUE: (InvoiceStatus.PAID, InvoiceStatus.CANCELLED),
+    InvoiceStatus.PAID: (),
+    InvoiceStatus.CANCELLED: (),
+}
+ORDER_TRANSITIONS = {
+    OrderStatus.DRAFT: (OrderStatus.OPEN, OrderStatus.IN_PROGRESS, OrderStatus.CANCELLED),
+    OrderStatus.OPEN: (OrderStatus.IN_PROGRESS, OrderStatus.SHIPPED, OrderStatus.COMPLETED, OrderStatus.CANCELLED),
+    OrderStatus.IN_PROGRESS: (OrderStatus.SHIPPED, OrderStatus.COMPLETED, OrderStatus.CANCELLED),
+    OrderStatus.SHIPPED: (OrderStatus.COMPLETED,),
+    OrderStatus.COMPLETED: (),
+    OrderStatus.CANCELLED: (),
+}
+QUOTATION_TRANSITIONS = {
+    QuotationStatus.DRAFT: (QuotationStatus.SENT, QuotationStatus.REJECTED, QuotationStatus.EXPIRED),
+    QuotationStatus.SENT: (QuotationStatus.ACCEPTED, QuotationStatus.REJECTED, QuotationStatus.EXPIRED),
+    QuotationStatus.ACCEPTED: (),
+    QuotationStatus.REJECTED: (),
+    QuotationStatus.EXPIRED: (),
+}
+
+# Entity type mapped to model, status enum and allowed transitions.
+BATCH_DOCUMENTS = {
+    "invoice": (Invoice, InvoiceStatus, INVOICE_TRANSITIONS),
+    "order": (Order, OrderStatus, ORDER_TRANSITIONS),
+    "quotation": (Quotation, QuotationStatus, QUOTATION_TRANSITIONS),
+}
+STATUS_BATCH_MAX_DOCUMENTS = 1000
+
+UPDATED_RESULT = "updated"
+UNCHANGED_RESULT = "unchanged"
+INVALID_TRANSITION_RESULT = "invalid_transition"
+NOT_FOUND_RESULT = "not_found"
+
+
+class StatusTransitionService:
+    """
+    Service class for date-driven status transitions of invoices and quotations.
+
+    Transitions run as set-based UPDATEs in small committed batches, so row locks are
+    only held for one batch and rows locked by users are skipped until the next run.
+    Manual bulk transitions of selected documents are checked against the transition maps.
+    """
+
+    def __init__(self, session):
+        """
+        Initializes the service with a database session.
+        """
+        self.session = session
+
+
+    def _transition_in_batches(self, model, from_statuses, new_status, today: date, batch_size: int) -> dict:
+        """
+        Sets new_status on all documents whose due date lies before today and whose status is in from_statuses.
+
+        Args:
+            model: Invoice or Quotation.
+            from_statuses (tuple): Statuses that are transitioned.
+            new_status: Target status.
+            today (date): Reference day, documents due before it are transitioned.
+            batch_size (int): Maximum rows per UPDATE and commit.
+
+        Returns:
+            dict: affected_rows and batches.
+        """
+        batch_ids = (
+            select(model.id)
+            .where(model.due_date < today, model.status.in_(from_statuses))
+            .order_by(model.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(model)
+            .where(model.id.in_(batch_ids))
+            .values(status=new_status)
+            .returning(model.id)
+            .execution_options(synchronize_session=False)
+        )
+        entity_type = model.__name__.lower()
+
+        affected_rows = 0
+        batches = 0
+        try:
+            while True:
+                changed_ids = self.session.scalars(stmt).all()
+                record_events(self.session, [
+                    {
+                        "entity_type": entity_type, "entity_id": document_id,
+                        "action": STATUS_CHANGED, "payload": {"status": new_status}
+                    }
+                    for document_id in changed_ids
+                ])
+                self.session.commit()
+                count = len(changed_ids)
+                if count == 0:
+                    break
+                affected_rows += count
+                batches += 1
+                if count < batch_size:
+                    break
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error setting {model.__tablename__} to {new_status.name}: {e}")
+            raise
+
+        logger.info(
+            f"{affected_rows} {model.__tablename__} set to {new_status.name} in {batches} batches."
+        )
+        return {"affected_rows": affected_rows, "batches": batches}
+
+
+    def mark_overdue_invoices(self, today: Optional[date] = None, batch_size: int = TRANSITION_BATCH_SIZE) -> dict:
+        """
+        Marks OPEN and SENT invoices whose due date has passed as OVERDUE.
+
+        Args:
+            today (date, optional): Reference day, defaults to today.
+            batch_size (int): Maximum rows per batch.
+
+        Returns:
+            dict: affected_rows and batches.
+        """
+        return self._transition_in_batches(
+            Invoice, OVERDUE_FROM_STATUSES, InvoiceStatus.OVERDUE, today or date.today(), batch_size
+        )
+
+
+    def expire_quotations(self, today: Optional[date] = None, batch_size: int = TRANSITION_BATCH_SIZE) -> dict:
+        """
+        Marks DRAFT and SENT quotations whose validity date has passed as EXPIRED.
+
+        Args:
+            today (date, optional): Reference day, defaults to today.
+            batch_size (int): Maximum rows per batch.
+
+        Returns:
+            dict: affected_rows and batches.
+        """
+        return self._transition_in_batches(
+            Quotation, EXPIRED_FROM_STATUSES, QuotationStatus.EXPIRED, today or date.today(), batch_size
+        )
+
+
+    def transition_batch(
+            self,
+            entity_type: str,
+            new_status: str,
+            ids: Optional[list[int]] = None,
+            filters: Optional[dict] = None
+    ) -> dict:
+        """
+        Sets a new status on many invoices, orders or quotations with one UPDATE.
+
+        The documents are given as an ID list or selected with filters. Only documents whose
+        current status may change to new_status are updated; the check is part of the UPDATE's
+        WHERE clause, so it also holds against concurrent changes. All changes are committed together.
+
+        Args:
+            entity_type (str): 'invoice', 'order' or 'quotation'.
+            new_status (str): Target status name, case-insensitive.
+            ids (list[int], optional): Documents to transition.
+            filters (dict, optional): status, customer_id, issue_date_from and issue_date_to
+                selecting the documents instead of ids.
+
+        Returns:
+            dict: status, updated (count) and results, one per document with id, result
+                (updated, unchanged, invalid_transition or not_found) and its current status.
+
+        Raises:
+            ValueError: If the status or a filter is invalid, neither or both of ids and filters
+                are given, or more than STATUS_BATCH_MAX_DOCUMENTS documents are selected.
+        """
+        model, status_enum, transitions = BATCH_DOCUMENTS[entity_type]
+        target = self._parse_status(status_enum, new_status)
+
+        if (ids is None) == (filters is None):
+            raise ValueError("Provide either ids or a filter.")
+        if ids is None:
+            ids = self._select_ids(model, status_enum, filters)
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > STATUS_BATCH_MAX_DOCUMENTS:
+            raise ValueError(f"At most {STATUS_BATCH_MAX_DOCUMENTS} documents can be changed at once.")
+
+        allowed_from = [status for status, targets in transitions.items() if target in targets]
+        stmt = (
+            update(model)
+            .where(model.id == any_(literal(ids, ARRAY(Integer))), model.status.in_(allowed_from))
+            .values(status=target)
+            .returning(model.id)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            updated_ids = set(self.session.scalars(stmt).all()) if ids and allowed_from else set()
+            remaining_ids = [document_id for document_id in ids if document_id not in updated_ids]
+            current = dict(
+                self.session.execute(select(model.id, model.status).where(model.id == any_(literal(remaining_ids, ARRAY(Integer))))).all()
+            ) if remaining_ids else {}
+            record_events(self.session, [
+                {
+                    "entity_type": entity_type, "entity_id": document_id,
+                    "action": STATUS_CHANGED, "payload": {"status": target}
+                }
+                for document_id in ids if document_id in updated_ids
+            ])
+            self.session.commit()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error setting {model.__tablename__} to {target.name}: {e}")
+            raise
+
+        results = []
+        for document_id in ids:
+            if document_id in updated_ids:
+                results.append({"id": document_id, "result": UPDATED_RESULT, "status": target.value})
+            elif document_id not in current:
+                results.append({"id": document_id, "result": NOT_FOUND_RESULT, "status": None})
+            else:
+                result = UNCHANGED_RESULT if current[document_id] == target else INVALID_TRANSITION_RESULT
+                results.append({"id": document_id, "result": result, "status": current[document_id].value})
+
+        logger.info(f"{len(updated_ids)} of {len(ids)} {model.__tablename__} set to {target.name}.")
+        return {"status": target.value, "updated": len(updated_ids), "results": results}
+
+
+    @staticmethod
+    def _parse_status(status_enum, status: str):
+        """
+        Converts a status name such as 'paid' or 'PAID' into the enum member.
+        """
+        if not status or status.upper() not in status_enum.__members__:
+            raise ValueError(f"Invalid status: {status}")
+        return status_enum[status.upper()]
+
+
+    def _select_ids(self, model, status_enum, filters: dict) -> list[int]:
+        """
+        Resolves a batch filter into document IDs, rejecting filters that select too many documents.
+        """
+        stmt = select(model.id).order_by(model.id).limit(STATUS_BATCH_MAX_DOCUMENTS + 1)
+        if filters.get("status"):
+            stmt = stmt.where(model.status == self._parse_status(status_enum, filters["status"]))
+        if filters.get("customer_id") is not None:
+            stmt = stmt.where(model.customer_id == filters["customer_id"])
+        if filters.get("issue_date_from"):
+            stmt = stmt.where(model.issue_date >= filters["issue_date_from"])
+        if filters.get("issue_date_to"):
+            stmt = stmt.where(model.issue_date <= filters["issue_date_to"])
+
+        ids = self.session.scalars(stmt).all()
+        if len(ids) > STATUS_BATCH_MAX_DOCUMENTS:
+            raise ValueError(
+                f"The filter selects more than {STATUS_BATCH_MAX_DOCUMENTS} documents, please narrow it."
+            )
+        return ids
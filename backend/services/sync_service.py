@@ -0,0 +1,175 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, tuple_, inspect
+from sqlalchemy.exc import SQLAlchemyError
+
+from models.customer import Customer
+from models.product import Product
+from models.invoice import Invoice
+from models.invoice_item import InvoiceItem
+from models.order import Order
+from models.order_item import OrderItem
+from models.quotation import Quotation
+from models.quotation_item import QuotationItem
+from models.outbox_event import OutboxEvent
+from services.outbox_service import OLDEST_RUNNING_TXID, OUTBOX_RETENTION_DAYS, decode_cursor, encode_cursor
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Outbox entity types mapped to the synced tables.
+SYNC_ENTITIES = {
+    "customer": Customer,
+    "product": Product,
+    "invoice": Invoice,
+    "invoice_item": InvoiceItem,
+    "order": Order,
+    "order_item": OrderItem,
+    "quotation": Quotation,
+    "quotation_item": QuotationItem,
+}
+SYNC_MAX_EVENTS = 5000
+# One day less than the outbox retention, so no event after a valid token can have been pruned.
+SYNC_TOKEN_MAX_AGE = timedelta(days=OUTBOX_RETENTION_DAYS - 1)
+
+
+def encode_sync_token(cursor: tuple[int, int], issued_at: datetime) -> str:
+    """
+    Encodes an outbox cursor and the time it was handed out as a sync token.
+    """
+    return f"{encode_cursor(*cursor)}-{int(issued_at.timestamp())}"
+
+
+def decode_sync_token(token: str) -> tuple[tuple[int, int], datetime]:
+    """
+    Decodes a token created by encode_sync_token.
+
+    Raises:
+        ValueError: If the token is malformed.
+    """
+    try:
+        cursor, issued_at = token.rsplit("-", 1)
+        return decode_cursor(cursor), datetime.fromtimestamp(int(issued_at))
+    except ValueError:
+        raise ValueError(f"Invalid sync token: {token}")
+
+
+class SyncService:
+    """
+    Service class for delta synchronization of customers, products, documents and items.
+
+    Changes are read from the outbox in commit order, so a client that always continues with
+    next_token never misses a change. Deleted rows are reported as tombstones. A deleted document
+    is a single tombstone: its items are removed by the cascading DELETE without events of their
+    own, so replicas drop the items whose invoice_id, order_id or quotation_id is listed as deleted.
+    Tokens older than SYNC_TOKEN_MAX_AGE, or no token at all, yield a full snapshot with reset set.
+    """
+
+    def __init__(self, session):
+        """
+        Initializes the service with a database session.
+        """
+        self.session = session
+
+
+    def get_changes_since(self, token: Optional[str] = None) -> dict:
+        """
+        Retrieves all rows changed or deleted since a sync token.
+
+        Args:
+            token (str, optional): next_token of the previous sync.
+
+        Returns:
+            dict: reset, changes (table name to rows), deleted (table name to IDs),
+                next_token and has_more. If has_more is set, call again with next_token.
+
+        Raises:
+            ValueError: If the token is malformed.
+        """
+        now = datetime.now()
+        if token:
+            cursor, issued_at = decode_sync_token(token)
+            if now - issued_at <= SYNC_TOKEN_MAX_AGE:
+                return self._get_delta(cursor, now)
+            logger.info("Sync token expired, sending a full snapshot.")
+        return self._get_snapshot(now)
+
+
+    def _get_delta(self, cursor: tuple[int, int], now: datetime) -> dict:
+        """
+        Loads the current state of every entity with an outbox event after the cursor.
+        """
+        stmt = (
+            select(OutboxEvent.txid, OutboxEvent.id, OutboxEvent.entity_type, OutboxEvent.entity_id)
+            .where(OutboxEvent.txid < OLDEST_RUNNING_TXID)
+            .where(tuple_(OutboxEvent.txid, OutboxEvent.id) > tuple_(*cursor))
+            .where(OutboxEvent.entity_type.in_(SYNC_ENTITIES))
+            .order_by(OutboxEvent.txid, OutboxEvent.id)
+            .limit(SYNC_MAX_EVENTS)
+        )
+        try:
+            events = self.session.execute(stmt).all()
+
+            changed_ids = {entity_type: set() for entity_type in SYNC_ENTITIES}
+            for _, _, entity_type, entity_id in events:
+                changed_ids[entity_type].add(entity_id)
+
+            # Rows are read after the events, so they include at least every change up to the new cursor.
+            changes, deleted = {}, {}
+            for entity_type, ids in changed_ids.items():
+                model = SYNC_ENTITIES[entity_type]
+                rows = self._load_rows(model, ids) if ids else []
+                changes[model.__tablename__] = rows
+                deleted[model.__tablename__] = sorted(ids - {row["id"] for row in rows})
+        except SQLAlchemyError as e:
+            logger.error(f"Error loading sync changes: {e}")
+            raise
+
+        next_cursor = (events[-1].txid, events[-1].id) if events else cursor
+        return {
+            "reset": False,
+            "changes": changes,
+            "deleted": deleted,
+            "next_token": encode_sync_token(next_cursor, now),
+            "has_more": len(events) == SYNC_MAX_EVENTS,
+        }
+
+
+    def _get_snapshot(self, now: datetime) -> dict:
+        """
+        Loads all synced rows together with a token for the following delta syncs.
+        """
+        last_event = (
+            select(OutboxEvent.txid, OutboxEvent.id)
+            .where(OutboxEvent.txid < OLDEST_RUNNING_TXID)
+            .order_by(OutboxEvent.txid.desc(), OutboxEvent.id.desc())
+            .limit(1)
+        )
+        try:
+            # The cursor is taken first: every event up to it is committed and visible to the reads below.
+            cursor = tuple(self.session.execute(last_event).first() or (0, 0))
+            changes = {model.__tablename__: self._load_rows(model) for model in SYNC_ENTITIES.values()}
+        except SQLAlchemyError as e:
+            logger.error(f"Error loading sync snapshot: {e}")
+            raise
+
+        return {
+            "reset": True,
+            "changes": changes,
+            "deleted": {model.__tablename__: [] for model in SYNC_ENTITIES.values()},
+            "next_token": encode_sync_token(cursor, now),
+            "has_more": False,
+        }
+
+
+    def _load_rows(self, model, ids: Optional[set[int]] = None) -> list[dict]:
+        """
+        Reads the columns of a table as plain dicts, optionally restricted to some IDs.
+        Deferred columns such as search vectors are left out.
+        """
+        columns = [attribute.columns[0] for attribute in inspect(model).column_attrs if not attribute.deferred]
+        stmt = select(*columns).order_by(model.id)
+        if ids is not None:
+            stmt = stmt.where(model.id.in_(ids))
+        return [dict(row) for row in self.session.execute(stmt).mappings()]
@@ -0,0 +1,14 @@
+import os
+import sys
+import pkgutil
+import importlib
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import models
+
+# Relationships refer to each other by class name, so every model must be mapped before a query is built.
+for module in pkgutil.iter_modules(models.__path__):
+    importlib.import_module(f"models.{module.name}")
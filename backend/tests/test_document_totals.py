@@ -0,0 +1,64 @@
+from decimal import Decimal
+
+import pytest
+from pydantic import ValidationError
+
+from services.document_totals_service import line_total, document_totals
+from schemas.invoice_item_schemas import InvoiceItemCreateSchema
+
+
+@pytest.mark.parametrize("quantity, unit_price, expected", [
+    (Decimal("1"), Decimal("19.99"), Decimal("19.99")),
+    (Decimal("3"), Decimal("0.10"), Decimal("0.30")),
+    (Decimal("0.5"), Decimal("0.25"), Decimal("0.13")),
+    (Decimal("2.5"), Decimal("0.05"), Decimal("0.13")),
+    (Decimal("0.125"), Decimal("1.00"), Decimal("0.13")),
+    (Decimal("0.001"), Decimal("4.99"), Decimal("0.00")),
+    (Decimal("0"), Decimal("12.00"), Decimal("0.00")),
+])
+def test_line_total_rounds_half_up_to_cents(quantity, unit_price, expected):
+    assert line_total(quantity, unit_price) == expected
+
+
+def test_line_total_converts_floats_without_binary_error():
+    assert line_total(3, 0.1) == Decimal("0.30")
+    assert line_total(1.005, 1) == Decimal("1.01")
+
+
+@pytest.mark.parametrize("net_total, tax_total, gross_total", [
+    (Decimal("10.00"), Decimal("1.90"), Decimal("11.90")),
+    (Decimal("0.05"), Decimal("0.01"), Decimal("0.06")),
+    (Decimal("0.02"), Decimal("0.00"), Decimal("0.02")),
+    (Decimal("12.50"), Decimal("2.38"), Decimal("14.88")),
+    (Decimal("0"), Decimal("0.00"), Decimal("0.00")),
+])
+def test_document_totals_rounds_vat_half_up(net_total, tax_total, gross_total):
+    assert document_totals(net_total) == (tax_total, gross_total)
+
+
+def test_document_total_is_sum_of_rounded_lines():
+    lines = [(Decimal("0.5"), Decimal("0.25")), (Decimal("0.5"), Decimal("0.25"))]
+    net_total = sum((line_total(quantity, unit_price) for quantity, unit_price in lines), Decimal("0"))
+
+    assert net_total == Decimal("0.26")
+    assert document_totals(net_total) == (Decimal("0.05"), Decimal("0.31"))
+
+
+def test_item_schema_rejects_more_decimals_than_stored():
+    with pytest.raises(ValidationError):
+        InvoiceItemCreateSchema(invoice_id=1, product_id=1, quantity=Decimal("1"), unit_price=Decimal("1.005"))
+    with pytest.raises(ValidationError):
+        InvoiceItemCreateSchema(invoice_id=1, product_id=1, quantity=Decimal("0.0005"), unit_price=Decimal("1"))
+
+
+def test_item_schema_rejects_negative_amounts():
+    with pytest.raises(ValidationError):
+        InvoiceItemCreateSchema(invoice_id=1, product_id=1, quantity=Decimal("-1"), unit_price=Decimal("1"))
+
+
+def test_item_schema_keeps_exact_decimals():
+    item = InvoiceItemCreateSchema(invoice_id=1, product_id=1, quantity="1.125", unit_price="0.10")
+
+    assert item.quantity == Decimal("1.125")
+    assert item.unit_price == Decimal("0.10")
+
@@ -0,0 +1,147 @@
+import io
+import re
+import csv
+from types import SimpleNamespace
+
+import pytest
+
+import services.import_service as import_service
+from services.import_service import (
+    ImportService,
+    _staging_table,
+    format_error_report,
+    CUSTOMER_IMPORT_COLUMNS,
+    CUSTOMER_REQUIRED_COLUMNS,
+    PRODUCT_IMPORT_COLUMNS,
+    PRODUCT_REQUIRED_COLUMNS,
+    EMAIL_PATTERN,
+    PRICE_PATTERN,
+)
+
+
+class FakeCursor:
+    """
+    Collects the rows streamed with COPY instead of sending them to Postgres.
+    """
+
+    def __init__(self):
+        self.copies = []
+        self.closed = False
+
+    def copy_expert(self, sql, file):
+        self.copies.append((sql, list(csv.reader(io.StringIO(file.read())))))
+
+    def close(self):
+        self.closed = True
+
+
+def copy_csv(text, table="product_import", columns=PRODUCT_IMPORT_COLUMNS, required=PRODUCT_REQUIRED_COLUMNS, encoding="utf-8"):
+    cursor = FakeCursor()
+    connection = SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cursor))
+    total_rows = ImportService._copy_csv(
+        connection, io.BytesIO(text.encode(encoding)), _staging_table(table, columns), required
+    )
+    return total_rows, cursor
+
+
+def test_copy_csv_maps_header_columns_and_keeps_line_numbers():
+    total_rows, cursor = copy_csv(
+        "Unit_Price, NAME ,unit\n"
+        "9.99,Cable,m\n"
+        "\n"
+        ",, \n"
+        " 12.50 , Plug ,\n"
+    )
+
+    assert total_rows == 2
+    assert cursor.closed
+    [(sql, rows)] = cursor.copies
+    assert sql == "COPY product_import (line, name, description, unit_price, unit) FROM STDIN WITH (FORMAT csv)"
+    # Blank values are written as empty fields, which COPY loads as NULL.
+    assert rows == [["2", "Cable", "", "9.99", "m"], ["5", "Plug", "", "12.50", ""]]
+
+
+def test_copy_csv_streams_in_chunks(monkeypatch):
+    monkeypatch.setattr(import_service, "IMPORT_CHUNK_ROWS", 2)
+
+    total_rows, cursor = copy_csv("name,unit_price,unit\n" + "".join(f"P{i},1,kg\n" for i in range(5)))
+
+    assert total_rows == 5
+    assert [len(rows) for _, rows in cursor.copies] == [2, 2, 1]
+    assert [row[0] for _, rows in cursor.copies for row in rows] == ["2", "3", "4", "5", "6"]
+
+
+def test_copy_csv_strips_byte_order_mark():
+    total_rows, cursor = copy_csv("\ufeffname,unit_price,unit\nCable,1,m\n")
+
+    assert total_rows == 1
+    assert cursor.copies[0][1] == [["2", "Cable", "", "1", "m"]]
+
+
+def test_copy_csv_rejects_unknown_columns():
+    with pytest.raises(ValueError, match="Unknown columns: price"):
+        copy_csv("name,price,unit_price,unit\nCable,1,1,m\n")
+
+
+def test_copy_csv_rejects_empty_file():
+    with pytest.raises(ValueError, match="Invalid CSV header"):
+        copy_csv("")
+
+
+@pytest.mark.parametrize("header, missing", [
+    ("name,unit", "unit_price"),
+    ("description", "name, unit_price, unit"),
+])
+def test_copy_csv_rejects_missing_product_columns(header, missing):
+    with pytest.raises(ValueError, match=f"Missing required columns: {missing}\\."):
+        copy_csv(f"{header}\n")
+
+
+@pytest.mark.parametrize("header, missing", [
+    ("email,phone", "name or company_name"),
+    ("company_name", "email"),
+])
+def test_copy_csv_rejects_missing_customer_columns(header, missing):
+    with pytest.raises(ValueError, match=f"Missing required columns: {missing}\\."):
+        copy_csv(f"{header}\n", "customer_import", CUSTOMER_IMPORT_COLUMNS, CUSTOMER_REQUIRED_COLUMNS)
+
+
+def test_copy_csv_accepts_either_customer_name_column():
+    total_rows, _ = copy_csv(
+        "email,company_name\na@example.com,ACME\n", "customer_import", CUSTOMER_IMPORT_COLUMNS, CUSTOMER_REQUIRED_COLUMNS
+    )
+
+    assert total_rows == 1
+
+
+def test_copy_csv_rejects_other_encodings():
+    with pytest.raises(ValueError, match="UTF-8"):
+        copy_csv("name,unit_price,unit\nKäse,1,kg\n", encoding="latin-1")
+
+
+@pytest.mark.parametrize("price, valid", [
+    ("0", True),
+    ("12.5", True),
+    ("9999999999.99", True),
+    ("1.005", False),
+    ("12345678901", False),
+    ("1,50", False),
+])
+def test_price_pattern_matches_the_column_precision(price, valid):
+    assert bool(re.match(PRICE_PATTERN, price)) is valid
+
+
+@pytest.mark.parametrize("email, valid", [
+    ("max.mustermann@example.com", True),
+    ("info@sub.example.de", True),
+    ("no-at-sign.example.com", False),
+    ("missing@tld", False),
+])
+def test_email_pattern(email, valid):
+    assert bool(re.match(EMAIL_PATTERN, email)) is valid
+
+
+def test_format_error_report():
+    report = format_error_report([{"line": 3, "message": "Invalid unit: box"}, {"line": 7, "message": "name is required."}])
+
+    assert report.splitlines() == ["line,message", "3,Invalid unit: box", "7,name is required."]
@@ -0,0 +1,150 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import Insert, Update
+
+import services.product_service as product_service
+from models.enums import UnitType
+from services.product_service import ProductService
+
+
+class FakeResult:
+    def __init__(self, rows=(), rowcount=0):
+        self.rows = list(rows)
+        self.rowcount = rowcount
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """
+    Answers the product UPDATE with the repriced products and the item UPDATEs with the
+    configured item rows, and records the item UPDATEs, outbox inserts and the outcome.
+    Other statements, such as pg_notify, return nothing.
+    """
+
+    def __init__(self, products, items=None):
+        self.products = products
+        self.items = items or {}
+        self.item_updates = {}
+        self.inserted = []
+        self.committed = False
+        self.rolled_back = False
+
+    def execute(self, stmt, params=None):
+        if isinstance(stmt, Insert):
+            self.inserted += params
+            return FakeResult()
+        if not isinstance(stmt, Update):
+            return FakeResult()
+        table_name = stmt.table.name
+        if table_name == "products":
+            return FakeResult(self.products)
+        if table_name in ("order_items", "quotation_items"):
+            self.item_updates[table_name] = stmt
+            return FakeResult(self.items.get(table_name, []))
+        return FakeResult(rowcount=1)
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+@pytest.fixture
+def indexed(monkeypatch):
+    entries = []
+    monkeypatch.setattr(product_service, "product_index", SimpleNamespace(upsert_many=entries.extend))
+    return entries
+
+
+def product_row(product_id, old_unit_price, unit_price):
+    return SimpleNamespace(
+        id=product_id, name=f"Product {product_id}", description=None, unit=UnitType.PIECE,
+        old_unit_price=Decimal(old_unit_price), unit_price=Decimal(unit_price)
+    )
+
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({"mode": "double", "value": Decimal("2"), "ids": [1]}, "Invalid mode"),
+    ({"mode": "set", "value": Decimal("-1"), "ids": [1]}, "zero or positive"),
+    ({"mode": "percent", "value": Decimal("10")}, "Select products"),
+    ({"mode": "set", "value": Decimal("1"), "unit": "parsec"}, "Invalid unit"),
+])
+def test_reprice_rejects_invalid_requests(kwargs, message):
+    session = FakeSession([])
+
+    with pytest.raises(ValueError, match=message):
+        ProductService(session).reprice_products(**kwargs)
+    assert not session.committed
+
+
+def test_reprice_reports_old_and_new_prices_and_records_events(indexed):
+    session = FakeSession([product_row(2, "5.00", "5.50"), product_row(1, "2.50", "2.75")])
+
+    result = ProductService(session).reprice_products("percent", Decimal("10"), ids=[1, 2])
+
+    assert result["updated_products"] == 2
+    assert [(row["id"], row["old_unit_price"], row["new_unit_price"]) for row in result["products"]] == [
+        (1, Decimal("2.50"), Decimal("2.75")),
+        (2, Decimal("5.00"), Decimal("5.50")),
+    ]
+    assert result["updated_order_items"] == 0 and result["updated_quotation_items"] == 0
+    assert session.item_updates == {}
+    assert [(event["entity_type"], event["entity_id"]) for event in session.inserted] == [("product", 1), ("product", 2)]
+    assert session.committed
+    assert [entry["id"] for entry in indexed] == [1, 2]
+
+
+def test_reprice_dry_run_rolls_back_everything(indexed):
+    session = FakeSession(
+        [product_row(1, "2.50", "3.00")],
+        items={"order_items": [SimpleNamespace(id=10, document_id=7, unit_price=Decimal("3.00"))]},
+    )
+
+    result = ProductService(session).reprice_products(
+        "set", Decimal("3.00"), ids=[1], update_open_documents=True, dry_run=True
+    )
+
+    assert result["dry_run"] is True
+    assert result["updated_order_items"] == 1
+    assert result["updated_orders"] == 1
+    assert session.rolled_back and not session.committed
+    assert session.inserted == []
+    assert indexed == []
+
+
+def test_reprice_rejects_negative_results():
+    session = FakeSession([product_row(1, "2.50", "-0.50")])
+
+    with pytest.raises(ValueError, match="1 prices negative"):
+        ProductService(session).reprice_products("amount", Decimal("-3"), ids=[1])
+    assert session.rolled_back and not session.committed
+
+
+def test_reprice_only_touches_items_at_the_old_catalog_price(indexed):
+    session = FakeSession(
+        [product_row(1, "2.50", "3.00")],
+        items={
+            "order_items": [SimpleNamespace(id=10, document_id=7, unit_price=Decimal("3.00"))],
+            "quotation_items": [
+                SimpleNamespace(id=20, document_id=8, unit_price=Decimal("3.00")),
+                SimpleNamespace(id=21, document_id=8, unit_price=Decimal("3.00")),
+            ],
+        },
+    )
+
+    result = ProductService(session).reprice_products("set", Decimal("3.00"), ids=[1], update_open_documents=True)
+
+    compiled = session.item_updates["order_items"].compile(dialect=postgresql.dialect())
+    assert "order_items.unit_price = old_prices.unit_price" in str(compiled)
+    assert "products.unit_price != old_prices.unit_price" in str(compiled)
+    assert Decimal("2.50") in compiled.params.values()
+    assert result["updated_order_items"] == 1 and result["updated_orders"] == 1
+    assert result["updated_quotation_items"] == 2 and result["updated_quotations"] == 1
+    assert ("quotation_item", 21) in [(event["entity_type"], event["entity_id"]) for event in session.inserted]
+    assert ("quotation", 8) in [(event["entity_type"], event["entity_id"]) for event in session.inserted]
@@ -0,0 +1,134 @@
+import pytest
+from sqlalchemy.sql import Insert, Select, Update
+
+from models.enums import InvoiceStatus, OrderStatus, QuotationStatus
+from services.status_transition_service import (
+    StatusTransitionService,
+    INVOICE_TRANSITIONS,
+    ORDER_TRANSITIONS,
+    QUOTATION_TRANSITIONS,
+    STATUS_BATCH_MAX_DOCUMENTS,
+    UPDATED_RESULT,
+    UNCHANGED_RESULT,
+    INVALID_TRANSITION_RESULT,
+    NOT_FOUND_RESULT,
+)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """
+    Answers the UPDATE ... RETURNING with the IDs that would be updated and the status SELECT
+    with the current statuses, and records everything else that is executed.
+    """
+
+    def __init__(self, updated_ids=(), current=None):
+        self.updated_ids = list(updated_ids)
+        self.current = current or {}
+        self.updates = []
+        self.inserted = []
+        self.committed = False
+
+    def scalars(self, stmt):
+        assert isinstance(stmt, Update)
+        self.updates.append(stmt)
+        return FakeResult(self.updated_ids)
+
+    def execute(self, stmt, params=None):
+        if isinstance(stmt, Insert):
+            assert stmt.table.name == "outbox_events"
+            self.inserted += params
+        elif isinstance(stmt, Select) and stmt.selected_columns[0].name == "id":
+            return FakeResult(list(self.current.items()))
+        return FakeResult([])
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+
+@pytest.mark.parametrize("transitions, status_enum", [
+    (INVOICE_TRANSITIONS, InvoiceStatus),
+    (ORDER_TRANSITIONS, OrderStatus),
+    (QUOTATION_TRANSITIONS, QuotationStatus),
+])
+def test_transition_maps_cover_every_status(transitions, status_enum):
+    assert set(transitions) == set(status_enum)
+    for status, targets in transitions.items():
+        assert status not in targets
+        assert set(targets) <= set(status_enum)
+
+
+def test_paid_and_cancelled_invoices_are_final():
+    assert INVOICE_TRANSITIONS[InvoiceStatus.PAID] == ()
+    assert INVOICE_TRANSITIONS[InvoiceStatus.CANCELLED] == ()
+
+
+def test_transition_batch_reports_each_document():
+    session = FakeSession(
+        updated_ids=[1],
+        current={2: InvoiceStatus.PAID, 3: InvoiceStatus.DRAFT},
+    )
+
+    result = StatusTransitionService(session).transition_batch("invoice", "paid", ids=[1, 2, 3, 4])
+
+    assert result["status"] == "paid"
+    assert result["updated"] == 1
+    assert result["results"] == [
+        {"id": 1, "result": UPDATED_RESULT, "status": "paid"},
+        {"id": 2, "result": UNCHANGED_RESULT, "status": "paid"},
+        {"id": 3, "result": INVALID_TRANSITION_RESULT, "status": "draft"},
+        {"id": 4, "result": NOT_FOUND_RESULT, "status": None},
+    ]
+    assert session.committed
+
+
+def test_transition_batch_checks_the_map_in_the_update():
+    session = FakeSession(updated_ids=[1])
+
+    StatusTransitionService(session).transition_batch("invoice", "PAID", ids=[1])
+
+    params = session.updates[0].compile().params
+    allowed_from = next(value for value in params.values() if isinstance(value, list) and InvoiceStatus.OPEN in value)
+    assert set(allowed_from) == {InvoiceStatus.OPEN, InvoiceStatus.SENT, InvoiceStatus.OVERDUE}
+
+
+def test_transition_batch_records_events_for_updated_documents_only():
+    session = FakeSession(updated_ids=[5], current={6: OrderStatus.COMPLETED})
+
+    StatusTransitionService(session).transition_batch("order", "shipped", ids=[5, 6, 5])
+
+    assert [(event["entity_type"], event["entity_id"]) for event in session.inserted] == [("order", 5)]
+    assert session.inserted[0]["payload"] == {"status": "SHIPPED"}
+
+
+def test_transition_batch_skips_the_update_for_unreachable_targets():
+    session = FakeSession(current={1: QuotationStatus.SENT})
+
+    result = StatusTransitionService(session).transition_batch("quotation", "draft", ids=[1])
+
+    assert session.updates == []
+    assert result["results"] == [{"id": 1, "result": INVALID_TRANSITION_RESULT, "status": "sent"}]
+
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({"new_status": "archived", "ids": [1]}, "Invalid status"),
+    ({"new_status": "paid"}, "either ids or a filter"),
+    ({"new_status": "paid", "ids": [1], "filters": {}}, "either ids or a filter"),
+    ({"new_status": "paid", "ids": list(range(STATUS_BATCH_MAX_DOCUMENTS + 1))}, "At most"),
+])
+def test_transition_batch_rejects_invalid_requests(kwargs, message):
+    session = FakeSession()
+
+    with pytest.raises(ValueError, match=message):
+        StatusTransitionService(session).transition_batch("invoice", **kwargs)
+    assert session.updates == [] and not session.committed